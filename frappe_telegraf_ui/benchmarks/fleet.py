@@ -0,0 +1,311 @@
+# frappe_telegraf_ui/benchmarks/fleet.py
+
+"""
+Benchmark the monitoring and SSH paths against a simulated fleet.
+
+Starts a FakeFleet of TCP (or HTTP health) listeners with the requested
+latency and drop rate, plus a stub SSH server, and registers a Telegraf Host
+for each simulated host. Then it times status check cycles, config reads and
+writes over SSH, and the log endpoints. Every scenario reports wall time, DB
+statements, peak Python memory and per-call latency percentiles. The numbers
+are compared against the site's saved baseline so regressions stand out.
+Only for development sites:
+
+    bench --site dev.local execute frappe_telegraf_ui.benchmarks.fleet.run \\
+        --kwargs "{'hosts': 5000, 'drop_rate': 0.01, 'save_baseline': 1}"
+
+``check_all_hosts_status`` probes every monitored host of the site, so run it
+on a site without real hosts for comparable numbers.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import frappe
+import numpy as np
+from frappe.utils import cint, flt, now_datetime
+from frappe.utils.password import set_encrypted_password
+
+from frappe_telegraf_ui import tasks
+from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host import telegraf_host
+from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host_log import telegraf_host_log
+from frappe_telegraf_ui.monitoring import http_probe, log_counters
+from frappe_telegraf_ui.monitoring import hysteresis as status_hysteresis
+from frappe_telegraf_ui.monitoring import latency as probe_latency
+from frappe_telegraf_ui.monitoring import schedule as probe_schedule
+from frappe_telegraf_ui.monitoring import snapshot as status_snapshot
+from frappe_telegraf_ui.ssh import config_cache
+from frappe_telegraf_ui.ssh import credentials as ssh_credentials
+from frappe_telegraf_ui.ssh import pool as ssh_pool
+from frappe_telegraf_ui.tests.fleet import FakeFleet
+from frappe_telegraf_ui.tests.ssh_server import StubSSHServer
+
+BASELINE_FILE = "telegraf_fleet_benchmark.json"
+CONFIG_PATH = "/etc/telegraf/telegraf.conf"
+SAMPLE_CONFIG = """[agent]
+  interval = "10s"
+  flush_interval = "10s"
+
+[[outputs.influxdb]]
+  urls = ["http://influxdb:8086"]
+
+[[inputs.cpu]]
+  percpu = true
+[[inputs.mem]]
+[[inputs.disk]]
+"""
+SSH_PASSWORD = "benchmark"
+
+# Metrics compared against the baseline: None allows the relative tolerance,
+# a number that much absolute increase
+TRACKED = {
+    "wall_s": None,
+    "p95_ms": None,
+    "peak_mb": None,
+    "statements": 0,
+}
+
+
+@contextmanager
+def count_statements():
+    """Count frappe.db.sql calls - including frappe.get_all and query builder ones."""
+    counter = {"statements": 0}
+    sql = frappe.db.sql
+
+    def counting_sql(*args, **kwargs):
+        counter["statements"] += 1
+        return sql(*args, **kwargs)
+
+    frappe.db.sql = counting_sql
+    try:
+        yield counter
+    finally:
+        del frappe.db.sql
+
+
+def percentiles(timings):
+    p50, p95, p99 = np.percentile(np.asarray(timings, dtype=float), [50, 95, 99])
+    return {"p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2)}
+
+
+def measure(calls):
+    """
+    Run ``calls`` - a list of zero-argument callables - and summarise them.
+
+    Timings and statement counts come from a plain pass; peak memory from
+    running the first call once more under tracemalloc, which would
+    otherwise slow every call down.
+    """
+    timings = []
+    with count_statements() as counter:
+        started = time.perf_counter()
+        for call in calls:
+            call_started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - call_started) * 1000)
+        wall = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        calls[0]()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return dict(
+        calls=len(calls),
+        wall_s=round(wall, 3),
+        statements=counter["statements"],
+        peak_mb=round(peak / 1024 / 1024, 2),
+        **percentiles(timings),
+    )
+
+
+def register_hosts(fleet_hosts, ssh_hosts, ssh_port):
+    """
+    Insert a Telegraf Host per simulated host.
+
+    The first ``ssh_hosts`` point at the stub SSH server, with their name as
+    login so each keeps its own files there.
+    """
+    fields = ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+              "hostname", "ip_address", "ssh_port", "ssh_user", "ssh_auth_method", "status",
+              "telegraf_config_path", "probe_mode", "health_url"]
+    timestamp = now_datetime()
+    values = []
+    for index, host in enumerate(fleet_hosts):
+        if index < ssh_hosts:
+            ip_address, port = "127.0.0.1", ssh_port
+        else:
+            ip_address, port = host["ip_address"], host["ssh_port"]
+        values.append((
+            host["name"], timestamp, timestamp, "Administrator", "Administrator", 0,
+            host["hostname"], ip_address, port, host["name"], "Password", "Unknown",
+            CONFIG_PATH, host.get("probe_mode"), host.get("health_url"),
+        ))
+    frappe.db.bulk_insert("Telegraf Host", fields, values, chunk_size=5000)
+    for host in fleet_hosts[:ssh_hosts]:
+        set_encrypted_password("Telegraf Host", host["name"], SSH_PASSWORD, "ssh_password")
+    frappe.db.commit()
+    status_snapshot.invalidate()
+
+
+def remove_hosts(names):
+    """Delete the benchmark hosts, their logs and their cached state."""
+    for offset in range(0, len(names), 1000):
+        chunk = tuple(names[offset:offset + 1000])
+        frappe.db.sql("DELETE FROM `tabTelegraf Host Log` WHERE host IN %s", (chunk,))
+        frappe.db.sql("DELETE FROM `tabTelegraf Host` WHERE name IN %s", (chunk,))
+        frappe.db.sql(
+            "DELETE FROM `__Auth` WHERE doctype = 'Telegraf Host' AND name IN %s", (chunk,)
+        )
+    frappe.db.commit()
+
+    for name in names:
+        ssh_pool.invalidate(name)
+        ssh_credentials.invalidate(name)
+        config_cache.invalidate(name)
+        probe_schedule.reset_schedule(name)
+        status_hysteresis.forget(name)
+        probe_latency.forget(name)
+        http_probe.forget(name)
+    status_snapshot.invalidate()
+    log_counters.reconcile()
+
+
+def run_scenarios(fleet_hosts, ssh_hosts, cycles, log_calls):
+    results = {}
+
+    # Probe latencies as seen by the engine, next to the cycle timings
+    response_times = []
+    run_probe_cycle = tasks.run_probe_cycle
+
+    def recording_probe_cycle(*args, **kwargs):
+        probe_results = run_probe_cycle(*args, **kwargs)
+        response_times.extend(r["response_time"] for r in probe_results if not r["error"])
+        return probe_results
+
+    tasks.run_probe_cycle = recording_probe_cycle
+    try:
+        results["check_all_hosts_status"] = measure([tasks.check_all_hosts_status] * cycles)
+    finally:
+        tasks.run_probe_cycle = run_probe_cycle
+    if response_times:
+        results["check_all_hosts_status"]["probe"] = percentiles(response_times)
+
+    names = [host["name"] for host in fleet_hosts[:ssh_hosts]]
+    if names:
+        results["get_telegraf_config"] = measure([
+            lambda name=name: telegraf_host.get_telegraf_config(name, max_age=0)
+            for name in names
+        ])
+        results["update_telegraf_config"] = measure([
+            lambda name=name, index=index: telegraf_host.update_telegraf_config(
+                name, SAMPLE_CONFIG + f"# revision {index}\n"
+            )
+            for index, name in enumerate(names)
+        ])
+
+    log_hosts = [host["name"] for host in fleet_hosts] or [None]
+    results["get_host_logs"] = measure([
+        lambda name=log_hosts[index % len(log_hosts)]: telegraf_host_log.get_host_logs(name)
+        for index in range(log_calls)
+    ])
+    results["get_recent_status_changes"] = measure(
+        [telegraf_host_log.get_recent_status_changes] * log_calls
+    )
+    results["get_log_statistics"] = measure([telegraf_host_log.get_log_statistics] * log_calls)
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Regressions of ``results`` against ``baseline``, as readable lines."""
+    regressions = []
+    for scenario, metrics in results.items():
+        previous = (baseline or {}).get(scenario)
+        if not previous:
+            continue
+        for metric, allowed in TRACKED.items():
+            before, after = previous.get(metric), metrics.get(metric)
+            if before is None or after is None:
+                continue
+            limit = before + allowed if allowed is not None else before * (1 + tolerance)
+            if after > limit:
+                regressions.append(f"{scenario}.{metric}: {before} -> {after}")
+    return regressions
+
+
+def baseline_path():
+    return frappe.get_site_path(BASELINE_FILE)
+
+
+def load_baseline():
+    path = baseline_path()
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def write_baseline(results, params):
+    with open(baseline_path(), "w") as f:
+        json.dump({"saved_at": str(now_datetime()), "params": params, "results": results}, f, indent=1)
+
+
+def run(hosts=2000, down=0, drop_rate=0, latency=0, jitter=0, http=0, ssh_hosts=20,
+        ssh_latency=0, cycles=3, log_calls=50, tolerance=0.2, save_baseline=0, keep=0):
+    if not frappe.conf.developer_mode:
+        frappe.throw("Fleet benchmarks only run on sites in developer mode")
+
+    params = {
+        "hosts": cint(hosts), "down": cint(down), "drop_rate": flt(drop_rate),
+        "latency": flt(latency), "jitter": flt(jitter), "http": cint(http),
+        "ssh_hosts": cint(ssh_hosts), "ssh_latency": flt(ssh_latency),
+        "cycles": cint(cycles), "log_calls": cint(log_calls),
+    }
+
+    fleet = FakeFleet(params["hosts"], down=params["down"], drop_rate=params["drop_rate"],
+                      latency=params["latency"], jitter=params["jitter"], http=params["http"])
+    ssh_server = StubSSHServer({CONFIG_PATH: SAMPLE_CONFIG}, latency=params["ssh_latency"])
+    with fleet, ssh_server:
+        names = [host["name"] for host in fleet.hosts]
+        register_hosts(fleet.hosts, params["ssh_hosts"], ssh_server.port)
+        try:
+            results = run_scenarios(
+                fleet.hosts, params["ssh_hosts"], params["cycles"], params["log_calls"]
+            )
+        finally:
+            ssh_pool.get_pool().close_all()
+            if not cint(keep):
+                remove_hosts(names)
+        results["ssh_server"] = {
+            "connections": ssh_server.connections,
+            "commands": ssh_server.commands,
+        }
+
+    print(f"{'scenario':28} {'calls':>6} {'wall s':>8} {'stmts':>7} {'peak MB':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for scenario, metrics in results.items():
+        if "calls" not in metrics:
+            continue
+        print(f"{scenario:28} {metrics['calls']:>6} {metrics['wall_s']:>8} "
+              f"{metrics['statements']:>7} {metrics['peak_mb']:>8} {metrics['p50_ms']:>8} "
+              f"{metrics['p95_ms']:>8} {metrics['p99_ms']:>8}")
+
+    baseline = load_baseline()
+    regressions = compare(results, baseline, flt(tolerance))
+    if baseline is None:
+        print("No baseline saved yet")
+    elif regressions:
+        print("Regressions against baseline:\n  " + "\n  ".join(regressions))
+    else:
+        print("No regressions against baseline")
+
+    if cint(save_baseline):
+        write_baseline(results, params)
+        print(f"Saved baseline to {baseline_path()}")
+
+    return {"params": params, "results": results, "regressions": regressions}
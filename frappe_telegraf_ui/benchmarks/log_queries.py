@@ -0,0 +1,148 @@
+# frappe_telegraf_ui/benchmarks/log_queries.py
+
+"""
+Benchmark the Telegraf Host Log query paths with and without their indexes.
+
+Loads synthetic log rows, then runs each query the app issues with the
+indexes dropped and again with them in place, printing EXPLAIN plans and
+timings. Only for development sites:
+
+    bench --site dev.local execute frappe_telegraf_ui.benchmarks.log_queries.run \\
+        --kwargs "{'rows': 2000000}"
+"""
+
+import random
+import time
+from datetime import timedelta
+
+import frappe
+from frappe.utils import now_datetime
+
+from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host_log.telegraf_host_log import LOG_INDEXES
+
+TABLE = "tabTelegraf Host Log"
+ROW_PREFIX = "bench-log-"
+EVENT_TYPES = ["Status Change", "Status Change", "Connection Error", "Config Update", "Service Restart"]
+
+
+def get_queries(now):
+    """
+    The app's log queries, as (label, sql, values).
+
+    The daily report and log statistics read rollups and Redis counters, not
+    this table; the rollup window and counter reconciliation are what scan it.
+    """
+    return [
+        ("get_host_logs", f"""
+            SELECT name, event_type, old_status, new_status, response_time, timestamp, details
+            FROM `{TABLE}` WHERE host = %s ORDER BY timestamp DESC, name DESC LIMIT 51
+        """, ("bench-host-7",)),
+        ("get_host_logs.next_page", f"""
+            SELECT name, event_type, old_status, new_status, response_time, timestamp, details
+            FROM `{TABLE}` WHERE host = %s
+                AND (timestamp < %s OR (timestamp = %s AND name < %s))
+            ORDER BY timestamp DESC, name DESC LIMIT 51
+        """, ("bench-host-7", now - timedelta(days=3), now - timedelta(days=3), "bench-log-")),
+        ("get_recent_status_changes", f"""
+            SELECT host, old_status, new_status, timestamp, response_time
+            FROM `{TABLE}` WHERE event_type = 'Status Change' AND timestamp >= %s
+            ORDER BY timestamp DESC, name DESC LIMIT 101
+        """, (now - timedelta(days=7),)),
+        ("get_realtime_status.recent_changes", f"""
+            SELECT host, old_status, new_status, timestamp
+            FROM `{TABLE}` WHERE event_type = 'Status Change' AND timestamp >= %s
+            ORDER BY timestamp DESC LIMIT 20
+        """, (now - timedelta(hours=1),)),
+        ("run_rollup.window", f"""
+            SELECT host, event_type, old_status, new_status, response_time, timestamp
+            FROM `{TABLE}` WHERE timestamp >= %s AND timestamp < %s
+            ORDER BY timestamp ASC
+        """, (now - timedelta(hours=2), now - timedelta(hours=1))),
+        ("reconcile_log_counters.recent_hours", f"""
+            SELECT timestamp FROM `{TABLE}` WHERE timestamp >= %s
+        """, (now - timedelta(hours=24),)),
+        ("cleanup_old_logs.chunk", f"""
+            SELECT name, host, event_type, timestamp FROM `{TABLE}`
+            WHERE (timestamp < %s) AND name > %s
+            ORDER BY name LIMIT 1000
+        """, (now - timedelta(days=7), ROW_PREFIX)),
+    ]
+
+
+def load_rows(rows, hosts=500, days=30, chunk_size=10000):
+    """Insert ``rows`` synthetic log rows spread over the last ``days`` days."""
+    now = now_datetime()
+    fields = ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+              "host", "event_type", "old_status", "new_status", "response_time", "timestamp", "details"]
+    span = days * 86400
+    for offset in range(0, rows, chunk_size):
+        values = []
+        for index in range(offset, min(offset + chunk_size, rows)):
+            timestamp = now - timedelta(seconds=random.randint(0, span))
+            values.append((
+                f"{ROW_PREFIX}{index}", timestamp, timestamp, "Administrator", "Administrator", 0,
+                f"bench-host-{random.randrange(hosts)}", random.choice(EVENT_TYPES),
+                "Active", "Down", random.uniform(0.2, 50), timestamp, "benchmark",
+            ))
+        frappe.db.bulk_insert("Telegraf Host Log", fields, values, chunk_size=chunk_size)
+        frappe.db.commit()
+
+
+def drop_indexes():
+    for index_name in LOG_INDEXES:
+        if frappe.db.has_index(TABLE, index_name):
+            frappe.db.sql_ddl(f"ALTER TABLE `{TABLE}` DROP INDEX `{index_name}`")
+
+
+def add_indexes():
+    for index_name, columns in LOG_INDEXES.items():
+        frappe.db.add_index("Telegraf Host Log", columns, index_name)
+
+
+def measure(repeat=5):
+    """EXPLAIN and median latency (ms) for every query."""
+    now = now_datetime()
+    results = {}
+    for label, sql, values in get_queries(now):
+        plan = frappe.db.sql(f"EXPLAIN {sql}", values, as_dict=True)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            frappe.db.sql(sql, values)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[label] = {
+            "ms": round(timings[len(timings) // 2], 2),
+            "plan": [
+                {key: row.get(key) for key in ("type", "key", "rows", "Extra")}
+                for row in plan
+            ],
+        }
+    return results
+
+
+def run(rows=1000000, hosts=500, keep=False):
+    if not frappe.conf.developer_mode:
+        frappe.throw("Log query benchmarks only run on sites in developer mode")
+
+    started = time.perf_counter()
+    load_rows(int(rows), int(hosts))
+    print(f"Loaded {rows} rows in {time.perf_counter() - started:.1f}s")
+
+    try:
+        drop_indexes()
+        before = measure()
+        add_indexes()
+        after = measure()
+    finally:
+        add_indexes()
+        if not keep:
+            frappe.db.sql(f"DELETE FROM `{TABLE}` WHERE name LIKE %s", (f"{ROW_PREFIX}%",))
+            frappe.db.commit()
+
+    print(f"{'query':40} {'before ms':>10} {'after ms':>10}  plan after")
+    for label in before:
+        plan = ", ".join(f"{p['type']}/{p['key']}/{p['rows']}" for p in after[label]["plan"])
+        print(f"{label:40} {before[label]['ms']:>10} {after[label]['ms']:>10}  {plan}")
+
+    return {"rows": rows, "before": before, "after": after}
@@ -6,7 +6,8 @@ frappe.ui.form.on('Telegraf Host', {
         if (frm.doc.status) {
             let color = frm.doc.status === 'Active' ? 'green' :
                        frm.doc.status === 'Down' ? 'red' :
-                       frm.doc.status === 'Inactive' ? 'orange' : 'grey';
+                       frm.doc.status === 'Inactive' ? 'orange' :
+                       frm.doc.status === 'Flapping' ? 'yellow' : 'grey';
 
             frm.dashboard.add_indicator(__('Status: {0}', [frm.doc.status]), color);
         }
@@ -20,6 +21,19 @@ frappe.ui.form.on('Telegraf Host', {
             frm.dashboard.add_indicator(__('Last Check: {0}', [frappe.datetime.comment_when(frm.doc.last_status_check)]), 'grey');
         }
 
+        // Agent Health Indicators
+        if (frm.doc.telegraf_version) {
+            frm.dashboard.add_indicator(__('Telegraf {0}', [frm.doc.telegraf_version]), 'blue');
+        }
+
+        if (frm.doc.load_average) {
+            frm.dashboard.add_indicator(__('Load: {0}', [frm.doc.load_average]), 'grey');
+        }
+
+        if (frm.doc.last_error) {
+            frm.dashboard.add_indicator(__('Agent reported errors'), 'red');
+        }
+
         if (!frm.is_new()) {
             // Get Config
             frm.add_custom_button(__('Get Config'), function () {
@@ -85,28 +99,11 @@ frappe.ui.form.on('Telegraf Host', {
                     method: 'frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host.telegraf_host.test_telegraf_config',
                     args: { hostname: frm.doc.name },
                     callback: function (r) {
-                        frappe.hide_alert();
-                        const result_dialog = new frappe.ui.Dialog({
-                            title: __('Telegraf Test Result for {0}', [frm.doc.hostname]),
-                            fields: [
-                                {
-                                    fieldtype: 'Code',
-                                    fieldname: 'test_output',
-                                    label: __('Test Output'),
-                                    options: 'Text',
-                                    default: r.message || __('No output received'),
-                                    read_only: 1
-                                }
-                            ],
-                            primary_action_label: __('Close'),
-                            primary_action: function () {
-                                result_dialog.hide();
-                            }
-                        });
-                        result_dialog.show();
+                        if (r.message && r.message.job_id) {
+                            show_config_test(frm, r.message.job_id);
+                        }
                     },
                     error: function (err) {
-                        frappe.hide_alert();
                         frappe.msgprint({
                             title: __('Test Failed'),
                             message: __('Failed to run configuration test'),
@@ -135,6 +132,27 @@ frappe.ui.form.on('Telegraf Host', {
                 });
             }, __('Diagnostics'));
 
+            // Reset Host Key
+            if (frm.doc.ssh_host_key) {
+                frm.add_custom_button(__('Reset Host Key'), function () {
+                    frappe.confirm(__('Forget the pinned SSH host key of <b>{0}</b>? The key presented on the next connection will be trusted.', [frm.doc.hostname]), function () {
+                        frappe.call({
+                            method: 'frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host.telegraf_host.reset_host_key',
+                            args: { hostname: frm.doc.name },
+                            callback: function (r) {
+                                if (r.message) {
+                                    frm.reload_doc();
+                                    frappe.show_alert({ message: r.message.message, indicator: 'green' });
+                                }
+                            },
+                            error: function (err) {
+                                frappe.show_alert({ message: __('Failed to reset host key'), indicator: 'red' });
+                            }
+                        });
+                    });
+                }, __('Diagnostics'));
+            }
+
             // Service Management
             const service_actions = [
                 { action: 'start', label: __('Start'), color: 'green' },
@@ -255,3 +273,80 @@ frappe.ui.form.on('Telegraf Host', {
         }, 500);
     }
 });
+
+
+// Streams telegraf --test output into a dialog and shows the parsed summary at the end
+function show_config_test(frm, job_id) {
+    const result_dialog = new frappe.ui.Dialog({
+        title: __('Telegraf Test Result for {0}', [frm.doc.hostname]),
+        size: 'large',
+        fields: [
+            {
+                fieldtype: 'HTML',
+                fieldname: 'summary_html'
+            },
+            {
+                fieldtype: 'HTML',
+                fieldname: 'output_html'
+            }
+        ],
+        primary_action_label: __('Close'),
+        primary_action: function () {
+            result_dialog.hide();
+        }
+    });
+
+    const $output = $('<pre class="telegraf-test-output" style="max-height: 400px; overflow: auto; font-size: 11px;"></pre>')
+        .appendTo(result_dialog.fields_dict.output_html.$wrapper);
+    result_dialog.fields_dict.summary_html.$wrapper.html(`<p class="text-muted">${__('Waiting for output...')}</p>`);
+
+    function on_output(data) {
+        if (data.job_id !== job_id) return;
+        data.chunks.forEach(([stream, text]) => {
+            $output.append(document.createTextNode(text));
+        });
+        $output.scrollTop($output[0].scrollHeight);
+    }
+
+    function on_done(data) {
+        if (data.job_id !== job_id) return;
+        frappe.realtime.off('telegraf_test_output', on_output);
+        frappe.realtime.off('telegraf_test_done', on_done);
+
+        if (data.status !== 'success') {
+            result_dialog.fields_dict.summary_html.$wrapper.html(
+                `<div class="alert alert-danger">${frappe.utils.escape_html(data.message || __('Test failed'))}</div>`
+            );
+            return;
+        }
+
+        const summary = data.summary;
+        const plugin_rows = Object.keys(summary.plugins).sort().map(name => {
+            const plugin = summary.plugins[name];
+            return `<tr><td>${frappe.utils.escape_html(name)}</td><td>${plugin.metrics}</td><td>${plugin.errors}</td></tr>`;
+        }).join('');
+        const errors = summary.errors.map(line => `<li><code>${frappe.utils.escape_html(line)}</code></li>`).join('');
+        const flags = [
+            summary.truncated ? __('output truncated') : null,
+            summary.timed_out ? __('timed out') : null
+        ].filter(Boolean).join(', ');
+
+        result_dialog.fields_dict.summary_html.$wrapper.html(`
+            <p>
+                <b>${__('Metrics')}:</b> ${summary.metrics}
+                | <b>${__('Exit Code')}:</b> ${summary.exit_code === null ? '-' : summary.exit_code}
+                | <b>${__('Duration')}:</b> ${summary.duration}s
+                ${flags ? `| <span class="text-danger">${flags}</span>` : ''}
+            </p>
+            <table class="table table-bordered table-condensed">
+                <thead><tr><th>${__('Plugin')}</th><th>${__('Metrics')}</th><th>${__('Errors')}</th></tr></thead>
+                <tbody>${plugin_rows}</tbody>
+            </table>
+            ${errors ? `<ul>${errors}</ul>` : ''}
+        `);
+    }
+
+    frappe.realtime.on('telegraf_test_output', on_output);
+    frappe.realtime.on('telegraf_test_done', on_done);
+    result_dialog.show();
+}
@@ -2,10 +2,28 @@
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import now
-import paramiko
-import io
+from frappe.utils import cint, now
+from contextlib import contextmanager
+import posixpath
 import re
+import time
+
+from frappe_telegraf_ui.monitoring import http_probe
+from frappe_telegraf_ui.monitoring import hysteresis as status_hysteresis
+from frappe_telegraf_ui.monitoring import latency as probe_latency
+from frappe_telegraf_ui.monitoring import schedule as probe_schedule
+from frappe_telegraf_ui.monitoring import snapshot as status_snapshot
+from frappe_telegraf_ui.monitoring import telemetry
+from frappe_telegraf_ui.monitoring.realtime import publish_status_delta
+from frappe_telegraf_ui.monitoring.writeback import insert_host_logs
+from frappe_telegraf_ui.ssh import config_cache
+from frappe_telegraf_ui.ssh import credentials as ssh_credentials
+from frappe_telegraf_ui.ssh import pool as ssh_pool
+from frappe_telegraf_ui.ssh.credentials import SSH_CONNECTION_FIELDS
+from frappe_telegraf_ui.ssh.fanout import run_on_hosts
+from frappe_telegraf_ui.ssh.health import host_fields as health_fields, probe_health, status_from_health
+from frappe_telegraf_ui.ssh.telegraf_test import run_telegraf_test
+from frappe_telegraf_ui.ssh.upload import upload_files
 
 class TelegrafHost(Document):
     def validate(self):
@@ -43,216 +61,482 @@ class TelegrafHost(Document):
         if not self.status:
             self.status = "Unknown"
 
-def _get_ssh_client(hostname):
-    """Get SSH client for the specified hostname."""
-    host_doc = frappe.get_doc("Telegraf Host", hostname)
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    auth_method = host_doc.ssh_auth_method or "Private Key"
-    
+    def after_insert(self):
+        status_snapshot.invalidate()
+
+    def on_update(self):
+        """Keep cached per-host state in step with the saved document."""
+        status_snapshot.update_host(self)
+        ssh_credentials.invalidate(self.name)
+        if any(self.has_value_changed(field) for field in SSH_CONNECTION_FIELDS + ("ssh_password", "ssh_host_key")):
+            ssh_pool.invalidate(self.name)
+            config_cache.invalidate(self.name)
+            # New address or port: don't wait out a backed-off probe interval
+            probe_schedule.reset_schedule(self.name)
+            status_hysteresis.forget(self.name)
+
+    def on_trash(self):
+        # Daily rollups are never pruned and would block the delete through their link
+        frappe.db.delete("Telegraf Host Rollup", {"host": self.name})
+        status_snapshot.invalidate()
+        ssh_pool.invalidate(self.name)
+        ssh_credentials.invalidate(self.name)
+        config_cache.invalidate(self.name)
+        probe_schedule.reset_schedule(self.name)
+        status_hysteresis.forget(self.name)
+        probe_latency.forget(self.name)
+        http_probe.forget(self.name)
+
+    def after_rename(self, old_name, new_name, merge=False):
+        status_snapshot.invalidate()
+        ssh_pool.invalidate(old_name)
+        ssh_credentials.invalidate(old_name)
+        config_cache.invalidate(old_name)
+        probe_schedule.reset_schedule(old_name)
+        status_hysteresis.forget(old_name)
+        probe_latency.forget(old_name)
+        http_probe.forget(old_name)
+
+def _get_connection_spec(hostname, host_doc=None):
+    """Build the pool connection spec for a host, from the per-worker credential cache."""
+    return ssh_credentials.get_spec(hostname, host_doc)
+
+@contextmanager
+def _get_ssh_client(hostname, host_doc=None, operation="ssh"):
+    """Borrow a pooled SSH client for the specified hostname."""
+    spec = _get_connection_spec(hostname, host_doc)
+    pool = ssh_pool.get_pool()
+
     try:
-        if auth_method == "Password":
-            password = host_doc.get_password('ssh_password')
-            if not password: 
-                frappe.throw(f"SSH Password is not set for host '{hostname}'")
-            client.connect(
-                hostname=host_doc.ip_address, 
-                port=host_doc.ssh_port or 22, 
-                username=host_doc.ssh_user, 
-                password=password, 
-                timeout=10
-            )
-        elif auth_method == "Private Key":
-            if not host_doc.ssh_private_key: 
-                frappe.throw(f"SSH Private Key is not set for host '{hostname}'")
-            private_key_file = io.StringIO(host_doc.ssh_private_key)
-            private_key = paramiko.RSAKey.from_private_key(private_key_file)
-            client.connect(
-                hostname=host_doc.ip_address, 
-                port=host_doc.ssh_port or 22, 
-                username=host_doc.ssh_user, 
-                pkey=private_key, 
-                timeout=10
-            )
-        else:
-            frappe.throw("Invalid SSH Authentication Method selected.")
+        with telemetry.timed("ssh_acquire_seconds", operation=operation):
+            conn = pool.acquire(spec)
     except Exception as e:
-        frappe.throw(f"SSH connection to {host_doc.ip_address} failed: {e}")
-    
-    return client
+        telemetry.flush()
+        frappe.throw(f"SSH connection to {spec['ip_address']} failed: {e}")
+
+    try:
+        with telemetry.timed("ssh_operation_seconds", operation=operation):
+            with pool.lease(conn) as client:
+                # Inside the lease so a failed write still releases the connection
+                ssh_credentials.save_pending_host_keys()
+                yield client
+    finally:
+        telemetry.flush()
 
 @frappe.whitelist()
-def get_telegraf_config(hostname):
-    """Get Telegraf configuration from remote host."""
-    client = None
+def get_telegraf_config(hostname, max_age=None):
+    """Get Telegraf configuration from remote host, served from cache when unchanged."""
     try:
-        client = _get_ssh_client(hostname)
         host_doc = frappe.get_doc("Telegraf Host", hostname)
         config_path = host_doc.telegraf_config_path or "/etc/telegraf/telegraf.conf"
-        
-        # Read the configuration file
-        command = f" cat {config_path}"
-        stdin, stdout, stderr = client.exec_command(command)
-        
-        config_content = stdout.read().decode()
-        error = stderr.read().decode()
-        
-        if error and "No such file" in error:
+
+        # max_age > 0 serves a recent cached copy without touching the host at all
+        if max_age is None:
+            max_age = frappe.conf.get("telegraf_config_cache_max_age")
+
+        try:
+            return config_cache.read_config(
+                lambda: _get_ssh_client(hostname, host_doc, "get_config"), hostname, config_path, cint(max_age)
+            )
+        except FileNotFoundError:
             frappe.throw(f"Configuration file not found at {config_path}")
-        
-        return config_content
-        
+
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Get Telegraf Config Failed")
         frappe.throw(f"Failed to get config from {hostname}: {e}")
-    finally:
-        if client:
-            client.close()
 
 @frappe.whitelist()
-def update_telegraf_config(hostname, new_config):
-    """Update Telegraf configuration on remote host."""
-    client = None
+def get_config_cache_stats():
+    """Counters for config fetches, cache hits and bytes saved."""
+    return {"status": "success", "stats": config_cache.get_stats()}
+
+def _get_fragment_files(config_path, fragments):
+    """Map telegraf.d fragment names to paths next to the main config."""
+    fragments = frappe.parse_json(fragments) if fragments else {}
+    fragment_dir = posixpath.join(posixpath.dirname(config_path), "telegraf.d")
+    files = []
+    for filename, content in fragments.items():
+        if not re.match(r'^[\w.-]+\.conf$', filename):
+            frappe.throw(f"Invalid config fragment name '{filename}'")
+        files.append((posixpath.join(fragment_dir, filename), content))
+    return files
+
+@frappe.whitelist()
+def update_telegraf_config(hostname, new_config, fragments=None):
+    """Update Telegraf configuration, plus optional telegraf.d fragments, on remote host."""
     try:
-        client = _get_ssh_client(hostname)
         host_doc = frappe.get_doc("Telegraf Host", hostname)
         config_path = host_doc.telegraf_config_path or "/etc/telegraf/telegraf.conf"
-        
-        # Create a backup first
-        backup_command = f" cp {config_path} {config_path}.backup.$(date +%Y%m%d_%H%M%S)"
-        stdin, stdout, stderr = client.exec_command(backup_command)
-        stdout.channel.recv_exit_status()  # Wait for completion
-        
-        # Write new configuration using a temporary file
-        temp_file = f"/tmp/telegraf_config_{frappe.generate_hash(length=8)}.conf"
-        
-        # Write config to temp file
-        write_command = f"echo '{new_config}' |  tee {temp_file} > /dev/null"
-        stdin, stdout, stderr = client.exec_command(write_command)
-        exit_code = stdout.channel.recv_exit_status()
-        
-        if exit_code != 0:
-            raise Exception("Failed to write temporary config file")
-        
-        # Move temp file to actual config location
-        move_command = f" mv {temp_file} {config_path}"
-        stdin, stdout, stderr = client.exec_command(move_command)
-        exit_code = stdout.channel.recv_exit_status()
-        
-        if exit_code != 0:
-            raise Exception("Failed to update config file")
-        
-        # Set proper permissions
-        chmod_command = f" chmod 644 {config_path}"
-        stdin, stdout, stderr = client.exec_command(chmod_command)
-        stdout.channel.recv_exit_status()
-        
-        return {"status": "success", "message": f"Configuration updated successfully on {hostname}"}
-        
+        files = [(config_path, new_config)] + _get_fragment_files(config_path, fragments)
+
+        with _get_ssh_client(hostname, host_doc, "update_config") as client:
+            results = upload_files(client, files)
+
+        config_cache.store_config(hostname, config_path, new_config)
+
+        changed = [result["path"] for result in results if result["changed"]]
+        if not changed:
+            return {
+                "status": "success",
+                "changed": False,
+                "message": f"Configuration on {hostname} is already up to date"
+            }
+
+        return {
+            "status": "success",
+            "changed": True,
+            "files": changed,
+            "message": f"Configuration updated successfully on {hostname}"
+        }
+
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Update Telegraf Config Failed")
         frappe.throw(f"Failed to update config on {hostname}: {e}")
-    finally:
-        if client:
-            client.close()
 
 @frappe.whitelist()
-def test_telegraf_config(hostname):
-    """Test Telegraf configuration on remote host."""
-    client = None
+def test_telegraf_config(hostname, include_output=0):
+    """
+    Test Telegraf configuration on remote host in a background job.
+
+    Output is streamed to the caller as ``telegraf_test_output`` events and the
+    parsed summary arrives as ``telegraf_test_done``.
+    """
+    job_id = frappe.generate_hash(length=10)
+    frappe.enqueue(
+        run_config_test,
+        queue="short",
+        timeout=(frappe.conf.get("telegraf_test_timeout") or 60) + 60,
+        hostname=hostname,
+        job_id=job_id,
+        user=frappe.session.user,
+        include_output=cint(include_output)
+    )
+    return {"status": "queued", "job_id": job_id}
+
+def run_config_test(hostname, job_id, user, include_output=0):
+    """Background job behind test_telegraf_config."""
+    pending = []
+    state = {"size": 0, "flushed": time.monotonic()}
+
+    def flush():
+        if pending:
+            frappe.publish_realtime(
+                "telegraf_test_output",
+                {"job_id": job_id, "chunks": list(pending)},
+                user=user
+            )
+            pending.clear()
+        state.update(size=0, flushed=time.monotonic())
+
+    def on_chunk(stream, text):
+        # Batch small reads so the browser isn't flooded with tiny events
+        pending.append([stream, text])
+        state["size"] += len(text)
+        if state["size"] >= 16384:
+            flush()
+
+    def on_tick():
+        # Also while telegraf is quiet, so the last lines don't wait for EOF
+        if pending and time.monotonic() - state["flushed"] >= 0.25:
+            flush()
+
+    result = {"job_id": job_id, "hostname": hostname}
     try:
-        client = _get_ssh_client(hostname)
         host_doc = frappe.get_doc("Telegraf Host", hostname)
         config_path = host_doc.telegraf_config_path or "/etc/telegraf/telegraf.conf"
-        
-        # Run telegraf --test command
-        command = f" /usr/bin/telegraf --config {config_path} --test"
-        stdin, stdout, stderr = client.exec_command(command)
-        
-        output = stdout.read().decode()
-        error = stderr.read().decode()
-        
-        # Telegraf often outputs to stderr even on success
-        result = f"OUTPUT:\n{output}\n\nSTDERR:\n{error}" if error else output
-        
-        return result or "Test command executed successfully. No output received."
-        
+
+        with _get_ssh_client(hostname, host_doc, "test_config") as client:
+            summary = run_telegraf_test(
+                client,
+                config_path,
+                on_chunk=on_chunk,
+                max_bytes=frappe.conf.get("telegraf_test_max_bytes") or 1024 * 1024,
+                timeout=frappe.conf.get("telegraf_test_timeout") or 60,
+                keep_output=bool(include_output),
+                on_tick=on_tick
+            )
+        flush()
+        result.update(status="success", summary=summary)
+
     except Exception as e:
+        flush()
         frappe.log_error(frappe.get_traceback(), "Test Telegraf Config Failed")
-        frappe.throw(f"Failed to test config on {hostname}: {e}")
-    finally:
-        if client:
-            client.close()
+        result.update(status="error", message=f"Failed to test config on {hostname}: {e}")
+
+    frappe.publish_realtime("telegraf_test_done", result, user=user)
+    return result
+
+SERVICE_ACTIONS = ['start', 'stop', 'restart', 'reload']
+
+def _validate_service_action(action):
+    if action not in SERVICE_ACTIONS:
+        frappe.throw(f"Invalid action '{action}'. Allowed actions: {', '.join(SERVICE_ACTIONS)}")
+
+def _run_service_action(client, action):
+    """Run systemctl for telegraf on an open client; raises on failure."""
+    stdin, stdout, stderr = client.exec_command(f" systemctl {action} telegraf")
+
+    exit_code = stdout.channel.recv_exit_status()
+    error = stderr.read().decode()
+
+    if exit_code != 0:
+        raise Exception(f"Command failed with exit code {exit_code}: {error}")
 
 @frappe.whitelist()
 def manage_telegraf_service(hostname, action):
     """Manage Telegraf service (start, stop, restart, reload)."""
-    allowed_actions = ['start', 'stop', 'restart', 'reload']
-    if action not in allowed_actions:
-        frappe.throw(f"Invalid action '{action}'. Allowed actions: {', '.join(allowed_actions)}")
+    _validate_service_action(action)
 
-    client = None
     try:
-        client = _get_ssh_client(hostname)
-        command = f" systemctl {action} telegraf"
-        stdin, stdout, stderr = client.exec_command(command)
-        
-        exit_code = stdout.channel.recv_exit_status()
-        error = stderr.read().decode()
-
-        if exit_code != 0:
-            raise Exception(f"Command failed with exit code {exit_code}: {error}")
+        with _get_ssh_client(hostname, operation="service") as client:
+            _run_service_action(client, action)
 
         return {"status": "success", "message": f"Telegraf service {action} completed on {hostname}"}
         
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Manage Telegraf Service Failed")
         frappe.throw(f"Failed to {action} service on {hostname}: {e}")
-    finally:
-        if client:
-            client.close()
+
+@frappe.whitelist()
+def reset_host_key(hostname):
+    """Forget the pinned SSH host key; the next connection pins whatever the host presents."""
+    if not frappe.has_permission("Telegraf Host", "write", hostname):
+        frappe.throw(f"Not permitted to reset the host key of {hostname}", frappe.PermissionError)
+
+    host_doc = frappe.get_doc("Telegraf Host", hostname)
+    host_doc.ssh_host_key = None
+    # on_update drops the cached spec and pooled connections; the new modified tells other workers
+    host_doc.save()
+    return {"status": "success", "message": f"Host key of {hostname} reset"}
+
+@frappe.whitelist()
+def bulk_manage_telegraf_service(action, hosts=None, filters=None):
+    """
+    Run a service action on many hosts in a background job.
+
+    Takes a list of host names or Telegraf Host filters. Progress for every
+    host and a final summary are published to the calling user as
+    ``telegraf_bulk_service_progress`` / ``telegraf_bulk_service_done``.
+    """
+    _validate_service_action(action)
+
+    if hosts:
+        hosts = frappe.parse_json(hosts)
+    elif filters:
+        # get_list applies the user's permissions, unlike get_all
+        hosts = frappe.get_list("Telegraf Host", filters=frappe.parse_json(filters), pluck="name")
+    else:
+        frappe.throw("Select hosts or provide filters")
+
+    if not hosts:
+        frappe.throw("No hosts match the selection")
+
+    denied = [name for name in hosts if not frappe.has_permission("Telegraf Host", "write", name)]
+    if denied:
+        frappe.throw(
+            f"Not permitted to manage the Telegraf service on: {', '.join(denied[:10])}"
+            + (f" and {len(denied) - 10} more" if len(denied) > 10 else ""),
+            frappe.PermissionError
+        )
+
+    job_id = frappe.generate_hash(length=10)
+    frappe.enqueue(
+        run_bulk_service_action,
+        queue="long",
+        timeout=1800,
+        action=action,
+        hosts=hosts,
+        job_id=job_id,
+        user=frappe.session.user
+    )
+    return {"status": "queued", "job_id": job_id, "total": len(hosts)}
+
+def run_bulk_service_action(action, hosts, job_id, user):
+    """Background job behind bulk_manage_telegraf_service."""
+    specs, results = [], []
+    for hostname in hosts:
+        try:
+            specs.append(_get_connection_spec(hostname))
+        except Exception as e:
+            results.append({"host": hostname, "ok": False, "message": str(e), "duration": 0})
+
+    pending_logs = []
+    progress = {"done": 0, "failed": 0}
+
+    def publish(result):
+        progress["done"] += 1
+        progress["failed"] += 0 if result["ok"] else 1
+        pending_logs.append({
+            "host": result["host"],
+            "event_type": "Service Restart",
+            "new_status": "Success" if result["ok"] else "Failed",
+            "response_time": result["duration"],
+            "details": f"Bulk {action}: {result['message'] or 'completed'}",
+        })
+        frappe.publish_realtime(
+            "telegraf_bulk_service_progress",
+            dict(result, job_id=job_id, action=action, total=len(hosts), **progress),
+            user=user
+        )
+        if len(pending_logs) >= 100:
+            flush_logs()
+
+    def flush_logs():
+        insert_host_logs(pending_logs)
+        frappe.db.commit()
+        pending_logs.clear()
+
+    for result in results:
+        publish(result)
+
+    parallel = run_on_hosts(
+        specs,
+        lambda client, spec: _run_service_action(client, action),
+        concurrency=frappe.conf.get("telegraf_bulk_concurrency") or 20,
+        on_result=publish,
+        name="service"
+    )
+    results.extend(parallel)
+    flush_logs()
+
+    summary = {
+        "job_id": job_id,
+        "action": action,
+        "total": len(hosts),
+        "succeeded": sum(1 for result in results if result["ok"]),
+        "failed": [
+            {"host": result["host"], "message": result["message"]}
+            for result in results if not result["ok"]
+        ],
+    }
+    frappe.publish_realtime("telegraf_bulk_service_done", summary, user=user)
+    return summary
 
 @frappe.whitelist()
 def check_host_status(hostname):
-    """Check the status of Telegraf service on host."""
+    """Check the Telegraf service and agent health on host in one SSH round trip."""
     try:
         host_doc = frappe.get_doc("Telegraf Host", hostname)
-        client = None
-        
+        config_path = host_doc.telegraf_config_path or "/etc/telegraf/telegraf.conf"
+        old_status = host_doc.status
+
         try:
-            client = _get_ssh_client(hostname)
-            # Check if telegraf service is active
-            stdin, stdout, stderr = client.exec_command(" systemctl is-active telegraf")
-            status_output = stdout.read().decode().strip()
-            
-            if status_output == "active":
-                host_doc.status = "Active"
-            elif status_output == "inactive":
-                host_doc.status = "Inactive"
-            else:
-                host_doc.status = "Down"
-                
+            with _get_ssh_client(hostname, host_doc, "check_status") as client:
+                health = probe_health(client, config_path)
+
+            values = dict(health_fields(health), status=status_from_health(health), last_health_check=now())
+
         except Exception as e:
-            host_doc.status = "Down"
+            health = None
+            values = {"status": "Down"}
             frappe.log_error(f"Failed to check status for {hostname}: {str(e)}", "Host Status Check")
-            
-        finally:
-            if client:
-                client.close()
-        
-        host_doc.last_status_check = now()
-        host_doc.save(ignore_permissions=True)
-        
+
+        values["last_status_check"] = now()
+        # Not save(): on_update would drop the pooled connection and cached credentials
+        frappe.db.set_value("Telegraf Host", hostname, values, update_modified=False)
+        if values["status"] != old_status:
+            # The rollups replay status time from these rows
+            insert_host_logs([{
+                "host": hostname,
+                "event_type": "Status Change",
+                "old_status": old_status,
+                "new_status": values["status"],
+                "details": f"Manual status check: {old_status} -> {values['status']}",
+            }], values["last_status_check"])
+        host_doc.update(values)
+        frappe.db.after_commit.add(lambda: _publish_host_status(host_doc, old_status))
+
         return {
             "status": "success",
             "message": f"Status updated to {host_doc.status}",
-            "host_status": host_doc.status
+            "host_status": host_doc.status,
+            "health": health
         }
-        
+
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Check Host Status Failed")
         frappe.throw(f"Failed to check status for {hostname}: {str(e)}")
 
+def _publish_host_status(host_doc, old_status):
+    status_snapshot.update_host(host_doc)
+    if host_doc.status != old_status:
+        publish_status_delta({host_doc.name: host_doc.status}, host_doc.last_status_check)
+
+def refresh_host_health(hosts=None):
+    """
+    Refresh the agent health fields of many hosts, one SSH round trip each.
+
+    Leaves ``status`` alone; that belongs to the connectivity monitor.
+    """
+    hosts = hosts or frappe.get_all("Telegraf Host", filters={"status": ["!=", "Disabled"]}, pluck="name")
+    specs = []
+    for hostname in hosts:
+        try:
+            host_doc = frappe.get_doc("Telegraf Host", hostname)
+            spec = _get_connection_spec(hostname, host_doc)
+            spec["config_path"] = host_doc.telegraf_config_path or "/etc/telegraf/telegraf.conf"
+            specs.append(spec)
+        except Exception as e:
+            frappe.logger().error(f"Skipping health check for {hostname}: {str(e)}")
+
+    checked_at = now()
+    results = run_on_hosts(
+        specs,
+        lambda client, spec: probe_health(client, spec["config_path"]),
+        concurrency=frappe.conf.get("telegraf_health_concurrency") or 20,
+        name="health"
+    )
+    for result in results:
+        if result["ok"]:
+            frappe.db.set_value(
+                "Telegraf Host", result["host"],
+                dict(health_fields(result["message"]), last_health_check=checked_at),
+                update_modified=False
+            )
+    frappe.db.commit()
+
+    failed = [result["host"] for result in results if not result["ok"]]
+    if failed:
+        frappe.logger().warning(f"Health check failed for {len(failed)} hosts: {', '.join(failed[:20])}")
+    return {"checked": len(results), "failed": len(failed)}
+
+@frappe.whitelist()
+def get_latency_stats(hostnames=None, window=3600):
+    """Latency percentiles, loss and trend per host over the last ``window`` seconds."""
+    try:
+        hostnames = frappe.parse_json(hostnames) if hostnames else None
+        if isinstance(hostnames, str):
+            hostnames = [hostnames]
+        if not hostnames:
+            hostnames = frappe.get_all("Telegraf Host", pluck="name")
+        
+        return {
+            "status": "success",
+            "window": cint(window),
+            "latency": probe_latency.get_latency_stats(hostnames, cint(window) or 3600)
+        }
+    except Exception as e:
+        frappe.log_error(f"Error getting latency stats: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist()
+def get_agent_metrics(hostnames=None):
+    """Latest internal metrics of agents probed over HTTP, by host."""
+    try:
+        hostnames = frappe.parse_json(hostnames) if hostnames else None
+        if isinstance(hostnames, str):
+            hostnames = [hostnames]
+        if not hostnames:
+            hostnames = frappe.get_all("Telegraf Host", filters={"probe_mode": "HTTP"}, pluck="name")
+
+        return {
+            "status": "success",
+            "agents": http_probe.get_agent_metrics(hostnames)
+        }
+    except Exception as e:
+        frappe.log_error(f"Error getting agent metrics: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
 @frappe.whitelist()
 def trigger_status_check():
     """Manual trigger for status check - for testing"""
@@ -1,12 +1,13 @@
 frappe.listview_settings['Telegraf Host'] = {
-    add_fields: ["status", "ip_address", "last_status_check"],
+    add_fields: ["status", "ip_address", "last_status_check", "telegraf_service_state", "telegraf_version", "load_average", "last_error"],
     
     get_indicator: function(doc) {
         const status_colors = {
             "Active": "green",
             "Down": "red", 
             "Inactive": "orange",
-            "Unknown": "grey"
+            "Unknown": "grey",
+            "Flapping": "yellow"
         };
         
         return [__(doc.status), status_colors[doc.status] || "grey", "status,=," + doc.status];
@@ -101,13 +102,33 @@ frappe.listview_settings['Telegraf Host'] = {
             ]);
         });
         
-        // Auto refresh every 30 seconds
-        if (!listview.auto_refresh_interval) {
-            listview.auto_refresh_interval = setInterval(() => {
-                if (cur_list && cur_list.doctype === 'Telegraf Host') {
+        // Apply status deltas pushed by the monitoring cycle instead of polling
+        if (!listview.status_delta_handler) {
+            listview.status_delta_handler = function(delta) {
+                if (!cur_list || cur_list.doctype !== 'Telegraf Host') return;
+
+                // Missed an event: fall back to a fresh snapshot
+                if (listview.status_seq && delta.seq !== listview.status_seq + 1) {
+                    listview.status_seq = delta.seq;
                     cur_list.refresh();
+                    return;
+                }
+                listview.status_seq = delta.seq;
+
+                let touched = false;
+                delta.changes.forEach(([name, status]) => {
+                    const row = (listview.data || []).find(d => d.name === name);
+                    if (row) {
+                        row.status = status;
+                        row.last_status_check = delta.checked_at;
+                        touched = true;
+                    }
+                });
+                if (touched) {
+                    listview.render();
                 }
-            }, 30000); // 30 seconds
+            };
+            frappe.realtime.on('telegraf_status_delta', listview.status_delta_handler);
         }
     },
     
@@ -117,7 +138,8 @@ frappe.listview_settings['Telegraf Host'] = {
                 "Active": "green",
                 "Down": "red",
                 "Inactive": "orange", 
-                "Unknown": "grey"
+                "Unknown": "grey",
+                "Flapping": "yellow"
             };
             
             return `<span class="indicator ${colors[value] || 'grey'}">${value}</span>`;
@@ -131,6 +153,17 @@ frappe.listview_settings['Telegraf Host'] = {
         ip_address: function(value, field, doc) {
             if (!value) return '-';
             return `<code>${value}</code>`;
+        },
+        
+        telegraf_version: function(value, field, doc) {
+            if (!value) return '-';
+            const color = doc.last_error ? 'red' : (doc.telegraf_service_state === 'active' ? 'green' : 'orange');
+            const title = [
+                doc.telegraf_service_state && __('Service: {0}', [doc.telegraf_service_state]),
+                doc.load_average && __('Load: {0}', [doc.load_average]),
+                doc.last_error
+            ].filter(Boolean).join('\n');
+            return `<span class="indicator ${color}" title="${frappe.utils.escape_html(title)}">${value}</span>`;
         }
     }
 };
@@ -223,33 +256,104 @@ frappe.listview_settings['Telegraf Host'].bulk_operations = [
     {
         label: __('Restart Telegraf Service'),
         action: function(selected_docs) {
-            if (selected_docs.length === 0) {
-                frappe.msgprint(__('Please select hosts'));
-                return;
-            }
-            
-            frappe.confirm(
-                __('Restart Telegraf service on {0} selected hosts?', [selected_docs.length]),
-                function() {
-                    selected_docs.forEach(function(doc_name) {
-                        frappe.call({
-                            method: 'frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host.telegraf_host.manage_telegraf_service',
-                            args: {
-                                hostname: doc_name,
-                                action: 'restart'
-                            },
-                            callback: function(r) {
-                                if (r.message && r.message.status === 'success') {
-                                    frappe.show_alert({
-                                        message: __('Service restarted on {0}', [doc_name]),
-                                        indicator: 'green'
-                                    });
-                                }
-                            }
-                        });
+            run_bulk_service_action(selected_docs, 'restart');
+        }
+    },
+    {
+        label: __('Reload Telegraf Service'),
+        action: function(selected_docs) {
+            run_bulk_service_action(selected_docs, 'reload');
+        }
+    }
+];
+
+
+// Fan a service action out to many hosts in one background job and follow its progress
+function run_bulk_service_action(selected_docs, action) {
+    if (selected_docs.length === 0) {
+        frappe.msgprint(__('Please select hosts'));
+        return;
+    }
+
+    frappe.confirm(
+        __('{0} Telegraf service on {1} selected hosts?', [action.charAt(0).toUpperCase() + action.slice(1), selected_docs.length]),
+        function() {
+            frappe.call({
+                method: 'frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host.telegraf_host.bulk_manage_telegraf_service',
+                args: {
+                    action: action,
+                    hosts: selected_docs
+                },
+                callback: function(r) {
+                    if (r.message && r.message.job_id) {
+                        show_bulk_service_progress(r.message.job_id, action, r.message.total);
+                    }
+                },
+                error: function() {
+                    frappe.show_alert({
+                        message: __('Failed to start bulk {0}', [action]),
+                        indicator: 'red'
                     });
                 }
-            );
+            });
         }
+    );
+}
+
+function show_bulk_service_progress(job_id, action, total) {
+    let done = 0;
+    let failed = 0;
+
+    const progress_dialog = new frappe.ui.Dialog({
+        title: __('Telegraf {0} in progress', [action]),
+        fields: [
+            {
+                fieldtype: 'HTML',
+                fieldname: 'progress_html'
+            }
+        ],
+        primary_action_label: __('Close'),
+        primary_action: function() {
+            progress_dialog.hide();
+        }
+    });
+
+    function update_progress(extra) {
+        progress_dialog.fields_dict.progress_html.$wrapper.html(`
+            <div class="progress mb-3">
+                <div class="progress-bar" role="progressbar"
+                     style="width: ${total ? (done/total)*100 : 100}%">
+                    ${done}/${total}
+                </div>
+            </div>
+            <p>Completed: ${done - failed} | Errors: ${failed}</p>
+            ${extra || ''}
+        `);
     }
-];
+
+    function on_progress(data) {
+        if (data.job_id !== job_id) return;
+        done = data.done;
+        failed = data.failed;
+        update_progress();
+    }
+
+    function on_done(data) {
+        if (data.job_id !== job_id) return;
+        frappe.realtime.off('telegraf_bulk_service_progress', on_progress);
+        frappe.realtime.off('telegraf_bulk_service_done', on_done);
+
+        const failures = (data.failed || []).map(f => `<li><b>${f.host}</b>: ${frappe.utils.escape_html(f.message || '')}</li>`).join('');
+        update_progress(failures ? `<ul>${failures}</ul>` : '');
+        frappe.show_alert({
+            message: __('{0} finished: {1} successful, {2} errors', [action, data.succeeded, (data.failed || []).length]),
+            indicator: (data.failed || []).length ? 'orange' : 'green'
+        });
+        cur_list && cur_list.refresh();
+    }
+
+    frappe.realtime.on('telegraf_bulk_service_progress', on_progress);
+    frappe.realtime.on('telegraf_bulk_service_done', on_done);
+    update_progress();
+    progress_dialog.show();
+}
@@ -1,6 +1,8 @@
 import frappe
 from frappe.model.document import Document
 
+from frappe_telegraf_ui.monitoring import history, log_counters
+
 class TelegrafHostLog(Document):
     def validate(self):
         """Validate log entry before saving"""
@@ -16,49 +18,64 @@ class TelegrafHostLog(Document):
         if not self.timestamp:
             self.timestamp = frappe.utils.now()
     
+    def after_insert(self):
+        """Count the new row in the log statistics"""
+        log_counters.apply_after_commit([self])
+    
     def on_update(self):
         """Handle post-save operations"""
         pass
     
     def on_trash(self):
         """Handle before delete operations"""
-        pass
+        log_counters.apply_after_commit([self], sign=-1)
+
+# Indexes for the query paths of this module and tasks.py:
+# per-host history, per-event-type windows and timestamp-only retention scans
+LOG_INDEXES = {
+    "host_timestamp_index": ["host", "timestamp"],
+    "event_type_timestamp_index": ["event_type", "timestamp"],
+    "timestamp_index": ["timestamp"],
+}
+
+def on_doctype_update():
+    """Create composite indexes that can't be declared in the doctype JSON."""
+    for index_name, columns in LOG_INDEXES.items():
+        frappe.db.add_index("Telegraf Host Log", columns, index_name)
 
 @frappe.whitelist()
-def get_host_logs(hostname, limit=50):
-    """Get logs for a specific host"""
+def get_host_logs(hostname, limit=50, cursor=None):
+    """Get logs for a specific host, newest first; pass ``next_cursor`` back for the next page"""
     try:
-        logs = frappe.get_all(
-            "Telegraf Host Log",
-            filters={"host": hostname},
-            fields=["name", "event_type", "old_status", "new_status", "response_time", "timestamp", "details"],
-            order_by="timestamp desc",
-            limit=limit
+        where, values = history.host_logs_filter(hostname)
+        logs, next_cursor = history.fetch_page(
+            where, values,
+            ["event_type", "old_status", "new_status", "response_time", "details"],
+            cursor=cursor,
+            page_size=limit
         )
-        return {"status": "success", "logs": logs}
+        return {"status": "success", "logs": logs, "next_cursor": next_cursor}
     except Exception as e:
         frappe.log_error(f"Error getting host logs: {str(e)}")
         return {"status": "error", "message": str(e)}
 
 @frappe.whitelist()
-def get_recent_status_changes(days=7):
-    """Get recent status changes across all hosts"""
+def get_recent_status_changes(days=7, limit=history.DEFAULT_PAGE_SIZE, cursor=None):
+    """Get recent status changes across all hosts, one bounded page at a time"""
     try:
         from frappe.utils import add_to_date, get_datetime
         
-        since_date = add_to_date(get_datetime(), days=-days)
+        since_date = add_to_date(get_datetime(), days=-frappe.utils.cint(days))
         
-        logs = frappe.get_all(
-            "Telegraf Host Log",
-            filters={
-                "event_type": "Status Change",
-                "timestamp": [">=", since_date]
-            },
-            fields=["host", "old_status", "new_status", "timestamp", "response_time"],
-            order_by="timestamp desc"
+        where, values = history.status_changes_filter(since_date)
+        logs, next_cursor = history.fetch_page(
+            where, values,
+            ["host", "old_status", "new_status", "response_time"],
+            cursor=cursor,
+            page_size=limit
         )
         
-        return {"status": "success", "logs": logs}
+        return {"status": "success", "logs": logs, "next_cursor": next_cursor}
     except Exception as e:
         frappe.log_error(f"Error getting recent status changes: {str(e)}")
         return {"status": "error", "message": str(e)}
@@ -67,26 +84,19 @@ def get_recent_status_changes(days=7):
 def cleanup_old_logs(days=30):
     """Clean up logs older than specified days"""
     try:
-        from frappe.utils import add_to_date, get_datetime
-        
-        cutoff_date = add_to_date(get_datetime(), days=-days)
-        
-        old_logs = frappe.get_all(
-            "Telegraf Host Log",
-            filters={"timestamp": ["<", cutoff_date]},
-            fields=["name"]
-        )
+        from frappe_telegraf_ui.monitoring.retention import purge_expired
         
-        count = 0
-        for log in old_logs:
-            frappe.delete_doc("Telegraf Host Log", log.name, ignore_permissions=True)
-            count += 1
+        # One-off pass with its own time budget; never moves the scheduled cursor
+        stats = purge_expired(policy={"default": frappe.utils.cint(days)}, budget=20, cursor_key=None)
         
-        frappe.db.commit()
+        message = f"Cleaned up {stats['deleted']} log entries older than {days} days ({stats['rows_per_sec']} rows/s)"
+        if not stats["complete"]:
+            message += ". More remain, run cleanup again to continue"
         
         return {
             "status": "success", 
-            "message": f"Cleaned up {count} log entries older than {days} days"
+            "message": message,
+            "stats": stats
         }
     except Exception as e:
         frappe.log_error(f"Error cleaning up logs: {str(e)}")
@@ -96,43 +106,9 @@ def cleanup_old_logs(days=30):
 def get_log_statistics():
     """Get statistics about logs"""
     try:
-        # Count by event type
-        event_stats = frappe.db.sql("""
-            SELECT event_type, COUNT(*) as count
-            FROM `tabTelegraf Host Log`
-            GROUP BY event_type
-            ORDER BY count DESC
-        """, as_dict=True)
-        
-        # Count by host
-        host_stats = frappe.db.sql("""
-            SELECT host, COUNT(*) as count
-            FROM `tabTelegraf Host Log`
-            GROUP BY host
-            ORDER BY count DESC
-            LIMIT 10
-        """, as_dict=True)
-        
-        # Recent activity (last 24 hours)
-        from frappe.utils import add_to_date, get_datetime
-        yesterday = add_to_date(get_datetime(), hours=-24)
-        
-        recent_count = frappe.db.count(
-            "Telegraf Host Log",
-            filters={"timestamp": [">=", yesterday]}
-        )
-        
-        total_logs = frappe.db.count("Telegraf Host Log")
-        
-        return {
-            "status": "success",
-            "statistics": {
-                "total_logs": total_logs,
-                "recent_activity": recent_count,
-                "event_types": event_stats,
-                "top_hosts": host_stats
-            }
-        }
+        # Counters are maintained on write; no table scans here.
+        # Availability lives in telegraf_host_rollup.get_fleet_uptime.
+        return {"status": "success", "statistics": log_counters.get_statistics(top=10)}
     except Exception as e:
         frappe.log_error(f"Error getting log statistics: {str(e)}")
         return {"status": "error", "message": str(e)}
\ No newline at end of file
@@ -50,49 +50,72 @@ frappe.listview_settings['Telegraf Host Log'] = {
                 method: 'frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host_log.telegraf_host_log.get_log_statistics',
                 callback: function(r) {
                     if (r.message && r.message.status === 'success') {
-                        const stats = r.message.statistics;
-                        
-                        let html = `
-                            <div class="row">
-                                <div class="col-md-6">
-                                    <h5>Overall Statistics</h5>
-                                    <p><strong>Total Logs:</strong> ${stats.total_logs}</p>
-                                    <p><strong>Recent Activity (24h):</strong> ${stats.recent_activity}</p>
-                                    
-                                    <h6>Event Types</h6>
-                                    <ul>
-                        `;
-                        
-                        stats.event_types.forEach(event => {
-                            html += `<li>${event.event_type}: ${event.count}</li>`;
-                        });
-                        
-                        html += `
-                                    </ul>
-                                </div>
-                                <div class="col-md-6">
-                                    <h6>Top Hosts by Log Count</h6>
-                                    <ul>
-                        `;
-                        
-                        stats.top_hosts.forEach(host => {
-                            html += `<li>${host.host}: ${host.count}</li>`;
-                        });
-                        
-                        html += `
-                                    </ul>
-                                </div>
-                            </div>
-                        `;
-                        
-                        frappe.msgprint({
-                            title: __('Log Statistics'),
-                            message: html,
-                            wide: true
+                        // Availability comes from the rollups, in a call of its own
+                        frappe.call({
+                            method: 'frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host_rollup.telegraf_host_rollup.get_fleet_uptime',
+                            args: { days: 30 },
+                            callback: function(u) {
+                                const uptime = u.message && u.message.status === 'success' ? u.message : {};
+                                show_statistics(r.message.statistics, uptime);
+                            }
                         });
                     }
                 }
             });
+            
+            function show_statistics(stats, uptime) {
+                let html = `
+                    <div class="row">
+                        <div class="col-md-6">
+                            <h5>Overall Statistics</h5>
+                            <p><strong>Total Logs:</strong> ${stats.total_logs}</p>
+                            <p><strong>Recent Activity (24h):</strong> ${stats.recent_activity}</p>
+                            <p><strong>Fleet Uptime (30d):</strong> ${uptime.uptime_percent == null ? '-' : uptime.uptime_percent + '%'}</p>
+                            
+                            <h6>Event Types</h6>
+                            <ul>
+                `;
+                
+                stats.event_types.forEach(event => {
+                    html += `<li>${event.event_type}: ${event.count}</li>`;
+                });
+                
+                html += `
+                            </ul>
+                        </div>
+                        <div class="col-md-6">
+                            <h6>Top Hosts by Log Count</h6>
+                            <ul>
+                `;
+                
+                stats.top_hosts.forEach(host => {
+                    html += `<li>${host.host}: ${host.count}</li>`;
+                });
+                
+                html += `
+                            </ul>
+                            
+                            <h6>Lowest Uptime (30d)</h6>
+                            <ul>
+                `;
+                
+                (uptime.lowest_uptime || []).forEach(host => {
+                    const latency = host.response_avg == null ? '' : `, avg ${host.response_avg.toFixed(2)} ms`;
+                    html += `<li>${host.host}: ${host.uptime_percent}%${latency}</li>`;
+                });
+                
+                html += `
+                            </ul>
+                        </div>
+                    </div>
+                `;
+                
+                frappe.msgprint({
+                    title: __('Log Statistics'),
+                    message: html,
+                    wide: true
+                });
+            }
         });
     },
     
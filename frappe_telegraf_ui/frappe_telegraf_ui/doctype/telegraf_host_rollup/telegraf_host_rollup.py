@@ -0,0 +1,52 @@
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_to_date, cint, get_datetime
+
+class TelegrafHostRollup(Document):
+    """Hourly or daily availability and latency of one host, written by monitoring.rollup"""
+    pass
+
+def on_doctype_update():
+    """Index the (host, granularity, bucket) lookups of reports and the rollup job."""
+    frappe.db.add_index("Telegraf Host Rollup", ["granularity", "bucket_start"], "granularity_bucket_index")
+    frappe.db.add_index("Telegraf Host Rollup", ["host", "granularity", "bucket_start"], "host_granularity_bucket_index")
+
+@frappe.whitelist()
+def get_host_availability(host=None, days=30, granularity="Day"):
+    """Uptime and response time per host over the last ``days`` days, from rollups"""
+    try:
+        from frappe_telegraf_ui.monitoring.rollup import floor_day, get_availability
+        
+        end = get_datetime()
+        start = floor_day(add_to_date(end, days=-cint(days)))
+        hosts = [host] if host else None
+        
+        return {
+            "status": "success",
+            "availability": get_availability(start, end, granularity, hosts)
+        }
+    except Exception as e:
+        frappe.log_error(f"Error getting host availability: {str(e)}")
+        return {"status": "error", "message": str(e)}
+
+@frappe.whitelist()
+def get_fleet_uptime(days=30, limit=10):
+    """Average uptime of the fleet and the hosts with the lowest, over the last ``days`` days"""
+    try:
+        from frappe_telegraf_ui.monitoring.rollup import floor_day, get_availability
+        
+        end = get_datetime()
+        availability = [
+            row for row in get_availability(floor_day(add_to_date(end, days=-cint(days))), end)
+            if row.uptime_percent is not None
+        ]
+        uptimes = [row.uptime_percent for row in availability]
+        
+        return {
+            "status": "success",
+            "uptime_percent": round(sum(uptimes) / len(uptimes), 3) if uptimes else None,
+            "lowest_uptime": sorted(availability, key=lambda row: row.uptime_percent)[:cint(limit)]
+        }
+    except Exception as e:
+        frappe.log_error(f"Error getting fleet uptime: {str(e)}")
+        return {"status": "error", "message": str(e)}
@@ -127,19 +127,22 @@ app_license = "MIT"
 
 scheduler_events = {
     "cron": {
-        "* * * * *": [  # Every minute
-            "frappe_telegraf_ui.tasks.check_all_hosts_status"
+        "* * * * *": [  # Every minute, fanned out to one job per shard
+            "frappe_telegraf_ui.tasks.dispatch_host_checks"
         ],
-        "0 */6 * * *": [  # Every 6 hours
+        "0 * * * *": [  # Hourly; each run is time-boxed and resumes the last one
             "frappe_telegraf_ui.tasks.cleanup_old_logs"
         ]
     },
     "hourly": [
-        "frappe_telegraf_ui.tasks.update_telegraf_configs"
+        "frappe_telegraf_ui.tasks.update_telegraf_configs",
+        "frappe_telegraf_ui.tasks.rollup_host_logs",
+        "frappe_telegraf_ui.tasks.refresh_host_health"
     ],
     "daily": [
         "frappe_telegraf_ui.tasks.generate_daily_report",
-        "frappe_telegraf_ui.tasks.backup_configurations"
+        "frappe_telegraf_ui.tasks.backup_configurations",
+        "frappe_telegraf_ui.tasks.reconcile_log_counters"
     ],
     "weekly": [
         "frappe_telegraf_ui.tasks.cleanup_old_backups"
@@ -0,0 +1,150 @@
+# frappe_telegraf_ui/monitoring/cycle_lock.py
+
+"""
+Site-wide lock around a monitoring cycle.
+
+The per-minute dispatcher takes the lock for all the shards it enqueues and
+every shard job releases its part; the last one out drops the lock. A manual
+full check takes it for itself. While it is held a new cycle does not start:
+with ``telegraf_cycle_overrun`` set to ``skip`` it is dropped, with the
+default ``catch_up`` it is remembered and one catch-up cycle is dispatched as
+soon as the running one finishes, however many were missed.
+
+The lock expires after ``telegraf_cycle_lock_ttl`` seconds (default 180) so a
+killed worker cannot block monitoring for good. Hold times go to the
+``cycle_lock_hold_seconds`` histogram; hold times, overruns and catch-ups are
+also kept in Redis for ``get_stats``.
+"""
+
+import time
+
+import frappe
+from frappe.utils import now
+from redis import Redis
+from redis.exceptions import WatchError
+
+from frappe_telegraf_ui.monitoring import store, telemetry
+
+LOCK_KEY = "telegraf_cycle_lock"
+PARTS_KEY = "telegraf_cycle_lock_parts:"
+CATCH_UP_KEY = "telegraf_cycle_catch_up"
+STATS_KEY = "telegraf_cycle_stats"
+COUNTS_KEY = "telegraf_cycle_counts"
+
+DEFAULT_TTL = 180
+OVERRUN_ACTIONS = ("skip", "catch_up")
+
+
+def get_ttl():
+    return frappe.conf.get("telegraf_cycle_lock_ttl") or DEFAULT_TTL
+
+
+def get_overrun_action():
+    action = frappe.conf.get("telegraf_cycle_overrun") or "catch_up"
+    return action if action in OVERRUN_ACTIONS else "catch_up"
+
+
+def _read_lock(cache):
+    """``(token, acquired, holder)`` of the current lock, or None."""
+    value = Redis.get(cache, cache.make_key(LOCK_KEY))
+    if not value:
+        return None
+    token, acquired, holder = frappe.safe_decode(value).split(" ", 2)
+    return token, float(acquired), holder
+
+
+def acquire(parts=1, holder="scheduled", on_busy="skip"):
+    """
+    Take the lock for a cycle released in ``parts`` calls to ``release``.
+
+    Returns the lock token, or None if another cycle holds the lock; that
+    overrun is recorded and, with ``on_busy="catch_up"``, remembered.
+    """
+    cache = frappe.cache()
+    token = frappe.generate_hash(length=12)
+    ttl = get_ttl()
+    if Redis.set(cache, cache.make_key(LOCK_KEY), f"{token} {time.time()} {holder}", nx=True, ex=ttl):
+        pipe = cache.pipeline(transaction=False)
+        pipe.set(cache.make_key(PARTS_KEY + token), parts, ex=ttl)
+        # This cycle is the catch-up for anything missed before it
+        pipe.delete(cache.make_key(CATCH_UP_KEY))
+        pipe.execute()
+        return token
+
+    if on_busy == "catch_up":
+        Redis.set(cache, cache.make_key(CATCH_UP_KEY), 1, ex=ttl)
+    current = _read_lock(cache)
+    held_for = time.time() - current[1] if current else 0
+    frappe.logger().warning(
+        f"Monitoring cycle ({current[2] if current else 'unknown'}) still running after "
+        f"{held_for:.1f}s; {holder} cycle {'deferred' if on_busy == 'catch_up' else 'skipped'}"
+    )
+    store.hincrby_many(COUNTS_KEY, {f"overrun_{on_busy}": 1})
+    telemetry.inc("cycle_overruns", holder=holder, action=on_busy)
+    return None
+
+
+def is_held(token):
+    """Whether ``token``'s cycle still holds the lock."""
+    current = _read_lock(frappe.cache())
+    return bool(current) and current[0] == token
+
+
+def release(token, parts=1):
+    """
+    Release ``parts`` of the lock taken with ``token``.
+
+    Returns True when this dropped the lock and a catch-up cycle is due.
+    """
+    cache = frappe.cache()
+    parts_key = cache.make_key(PARTS_KEY + token)
+    left = Redis.decrby(cache, parts_key, parts)
+    if left > 0:
+        return False
+    Redis.delete(cache, parts_key)
+    if left < 0:
+        # The lock expired before this cycle finished
+        return False
+
+    lock_key = cache.make_key(LOCK_KEY)
+    with cache.pipeline() as pipe:
+        try:
+            pipe.watch(lock_key)
+            current = _read_lock(cache)
+            if not current or current[0] != token:
+                return False
+            pipe.multi()
+            pipe.delete(lock_key)
+            pipe.get(cache.make_key(CATCH_UP_KEY))
+            pipe.delete(cache.make_key(CATCH_UP_KEY))
+            _deleted, catch_up, _ = pipe.execute()
+        except WatchError:
+            return False
+
+    _token, acquired, holder = current
+    record_hold(time.time() - acquired, holder, bool(catch_up))
+    return bool(catch_up)
+
+
+def record_hold(seconds, holder, catch_up):
+    store.hset_many(STATS_KEY, {
+        "last_hold": round(seconds, 3),
+        "last_holder": holder,
+        "last_released": now(),
+    })
+    if catch_up:
+        store.hincrby_many(COUNTS_KEY, {"catch_ups": 1})
+        telemetry.inc("cycle_catch_ups")
+    telemetry.observe("cycle_lock_hold_seconds", seconds, holder=holder)
+    telemetry.flush()
+
+
+def get_stats():
+    """Last hold time, overrun and catch-up counts, and the current holder."""
+    cache = frappe.cache()
+    stats = dict(store.hgetall(STATS_KEY), **store.counters(COUNTS_KEY))
+    current = _read_lock(cache)
+    if current:
+        stats.update(held_by=current[2], held_for=round(time.time() - current[1], 3))
+    stats["catch_up_pending"] = bool(Redis.exists(cache, cache.make_key(CATCH_UP_KEY)))
+    return stats
@@ -0,0 +1,90 @@
+# frappe_telegraf_ui/monitoring/history.py
+
+"""
+Keyset pagination over Telegraf Host Log, newest first.
+
+Pages are ordered by ``(timestamp, name)`` descending, so rows inserted while
+a client is paging never shift or repeat entries, and every page costs an
+index range scan from the cursor instead of an ever-growing OFFSET. Cursors
+are opaque strings encoding the last row's ``(timestamp, name)``.
+"""
+
+import base64
+import json
+
+import frappe
+from frappe.utils import get_datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(row):
+    payload = json.dumps([str(row["timestamp"]), row["name"]])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        timestamp, name = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return get_datetime(timestamp), name
+    except Exception:
+        frappe.throw(f"Invalid cursor: {cursor}")
+
+
+def clamp_page_size(page_size):
+    return max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+
+def fetch_page(where, values, fields, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    One page of log rows matching ``where`` (SQL with ``%(name)s`` values).
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is ``None`` on the last
+    page. ``timestamp`` and ``name`` are always selected.
+    """
+    page_size = clamp_page_size(page_size)
+    values = dict(values, page_size=page_size + 1)
+    if cursor:
+        values["cursor_timestamp"], values["cursor_name"] = decode_cursor(cursor)
+        where = f"""({where}) AND (
+            timestamp < %(cursor_timestamp)s
+            OR (timestamp = %(cursor_timestamp)s AND name < %(cursor_name)s)
+        )"""
+
+    columns = ", ".join(dict.fromkeys(["name", "timestamp", *fields]))
+    rows = frappe.db.sql(f"""
+        SELECT {columns}
+        FROM `tabTelegraf Host Log`
+        WHERE {where}
+        ORDER BY timestamp DESC, name DESC
+        LIMIT %(page_size)s
+    """, values, as_dict=True)
+
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def iter_pages(where, values, fields, page_size=DEFAULT_PAGE_SIZE, cursor=None):
+    """Yield pages until the result is exhausted, holding one page at a time."""
+    while True:
+        rows, cursor = fetch_page(where, values, fields, cursor, page_size)
+        if rows:
+            yield rows
+        if not cursor:
+            return
+
+
+def iter_rows(where, values, fields, page_size=MAX_PAGE_SIZE):
+    for page in iter_pages(where, values, fields, page_size):
+        yield from page
+
+
+def host_logs_filter(hostname):
+    return "host = %(host)s", {"host": hostname}
+
+
+def status_changes_filter(since):
+    return "event_type = 'Status Change' AND timestamp >= %(since)s", {"since": since}
@@ -0,0 +1,203 @@
+# frappe_telegraf_ui/monitoring/http_probe.py
+
+"""
+HTTP probing of the Telegraf agent itself.
+
+Instead of checking that sshd accepts connections, a host in HTTP mode is
+probed through the agent's ``outputs.health`` endpoint (200 healthy, 503
+not) and, if configured, its ``outputs.prometheus_client`` endpoint, whose
+``internal_*`` metrics give gather errors, dropped metrics and output buffer
+usage. Requests use a minimal HTTP/1.1 client on asyncio streams so they run
+in the same event loop as the TCP probes. Each request gets its own
+connection: the event loop only lives for one cycle and every host is its
+own endpoint, so there is nothing worth keeping alive.
+"""
+
+import asyncio
+import re
+import ssl
+import time
+from urllib.parse import urlsplit
+
+from frappe_telegraf_ui.monitoring import store, telemetry
+
+AGENT_METRICS_KEY = "telegraf_agent_metrics"
+
+DEFAULT_HEALTH_PORT = 8080
+MAX_BODY = 4 * 1024 * 1024
+
+METRIC_LINE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{([^}]*)\})?\s+(\S+)")
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+class HTTPProbeError(Exception):
+    pass
+
+
+async def _read_body(reader, headers):
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks, size = [], 0
+        while True:
+            length = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if length == 0:
+                await reader.readuntil(b"\r\n")
+                return b"".join(chunks)
+            size += length
+            if size > MAX_BODY:
+                raise HTTPProbeError("Response body too large")
+            chunks.append(await reader.readexactly(length))
+            await reader.readexactly(2)
+    if "content-length" in headers:
+        length = int(headers["content-length"])
+        if length > MAX_BODY:
+            raise HTTPProbeError("Response body too large")
+        return await reader.readexactly(length)
+    # No framing: the body runs until the server closes the connection
+    return await reader.read(MAX_BODY)
+
+
+async def http_get(url):
+    """
+    GET ``url``; returns ``(status, body)``.
+
+    Has no timeout of its own; callers bound the whole exchange.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme or "http"
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    context = ssl.create_default_context() if scheme == "https" else None
+    reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=context)
+
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            "Accept: text/plain\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            key, sep, value = line.partition(":")
+            if sep:
+                headers[key.strip().lower()] = value.strip()
+        body = await _read_body(reader, headers)
+    finally:
+        writer.close()
+    return status, body
+
+
+def parse_internal_metrics(text):
+    """Agent health from Prometheus text exposing Telegraf's ``inputs.internal``."""
+    gather_errors = metrics_dropped = buffer_size = buffer_limit = 0
+    buffer_usage = 0.0
+    buffers = {}
+    for line in text.splitlines():
+        if not line.startswith("internal_"):
+            continue
+        match = METRIC_LINE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.group(1), dict(LABEL.findall(match.group(3) or "")), match.group(4)
+        try:
+            value = float(value)
+        except ValueError:
+            continue
+        if name == "internal_agent_gather_errors":
+            gather_errors += value
+        elif name in ("internal_agent_metrics_dropped", "internal_write_metrics_dropped"):
+            metrics_dropped += value
+        elif name in ("internal_write_buffer_size", "internal_write_buffer_limit"):
+            output = labels.get("output", "") + "|" + labels.get("alias", "")
+            buffers.setdefault(output, {})[name.rsplit("_", 1)[1]] = value
+
+    for buffer in buffers.values():
+        buffer_size += buffer.get("size", 0)
+        buffer_limit += buffer.get("limit", 0)
+        if buffer.get("limit"):
+            buffer_usage = max(buffer_usage, buffer.get("size", 0) / buffer["limit"])
+
+    return {
+        "gather_errors": int(gather_errors),
+        "metrics_dropped": int(metrics_dropped),
+        "buffer_size": int(buffer_size),
+        "buffer_limit": int(buffer_limit),
+        "buffer_usage": round(buffer_usage * 100, 2),
+    }
+
+
+def endpoint_url(value, ip_address, default_port, default_path="/"):
+    """A full URL from a configured endpoint, which may be just ``:port/path``."""
+    value = (value or "").strip()
+    if not value:
+        return f"http://{ip_address}:{default_port}{default_path}"
+    if value.startswith((":", "/")):
+        return f"http://{ip_address}{value}"
+    return value
+
+
+async def _timed_get(url, timeout):
+    """``(status, body)`` of a GET bounded by ``timeout``, or None if it failed."""
+    try:
+        return await asyncio.wait_for(http_get(url), timeout)
+    # Before OSError: TimeoutError is a subclass of it since Python 3.11
+    except asyncio.TimeoutError:
+        telemetry.inc("probe_timeouts", mode="http")
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+            ValueError, HTTPProbeError):
+        pass
+    return None
+
+
+async def check_agent(host_data, timeout):
+    """
+    Probe one agent; returns ``(is_online, response_time_ms, agent)``.
+
+    A healthy health endpoint means online. Without one configured, a
+    successful metrics scrape does. ``agent`` holds the parsed internal
+    metrics, or ``None`` when no metrics endpoint is configured or it did not
+    answer. ``timeout`` bounds the whole probe; the metrics scrape after a
+    health check gets whatever is left of it and never changes the status.
+    """
+    started = time.perf_counter()
+    ip_address = host_data["ip_address"]
+    health_url = host_data.get("health_url")
+    metrics_url = host_data.get("metrics_url")
+    if metrics_url:
+        metrics_url = endpoint_url(metrics_url, ip_address, 9273, "/metrics")
+
+    if health_url or not metrics_url:
+        response = await _timed_get(endpoint_url(health_url, ip_address, DEFAULT_HEALTH_PORT), timeout)
+        metrics = None
+    else:
+        response = metrics = await _timed_get(metrics_url, timeout)
+    response_time = (time.perf_counter() - started) * 1000
+    is_online = response is not None and response[0] == 200
+
+    remaining = timeout - response_time / 1000
+    if metrics_url and response is not None and metrics is None and remaining > 0:
+        metrics = await _timed_get(metrics_url, remaining)
+
+    agent = None
+    if metrics is not None and metrics[0] == 200:
+        agent = parse_internal_metrics(metrics[1].decode(errors="replace"))
+    return is_online, response_time, agent
+
+
+def record_agent_metrics(results):
+    """Keep the latest internal metrics of HTTP-probed agents in Redis."""
+    store.hset_many(AGENT_METRICS_KEY, {
+        result["name"]: dict(result["agent"], checked_at=time.time())
+        for result in results
+        if result.get("agent")
+    })
+
+
+def get_agent_metrics(host_names):
+    return dict(zip(host_names, store.hmget(AGENT_METRICS_KEY, host_names)))
+
+
+def forget(host_name):
+    store.hdel_many(AGENT_METRICS_KEY, [host_name])
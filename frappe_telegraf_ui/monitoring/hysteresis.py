@@ -0,0 +1,107 @@
+# frappe_telegraf_ui/monitoring/hysteresis.py
+
+"""
+Debounced host status: only confirmed transitions reach the database.
+
+Each probe's raw result feeds a small per-host state machine kept in Redis.
+A host is confirmed Down (or Unknown) only after ``down_after`` consecutive
+failed probes, and Active again only after ``up_after`` consecutive good
+ones. A host whose raw result flips ``flap_threshold`` times within
+``flap_window`` seconds is moved to ``Flapping`` and stays there until it has
+been stable for ``flap_clear_after`` seconds.
+"""
+
+import time
+
+import frappe
+
+from frappe_telegraf_ui.monitoring import store
+
+STATE_KEY = "telegraf_status_state"
+
+FLAPPING = "Flapping"
+UP_STATUSES = ("Active",)
+
+
+def get_policy():
+    conf = frappe.conf
+    flap_window = conf.get("telegraf_flapping_window") or 1800
+    return {
+        "down_after": conf.get("telegraf_down_after") or 3,
+        "up_after": conf.get("telegraf_up_after") or 2,
+        "flap_window": flap_window,
+        "flap_threshold": conf.get("telegraf_flapping_threshold") or 5,
+        "flap_clear_after": conf.get("telegraf_flapping_clear_after") or flap_window,
+    }
+
+
+def is_up(status):
+    return status in UP_STATUSES
+
+
+def transition(state, raw_status, confirmed, now, policy):
+    """
+    Feed one raw probe result into a host's state.
+
+    ``confirmed`` is the status currently stored for the host. Returns the new
+    state and the status that should be stored now.
+    """
+    if not state:
+        # Nothing known yet: trust a stored Active/Down, otherwise the first probe
+        if confirmed not in ("Active", "Down", FLAPPING):
+            confirmed = raw_status
+        state = {"raw": raw_status if confirmed == FLAPPING else confirmed, "streak": 0, "flips": []}
+
+    flips = [t for t in state.get("flips", []) if t > now - policy["flap_window"]]
+    if is_up(raw_status) != is_up(state.get("raw") or raw_status):
+        flips.append(now)
+        streak = 1
+    else:
+        streak = state.get("streak", 0) + 1
+
+    needed = policy["up_after"] if is_up(raw_status) else policy["down_after"]
+    if confirmed == FLAPPING:
+        settled = not flips or now - flips[-1] >= policy["flap_clear_after"]
+        if settled and streak >= needed:
+            # Start counting afresh, or the old flips would flag it again
+            confirmed, flips = raw_status, []
+    elif len(flips) >= policy["flap_threshold"]:
+        confirmed = FLAPPING
+    elif is_up(raw_status) != is_up(confirmed) and streak >= needed:
+        confirmed = raw_status
+
+    return {"raw": raw_status, "streak": streak, "flips": flips, "confirmed": confirmed}, confirmed
+
+
+def apply(results, now=None):
+    """
+    Replace each result's ``new_status`` with its debounced status in place.
+
+    The probe's own outcome is kept as ``raw_status``. Returns ``results``.
+    """
+    if not results:
+        return results
+    now = now or time.time()
+    policy = get_policy()
+    names = [result["name"] for result in results]
+    states = store.hmget(STATE_KEY, names)
+
+    updates = {}
+    for result, state in zip(results, states):
+        raw_status = "Unknown" if result.get("error") else result["new_status"]
+        updates[result["name"]], confirmed = transition(
+            state, raw_status, result.get("old_status") or "Unknown", now, policy
+        )
+        result["raw_status"] = raw_status
+        result["new_status"] = confirmed
+
+    store.hset_many(STATE_KEY, updates)
+    return results
+
+
+def forget(host_name):
+    store.hdel_many(STATE_KEY, [host_name])
+
+
+def get_state(host_name):
+    return (store.hmget(STATE_KEY, [host_name]) or [None])[0]
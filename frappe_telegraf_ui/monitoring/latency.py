@@ -0,0 +1,192 @@
+# frappe_telegraf_ui/monitoring/latency.py
+
+"""
+Per-host probe latency kept as fixed-width ring buffers in Redis.
+
+Every probe appends one 8-byte record (uint32 epoch seconds, float32 ms) to
+its host's buffer of ``capacity`` records, overwriting the oldest one once it
+is full. Failed probes are stored as NaN so they count as loss, not latency.
+A whole cycle is written with two pipelined round trips however many hosts
+it probed, and reads decode buffers straight into numpy arrays so percentiles
+and trends for many hosts are computed in a few vectorized operations.
+"""
+
+import time
+
+import frappe
+import numpy as np
+from redis import Redis
+
+INDEX_KEY = "telegraf_latency_index"
+BUFFER_KEY = "telegraf_latency"
+
+RECORD = np.dtype([("ts", "<u4"), ("ms", "<f4")])
+PERCENTILES = (50, 95, 99)
+
+
+def get_capacity():
+    return frappe.conf.get("telegraf_latency_samples") or 1440
+
+
+def _buffer_key(cache, host):
+    return cache.make_key(f"{BUFFER_KEY}|{host}")
+
+
+def encode(timestamp, response_time):
+    return np.array([(int(timestamp), response_time)], dtype=RECORD).tobytes()
+
+
+def record_samples(samples, timestamp=None):
+    """
+    Append one sample per host; ``samples`` maps host name to milliseconds.
+
+    ``None`` marks a failed probe and is stored as NaN.
+    """
+    if not samples:
+        return
+    timestamp = timestamp or time.time()
+    capacity = get_capacity()
+    ttl = frappe.conf.get("telegraf_latency_ttl") or 7 * 86400
+    cache = frappe.cache()
+
+    hosts = list(samples)
+    pipe = cache.pipeline(transaction=False)
+    for host in hosts:
+        pipe.hincrby(cache.make_key(INDEX_KEY), host, 1)
+    slots = pipe.execute()
+
+    pipe = cache.pipeline(transaction=False)
+    for host, slot in zip(hosts, slots):
+        key = _buffer_key(cache, host)
+        value = samples[host]
+        record = encode(timestamp, np.nan if value is None else value)
+        pipe.setrange(key, ((slot - 1) % capacity) * RECORD.itemsize, record)
+        pipe.expire(key, ttl)
+    pipe.execute()
+
+
+def record_results(results, timestamp=None):
+    """Record a probe cycle's results; probes that errored are skipped."""
+    samples = {}
+    for result in results:
+        if not result.get("error"):
+            # The probe's own outcome, not the debounced status
+            online = result.get("raw_status", result["new_status"]) == "Active"
+            samples[result["name"]] = result["response_time"] if online else None
+    record_samples(samples, timestamp)
+
+
+def forget(host):
+    cache = frappe.cache()
+    Redis.hdel(cache, cache.make_key(INDEX_KEY), host)
+    Redis.delete(cache, _buffer_key(cache, host))
+
+
+def load_matrix(hosts):
+    """
+    Buffers of ``hosts`` as one ``(len(hosts), capacity)`` record array.
+
+    Unused slots (and hosts without samples) have ``ts == 0``.
+    """
+    capacity = get_capacity()
+    matrix = np.zeros((len(hosts), capacity), dtype=RECORD)
+    if not hosts:
+        return matrix
+    cache = frappe.cache()
+    raw = Redis.mget(cache, [_buffer_key(cache, host) for host in hosts])
+    for row, value in enumerate(raw):
+        if value:
+            records = np.frombuffer(value[: capacity * RECORD.itemsize], dtype=RECORD)
+            matrix[row, : len(records)] = records
+    return matrix
+
+
+def compute_stats(matrix, since, now=None):
+    """
+    Percentiles, loss and trend per row of a record matrix, from ``since`` on.
+
+    The trend is the least-squares slope of latency over time, in ms per hour.
+    """
+    now = now or time.time()
+    ts = matrix["ts"].astype(np.float64)
+    ms = matrix["ms"].astype(np.float64)
+    in_window = (ts >= since) & (ts > 0)
+
+    probes = in_window.sum(axis=1)
+    answered = in_window & ~np.isnan(ms)
+    samples = answered.sum(axis=1)
+
+    values = np.where(answered, ms, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if values.shape[1]:
+            percentiles = np.nanpercentile(np.where(samples[:, None] > 0, values, 0), PERCENTILES, axis=1)
+        else:
+            percentiles = np.zeros((len(PERCENTILES), len(values)))
+        mean = np.nansum(values, axis=1) / samples
+
+        hours = np.where(answered, (ts - now) / 3600, np.nan)
+        hours_centered = hours - (np.nansum(hours, axis=1) / samples)[:, None]
+        values_centered = values - mean[:, None]
+        slope = (
+            np.nansum(hours_centered * values_centered, axis=1)
+            / np.nansum(hours_centered ** 2, axis=1)
+        )
+        loss = 100.0 * (probes - samples) / probes
+
+    stats = []
+    for row in range(len(matrix)):
+        has_samples = samples[row] > 0
+        entry = {
+            "probes": int(probes[row]),
+            "samples": int(samples[row]),
+            "loss_percent": round(float(loss[row]), 2) if probes[row] else None,
+            "mean": round(float(mean[row]), 3) if has_samples else None,
+            "trend_ms_per_hour": round(float(slope[row]), 3) if samples[row] > 1 and np.isfinite(slope[row]) else None,
+        }
+        for index, percentile in enumerate(PERCENTILES):
+            entry[f"p{percentile}"] = round(float(percentiles[index][row]), 3) if has_samples else None
+        stats.append(entry)
+    return stats
+
+
+def summarize_slots(hosts, since, until, base, width=3600, chunk_size=500):
+    """
+    Answered samples between ``since`` and ``until`` (epoch seconds) per host
+    and ``width``-second slot counted from ``base``.
+
+    Returns ``{(host, slot): (count, sum, min, max)}``. Buffers are loaded
+    ``chunk_size`` hosts at a time to bound memory on large fleets.
+    """
+    slots = {}
+    for offset in range(0, len(hosts), chunk_size):
+        names = hosts[offset:offset + chunk_size]
+        matrix = load_matrix(names)
+        ts = matrix["ts"].astype(np.float64)
+        ms = matrix["ms"].astype(np.float64)
+        rows, cols = np.nonzero((ts >= since) & (ts < until) & (ts > 0) & ~np.isnan(ms))
+        if not len(rows):
+            continue
+
+        values = ms[rows, cols]
+        keys = np.stack([rows, ((ts[rows, cols] - base) // width).astype(np.int64)], axis=1)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        counts = np.bincount(inverse)
+        sums = np.bincount(inverse, weights=values)
+        mins = np.full(len(unique), np.inf)
+        maxs = np.full(len(unique), -np.inf)
+        np.minimum.at(mins, inverse, values)
+        np.maximum.at(maxs, inverse, values)
+
+        for index, (row, slot) in enumerate(unique):
+            slots[(names[row], int(slot))] = (
+                int(counts[index]), float(sums[index]), float(mins[index]), float(maxs[index])
+            )
+    return slots
+
+
+def get_latency_stats(hosts, window=3600):
+    """``{host: stats}`` over the last ``window`` seconds."""
+    now = time.time()
+    stats = compute_stats(load_matrix(hosts), now - window, now)
+    return dict(zip(hosts, stats))
@@ -0,0 +1,164 @@
+# frappe_telegraf_ui/monitoring/log_counters.py
+
+"""
+Telegraf Host Log statistics kept as Redis counters.
+
+Inserts and deletes adjust three structures instead of anyone scanning the
+table: a hash with the total and one counter per event type, a sorted set of
+per-host counts (so the top hosts are a range read) and a hash of per-hour
+insert counts for recent activity. ``reconcile`` recounts everything from the
+table, repairs drift and reports how far off the counters were.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+import frappe
+from frappe.utils import get_datetime, now_datetime
+from redis import Redis
+
+COUNTS_KEY = "telegraf_log_counts"
+HOSTS_KEY = "telegraf_log_host_counts"
+HOURLY_KEY = "telegraf_log_hourly_counts"
+READY_KEY = "telegraf_log_counts_ready"
+
+TOTAL = "total"
+EVENT_PREFIX = "event:"
+
+
+def _hour(timestamp):
+    return get_datetime(timestamp).strftime("%Y-%m-%d %H")
+
+
+def apply(rows, sign=1):
+    """
+    Count ``rows`` (dicts with ``host``, ``event_type`` and ``timestamp``) as
+    inserted, or as deleted with ``sign=-1``, in one round trip.
+    """
+    if not rows:
+        return
+    counts, hosts, hours = Counter(), Counter(), Counter()
+    for row in rows:
+        counts[TOTAL] += sign
+        counts[EVENT_PREFIX + (row.get("event_type") or "")] += sign
+        hosts[row.get("host") or ""] += sign
+        if row.get("timestamp"):
+            hours[_hour(row["timestamp"])] += sign
+
+    cache = frappe.cache()
+    pipe = cache.pipeline(transaction=False)
+    for field, amount in counts.items():
+        pipe.hincrby(cache.make_key(COUNTS_KEY), field, amount)
+    for host, amount in hosts.items():
+        pipe.zincrby(cache.make_key(HOSTS_KEY), amount, host)
+    for hour, amount in hours.items():
+        pipe.hincrby(cache.make_key(HOURLY_KEY), hour, amount)
+    if sign < 0:
+        pipe.zremrangebyscore(cache.make_key(HOSTS_KEY), "-inf", 0)
+    pipe.execute()
+
+
+def apply_after_commit(rows, sign=1):
+    """Count ``rows`` once the current transaction commits, not if it rolls back."""
+    rows = list(rows)
+    frappe.db.after_commit.add(lambda: apply(rows, sign))
+
+
+def is_ready():
+    return bool(frappe.cache().get_value(READY_KEY))
+
+
+def get_statistics(top=10, recent_hours=24):
+    """Totals, per-event-type counts, the ``top`` hosts and recent activity."""
+    if not is_ready():
+        reconcile()
+
+    cache = frappe.cache()
+    now = now_datetime()
+    hours = [_hour(now - timedelta(hours=index)) for index in range(recent_hours)]
+
+    pipe = cache.pipeline(transaction=False)
+    pipe.hgetall(cache.make_key(COUNTS_KEY))
+    pipe.zrevrange(cache.make_key(HOSTS_KEY), 0, top - 1, withscores=True)
+    pipe.hmget(cache.make_key(HOURLY_KEY), hours)
+    counts, top_hosts, recent = pipe.execute()
+
+    counts = {frappe.safe_decode(field): int(value) for field, value in counts.items()}
+    event_types = sorted(
+        (
+            {"event_type": field[len(EVENT_PREFIX):], "count": value}
+            for field, value in counts.items()
+            if field.startswith(EVENT_PREFIX) and value > 0
+        ),
+        key=lambda row: row["count"],
+        reverse=True,
+    )
+    return {
+        "total_logs": counts.get(TOTAL, 0),
+        "recent_activity": sum(int(value) for value in recent if value),
+        "event_types": event_types,
+        "top_hosts": [{"host": frappe.safe_decode(host), "count": int(score)} for host, score in top_hosts],
+    }
+
+
+def count_table(recent_hours=25):
+    """Exact counts from the table, shaped like the Redis structures."""
+    counts = {TOTAL: 0}
+    for row in frappe.db.sql("""
+        SELECT event_type, COUNT(*) AS count FROM `tabTelegraf Host Log` GROUP BY event_type
+    """, as_dict=True):
+        counts[EVENT_PREFIX + (row.event_type or "")] = row.count
+        counts[TOTAL] += row.count
+
+    hosts = {
+        row.host or "": row.count
+        for row in frappe.db.sql("""
+            SELECT host, COUNT(*) AS count FROM `tabTelegraf Host Log` GROUP BY host
+        """, as_dict=True)
+    }
+
+    since = now_datetime().replace(minute=0, second=0, microsecond=0) - timedelta(hours=recent_hours)
+    hours = Counter()
+    for row in frappe.db.sql("""
+        SELECT timestamp FROM `tabTelegraf Host Log` WHERE timestamp >= %s
+    """, since, as_dict=True):
+        hours[_hour(row.timestamp)] += 1
+    return counts, hosts, dict(hours)
+
+
+def reconcile():
+    """Recount from the table, replace the counters and return the drift found."""
+    counts, hosts, hours = count_table()
+    cache = frappe.cache()
+
+    current_counts = {
+        frappe.safe_decode(field): int(value)
+        for field, value in Redis.hgetall(cache, cache.make_key(COUNTS_KEY)).items()
+    }
+    current_hosts = {
+        frappe.safe_decode(host): int(score)
+        for host, score in Redis.zrange(cache, cache.make_key(HOSTS_KEY), 0, -1, withscores=True)
+    }
+    drift = {
+        "total": current_counts.get(TOTAL, 0) - counts[TOTAL],
+        "event_types": {
+            field[len(EVENT_PREFIX):]: current_counts.get(field, 0) - counts.get(field, 0)
+            for field in set(counts) | set(current_counts)
+            if field.startswith(EVENT_PREFIX) and current_counts.get(field, 0) != counts.get(field, 0)
+        },
+        "hosts": sum(
+            1 for host in set(hosts) | set(current_hosts)
+            if current_hosts.get(host, 0) != hosts.get(host, 0)
+        ),
+    }
+
+    pipe = cache.pipeline(transaction=True)
+    pipe.delete(cache.make_key(COUNTS_KEY), cache.make_key(HOSTS_KEY), cache.make_key(HOURLY_KEY))
+    pipe.hset(cache.make_key(COUNTS_KEY), mapping=counts)
+    if hosts:
+        pipe.zadd(cache.make_key(HOSTS_KEY), {host: count for host, count in hosts.items() if count > 0})
+    if hours:
+        pipe.hset(cache.make_key(HOURLY_KEY), mapping=hours)
+    pipe.execute()
+    cache.set_value(READY_KEY, 1)
+    return drift
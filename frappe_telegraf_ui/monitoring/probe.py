@@ -0,0 +1,98 @@
+# frappe_telegraf_ui/monitoring/probe.py
+
+import asyncio
+import time
+
+from frappe_telegraf_ui.monitoring import http_probe, telemetry
+
+
+async def probe_tcp(ip_address, port, timeout):
+    """Open and close a TCP connection, returning (is_online, response_time_ms)."""
+    start_time = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(ip_address, int(port)), timeout
+        )
+    except asyncio.TimeoutError:
+        telemetry.inc("probe_timeouts", mode="tcp")
+        return False, (time.perf_counter() - start_time) * 1000
+    except (OSError, ValueError):
+        return False, (time.perf_counter() - start_time) * 1000
+
+    response_time = (time.perf_counter() - start_time) * 1000
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True, response_time
+
+
+async def _check_host(host_data, semaphore, timeout, deadline):
+    """Async counterpart of tasks.perform_host_check, returning the same dict."""
+    async with semaphore:
+        remaining = deadline - time.monotonic()
+        timeout = max(min(timeout, remaining), 0.001)
+        try:
+            if host_data.get('probe_mode') == "HTTP":
+                is_online, response_time, agent = await http_probe.check_agent(host_data, timeout)
+            else:
+                agent = None
+                is_online, response_time = await probe_tcp(
+                    host_data['ip_address'],
+                    host_data['ssh_port'] or 22,
+                    timeout
+                )
+            result = {
+                "name": host_data['name'],
+                "old_status": host_data.get('status', 'Unknown'),
+                "new_status": "Active" if is_online else "Down",
+                "response_time": response_time,
+                "error": None
+            }
+            if agent is not None:
+                result["agent"] = agent
+            return result
+        except Exception as e:
+            return {
+                "name": host_data['name'],
+                "old_status": host_data.get('status', 'Unknown'),
+                "new_status": "Unknown",
+                "response_time": 0,
+                "error": str(e)
+            }
+
+
+async def probe_hosts(hosts, concurrency=500, timeout=5, deadline=50):
+    """
+    Probe all hosts concurrently, at most ``concurrency`` at a time.
+
+    Hosts whose ``probe_mode`` is ``HTTP`` are checked through the Telegraf
+    agent's health endpoint (see http_probe), the rest by a TCP connect to
+    the SSH port.
+
+    ``deadline`` is a budget in seconds for the whole cycle. Probes still
+    queued or in flight when it runs out are cancelled and left out of the
+    result, so their hosts keep their previous status until the next cycle.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    cycle_deadline = time.monotonic() + deadline
+    tasks = [
+        asyncio.ensure_future(_check_host(host, semaphore, timeout, cycle_deadline))
+        for host in hosts
+    ]
+    if not tasks:
+        return []
+
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return [task.result() for task in tasks if task in done]
+
+
+def run_probe_cycle(hosts, concurrency=500, timeout=5, deadline=50):
+    """Blocking entry point for scheduler jobs; see probe_hosts."""
+    return asyncio.run(probe_hosts(hosts, concurrency, timeout, deadline))
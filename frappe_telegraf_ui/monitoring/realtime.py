@@ -0,0 +1,38 @@
+# frappe_telegraf_ui/monitoring/realtime.py
+
+"""
+Status deltas pushed to the browser.
+
+Each monitoring write-back publishes one ``telegraf_status_delta`` event with
+only the hosts whose status changed. Events carry a sequence number; a client
+that sees a gap reloads the snapshot from ``get_realtime_status``.
+"""
+
+import frappe
+from redis import Redis
+
+DELTA_EVENT = "telegraf_status_delta"
+SEQ_KEY = "telegraf_status_seq"
+
+
+def next_seq():
+    cache = frappe.cache()
+    return Redis.incr(cache, cache.make_key(SEQ_KEY))
+
+
+def current_seq():
+    cache = frappe.cache()
+    return int(Redis.get(cache, cache.make_key(SEQ_KEY)) or 0)
+
+
+def publish_status_delta(changed, checked_at):
+    """Publish ``{host: new_status}`` as one compact event; no-op when empty."""
+    if not changed:
+        return None
+    seq = next_seq()
+    frappe.publish_realtime(DELTA_EVENT, {
+        "seq": seq,
+        "checked_at": checked_at,
+        "changes": [[name, status] for name, status in changed.items()],
+    })
+    return seq
@@ -0,0 +1,138 @@
+# frappe_telegraf_ui/monitoring/retention.py
+
+"""
+Chunked, resumable retention for Telegraf Host Log.
+
+Expired rows are deleted in primary-key order, ``chunk_size`` rows at a time,
+with a commit after each chunk so no single statement holds locks for long.
+A run stops once its time budget is spent and leaves the last deleted name
+behind as a cursor; the next run picks up from there. When a pass reaches the
+end of the table the cursor is cleared and the next run starts a fresh pass.
+
+Retention is configured per event type in site config, in days (0 keeps rows
+forever); event types not listed fall back to ``default``:
+
+    "telegraf_log_retention": {"default": 7, "Config Update": 90}
+"""
+
+import time
+from datetime import timedelta
+
+import frappe
+from frappe.utils import now_datetime
+
+from frappe_telegraf_ui.monitoring import log_counters, store
+
+CURSOR_KEY = "telegraf_retention_cursor"
+STATS_KEY = "telegraf_retention_stats"
+
+DEFAULT_RETENTION_DAYS = 7
+
+
+def get_policy():
+    """Retention in days per event type, plus the ``default`` fallback."""
+    policy = {"default": DEFAULT_RETENTION_DAYS}
+    policy.update(frappe.conf.get("telegraf_log_retention") or {})
+    return policy
+
+
+def build_conditions(policy, now):
+    """
+    WHERE clause and values matching every expired row under ``policy``.
+
+    Returns ``(None, ())`` when the policy keeps everything.
+    """
+    clauses, values = [], []
+    listed = [event_type for event_type in policy if event_type != "default"]
+    for event_type in listed:
+        if policy[event_type]:
+            clauses.append("(event_type = %s AND timestamp < %s)")
+            values += [event_type, now - timedelta(days=policy[event_type])]
+
+    if policy.get("default"):
+        cutoff = now - timedelta(days=policy["default"])
+        if listed:
+            clauses.append("((event_type IS NULL OR event_type NOT IN %s) AND timestamp < %s)")
+            values += [tuple(listed), cutoff]
+        else:
+            clauses.append("timestamp < %s")
+            values.append(cutoff)
+
+    if not clauses:
+        return None, ()
+    return "(" + " OR ".join(clauses) + ")", tuple(values)
+
+
+def _fetch_chunk(conditions, values, cursor, chunk_size):
+    cursor_clause = "AND name > %s" if cursor else ""
+    cursor_values = (cursor,) if cursor else ()
+    return frappe.db.sql(f"""
+        SELECT name, host, event_type, timestamp FROM `tabTelegraf Host Log`
+        WHERE {conditions} {cursor_clause}
+        ORDER BY name
+        LIMIT %s
+    """, values + cursor_values + (chunk_size,), as_dict=True)
+
+
+def _delete_chunk(rows):
+    frappe.db.sql(
+        "DELETE FROM `tabTelegraf Host Log` WHERE name IN %s",
+        (tuple(row["name"] for row in rows),)
+    )
+    frappe.db.commit()
+    log_counters.apply(rows, sign=-1)
+
+
+def purge_expired(policy=None, chunk_size=None, budget=None, cursor_key="scheduled"):
+    """
+    Delete expired log rows until done or ``budget`` seconds have passed.
+
+    ``cursor_key`` names the resume cursor; pass ``None`` for a one-off run
+    that always starts from the beginning. Returns the run's statistics.
+    """
+    conf = frappe.conf
+    policy = policy or get_policy()
+    chunk_size = chunk_size or conf.get("telegraf_retention_chunk_size") or 5000
+    budget = budget if budget is not None else (conf.get("telegraf_retention_budget") or 120)
+
+    conditions, values = build_conditions(policy, now_datetime())
+    stats = {"deleted": 0, "chunks": 0, "complete": True, "policy": policy}
+    started = time.monotonic()
+
+    if conditions:
+        cache = frappe.cache()
+        cursor = cache.hget(CURSOR_KEY, cursor_key) if cursor_key else None
+        stats["resumed_from"] = cursor
+
+        while True:
+            rows = _fetch_chunk(conditions, values, cursor, chunk_size)
+            if rows:
+                _delete_chunk(rows)
+                cursor = rows[-1]["name"]
+                stats["deleted"] += len(rows)
+                stats["chunks"] += 1
+            if len(rows) < chunk_size:
+                cursor = None
+                break
+            if time.monotonic() - started >= budget:
+                stats["complete"] = False
+                break
+
+        if cursor_key:
+            if cursor:
+                cache.hset(CURSOR_KEY, cursor_key, cursor)
+            else:
+                cache.hdel(CURSOR_KEY, cursor_key)
+
+    elapsed = time.monotonic() - started
+    stats["elapsed"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["deleted"] / elapsed, 1) if elapsed > 0 else 0
+    stats["finished_at"] = str(now_datetime())
+    if cursor_key:
+        frappe.cache().hset(STATS_KEY, cursor_key, stats)
+    return stats
+
+
+def get_stats():
+    """Statistics of the last run per cursor."""
+    return store.hgetall(STATS_KEY)
@@ -0,0 +1,310 @@
+# frappe_telegraf_ui/monitoring/rollup.py
+
+"""
+Incremental hourly and daily rollups of Telegraf Host Log.
+
+Raw log rows only live for days; rollups keep per-host availability and
+latency for months. Each run folds the log rows between the stored watermark
+and ``now - lag`` into hourly buckets (time spent in each status and
+transitions), merges them with any partial bucket from the previous run, then
+recomputes the affected daily buckets from the hourly ones. The status a host
+was in at the watermark is the ``last_status`` of its previous hourly bucket,
+so runs need nothing but the rollup table itself.
+
+Log rows are only written on status changes, so response-time min/avg/max
+come from every probe's sample in the latency ring buffers instead. Those
+hold about a day per host, so a rollup that falls further behind than that
+keeps the availability but loses the older latency.
+"""
+
+import hashlib
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+import frappe
+from frappe.utils import get_datetime, get_system_timezone, now_datetime
+
+from frappe_telegraf_ui.monitoring import latency
+
+DOCTYPE = "Telegraf Host Rollup"
+WATERMARK_KEY = "telegraf_rollup_watermark"
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+NAME_LIMIT = 140
+
+STATUS_FIELDS = {
+    "Active": "seconds_active",
+    "Inactive": "seconds_inactive",
+    "Down": "seconds_down",
+    "Unknown": "seconds_unknown",
+    "Flapping": "seconds_flapping",
+}
+
+BUCKET_FIELDS = list(STATUS_FIELDS.values()) + [
+    "transitions", "response_count", "response_sum", "response_min", "response_max",
+    "response_avg", "last_status",
+]
+
+
+def floor_hour(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(value):
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def new_bucket():
+    bucket = {field: 0 for field in STATUS_FIELDS.values()}
+    bucket.update(transitions=0, response_count=0, response_sum=0.0,
+                  response_min=None, response_max=None, last_status=None)
+    return bucket
+
+
+def merge_bucket(target, source):
+    """Fold ``source`` (the later of the two) into ``target``."""
+    for field in STATUS_FIELDS.values():
+        target[field] += source.get(field) or 0
+    for field in ("transitions", "response_count", "response_sum"):
+        target[field] += source.get(field) or 0
+    for field, pick in (("response_min", min), ("response_max", max)):
+        values = [v for v in (target[field], source.get(field)) if v is not None]
+        target[field] = pick(values) if values else None
+    if source.get("last_status"):
+        target["last_status"] = source["last_status"]
+    return target
+
+
+def finish_bucket(bucket):
+    count = bucket["response_count"]
+    bucket["response_avg"] = round(bucket["response_sum"] / count, 3) if count else None
+    return bucket
+
+
+def roll_up(states, events, start, end, samples=None):
+    """
+    Fold ``events`` between ``start`` and ``end`` into hourly buckets.
+
+    ``states`` maps each host to ``{"status", "since"}``: the status it had at
+    ``start`` and when it started being tracked (its creation, if later).
+    ``events`` are log rows ordered by timestamp. ``samples`` maps ``(host,
+    hour)`` to the ``(count, sum, min, max)`` of its probe latencies. Returns
+    ``{(host, hour): bucket}``; every tracked host gets a bucket for every
+    hour it existed in.
+    """
+    buckets = {}
+    states = {host: dict(state) for host, state in states.items()}
+
+    def bucket_for(host, moment):
+        key = (host, floor_hour(moment))
+        if key not in buckets:
+            buckets[key] = new_bucket()
+        return buckets[key]
+
+    def add_time(host, status, since, until):
+        field = STATUS_FIELDS.get(status, "seconds_unknown")
+        while since < until:
+            bucket = bucket_for(host, since)
+            slice_end = min(floor_hour(since) + HOUR, until)
+            bucket[field] += (slice_end - since).total_seconds()
+            bucket["last_status"] = status
+            since = slice_end
+
+    for event in events:
+        host, timestamp = event["host"], get_datetime(event["timestamp"])
+        state = states.setdefault(host, {"status": event.get("old_status") or "Unknown", "since": start})
+
+        if event.get("event_type") == "Status Change" and event.get("new_status"):
+            since = max(state["since"], start)
+            add_time(host, state["status"], since, max(timestamp, since))
+            bucket = bucket_for(host, timestamp)
+            bucket["transitions"] += 1
+            bucket["last_status"] = event["new_status"]
+            state.update(status=event["new_status"], since=max(timestamp, since))
+
+    for host, state in states.items():
+        add_time(host, state["status"], max(state["since"], start), end)
+
+    for (host, hour), (count, total, lowest, highest) in (samples or {}).items():
+        merge_bucket(bucket_for(host, hour), {
+            "response_count": count, "response_sum": total,
+            "response_min": lowest, "response_max": highest,
+        })
+
+    return {key: finish_bucket(bucket) for key, bucket in buckets.items()}
+
+
+def aggregate_daily(hourly_rows):
+    """Daily buckets from hourly rows ordered by ``bucket_start``."""
+    days = {}
+    for row in hourly_rows:
+        key = (row["host"], floor_day(get_datetime(row["bucket_start"])))
+        merge_bucket(days.setdefault(key, new_bucket()), row)
+    return {key: finish_bucket(bucket) for key, bucket in days.items()}
+
+
+def bucket_name(host, granularity, bucket_start):
+    suffix = f"-{granularity[0]}{bucket_start:%Y%m%d%H}"
+    if len(host) + len(suffix) > NAME_LIMIT:
+        # Keep names unique within the 140 character limit
+        digest = hashlib.sha1(host.encode()).hexdigest()[:10]
+        host = f"{host[:NAME_LIMIT - len(suffix) - 11]}~{digest}"
+    return host + suffix
+
+
+def load_samples(hosts, start, end):
+    """Probe latencies per ``(host, hour)`` in ``[start, end)``, from the ring buffers."""
+    timezone = ZoneInfo(get_system_timezone())
+    first_hour = floor_hour(start)
+    slots = latency.summarize_slots(
+        hosts,
+        start.replace(tzinfo=timezone).timestamp(),
+        end.replace(tzinfo=timezone).timestamp(),
+        first_hour.replace(tzinfo=timezone).timestamp(),
+    )
+    return {(host, first_hour + slot * HOUR): values for (host, slot), values in slots.items()}
+
+
+def save_buckets(buckets, granularity):
+    """Replace the rollup rows for ``buckets`` with their new values."""
+    if not buckets:
+        return
+    timestamp = now_datetime()
+    rows = []
+    for (host, bucket_start), bucket in buckets.items():
+        rows.append((
+            bucket_name(host, granularity, bucket_start), timestamp, timestamp,
+            "Administrator", "Administrator", 0, host, granularity, bucket_start,
+            *[bucket[field] for field in BUCKET_FIELDS],
+        ))
+    names = tuple(row[0] for row in rows)
+    frappe.db.sql(f"DELETE FROM `tab{DOCTYPE}` WHERE name IN %s", (names,))
+    frappe.db.bulk_insert(DOCTYPE, [
+        "name", "creation", "modified", "owner", "modified_by", "docstatus",
+        "host", "granularity", "bucket_start", *BUCKET_FIELDS,
+    ], rows)
+
+
+def get_hourly_rows(start, end, fields=None):
+    return frappe.get_all(
+        DOCTYPE,
+        filters={"granularity": "Hour", "bucket_start": ["between", [start, end - timedelta(seconds=1)]]},
+        fields=fields or ["host", "bucket_start", *BUCKET_FIELDS],
+        order_by="bucket_start asc",
+        limit_page_length=0,
+    )
+
+
+def get_watermark():
+    value = frappe.db.get_default(WATERMARK_KEY)
+    if value:
+        return get_datetime(value)
+    first = frappe.db.sql("SELECT MIN(timestamp) FROM `tabTelegraf Host Log`")[0][0]
+    return floor_hour(get_datetime(first)) if first else None
+
+
+def load_states(start, events):
+    """Status of every host at ``start``, from the hourly bucket before it."""
+    previous = {
+        row.host: row.last_status
+        for row in frappe.get_all(
+            DOCTYPE,
+            filters={"granularity": "Hour", "bucket_start": floor_hour(start - timedelta(seconds=1))},
+            fields=["host", "last_status"],
+            limit_page_length=0,
+        )
+    }
+    first_seen = {}
+    for event in events:
+        if event.event_type == "Status Change" and event.old_status:
+            first_seen.setdefault(event.host, event.old_status)
+
+    states = {}
+    for host in frappe.get_all("Telegraf Host", fields=["name", "status", "creation"]):
+        # Previous bucket, else what the first change in range moved away from,
+        # else nothing changed and the current status held throughout
+        status = previous.get(host.name) or first_seen.get(host.name) or host.status or "Unknown"
+        states[host.name] = {"status": status, "since": max(get_datetime(host.creation), start)}
+    return states
+
+
+def roll_up_range(start, end):
+    """Roll up the log rows in ``[start, end)`` and persist the buckets."""
+    events = frappe.db.sql("""
+        SELECT host, event_type, old_status, new_status, response_time, timestamp
+        FROM `tabTelegraf Host Log`
+        WHERE timestamp >= %s AND timestamp < %s
+        ORDER BY timestamp ASC
+    """, (start, end), as_dict=True)
+
+    states = load_states(start, events)
+    hourly = roll_up(states, events, start, end, load_samples(list(states), start, end))
+
+    # The first hour may already hold the part before ``start`` from the last run
+    partial_start = floor_hour(start)
+    if partial_start < start:
+        for row in get_hourly_rows(partial_start, partial_start + HOUR):
+            key = (row.host, partial_start)
+            if key in hourly:
+                hourly[key] = finish_bucket(merge_bucket(new_bucket() | dict(row), hourly[key]))
+    save_buckets(hourly, "Hour")
+
+    first_day, last_day = floor_day(start), floor_day(end - timedelta(seconds=1))
+    save_buckets(aggregate_daily(get_hourly_rows(first_day, last_day + DAY)), "Day")
+
+    return {"events": len(events), "hourly_buckets": len(hourly)}
+
+
+def run_rollup(until=None):
+    """Roll everything up to ``until`` (default ``now - lag``), a day at a time."""
+    conf = frappe.conf
+    lag = conf.get("telegraf_rollup_lag") or 120
+    until = until or now_datetime().replace(microsecond=0) - timedelta(seconds=lag)
+    start = get_watermark()
+    stats = {"events": 0, "hourly_buckets": 0, "from": str(start), "until": str(until)}
+    if start is None:
+        frappe.db.set_default(WATERMARK_KEY, str(until))
+        return stats
+
+    while start < until:
+        end = min(floor_day(start) + DAY, until)
+        result = roll_up_range(start, end)
+        stats["events"] += result["events"]
+        stats["hourly_buckets"] += result["hourly_buckets"]
+        frappe.db.set_default(WATERMARK_KEY, str(end))
+        frappe.db.commit()
+        start = end
+
+    hourly_days = conf.get("telegraf_rollup_hourly_days") or 90
+    frappe.db.delete(DOCTYPE, {
+        "granularity": "Hour",
+        "bucket_start": ["<", floor_day(until) - timedelta(days=hourly_days)],
+    })
+    frappe.db.commit()
+    return stats
+
+
+def get_availability(start, end, granularity="Day", hosts=None):
+    """Per-host availability and latency between ``start`` and ``end``."""
+    host_clause = "AND host IN %(hosts)s" if hosts else ""
+    rows = frappe.db.sql(f"""
+        SELECT host,
+            SUM(seconds_active) AS seconds_active, SUM(seconds_inactive) AS seconds_inactive,
+            SUM(seconds_down) AS seconds_down, SUM(seconds_unknown) AS seconds_unknown,
+            SUM(seconds_flapping) AS seconds_flapping,
+            SUM(transitions) AS transitions, SUM(response_count) AS response_count,
+            SUM(response_sum) AS response_sum, MIN(response_min) AS response_min,
+            MAX(response_max) AS response_max
+        FROM `tab{DOCTYPE}`
+        WHERE granularity = %(granularity)s AND bucket_start >= %(start)s AND bucket_start < %(end)s
+            {host_clause}
+        GROUP BY host
+        ORDER BY host
+    """, {"granularity": granularity, "start": start, "end": end, "hosts": tuple(hosts or ())}, as_dict=True)
+
+    for row in rows:
+        observed = sum(row[field] or 0 for field in STATUS_FIELDS.values())
+        row["uptime_percent"] = round(100.0 * (row.seconds_active or 0) / observed, 3) if observed else None
+        row["response_avg"] = round(row.response_sum / row.response_count, 3) if row.response_count else None
+    return rows
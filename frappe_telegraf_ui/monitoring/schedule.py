@@ -0,0 +1,114 @@
+# frappe_telegraf_ui/monitoring/schedule.py
+
+"""
+Adaptive per-host probe scheduling.
+
+Every host carries a small state record in Redis with its ``next_check_at``.
+Stable hosts back off towards ``max_interval``; hosts that just changed state
+or keep flapping are probed every cycle again. A host that has been down for
+``breaker_after`` seconds trips a circuit breaker: it is then only given an
+occasional half-open probe every ``breaker_interval`` seconds until it answers.
+"""
+
+import random
+import time
+
+import frappe
+
+from frappe_telegraf_ui.monitoring import store
+
+SCHEDULE_KEY = "telegraf_probe_schedule"
+
+# A cycle's shards start within the minute; don't miss a slot by a few seconds
+SLACK = 5
+
+DOWN_STATUSES = ("Down", "Unknown")
+
+
+def get_policy():
+    conf = frappe.conf
+    return {
+        "min_interval": conf.get("telegraf_probe_min_interval") or 60,
+        "max_interval": conf.get("telegraf_probe_max_interval") or 600,
+        "flap_window": conf.get("telegraf_flap_window") or 1800,
+        "flap_threshold": conf.get("telegraf_flap_threshold") or 3,
+        "breaker_after": conf.get("telegraf_breaker_after") or 1800,
+        "breaker_interval": conf.get("telegraf_breaker_probe_interval") or 900,
+    }
+
+
+def next_state(state, status, now, policy):
+    """Schedule state after a probe that found ``status``."""
+    state = state or {}
+    flips = [t for t in state.get("flips", []) if t > now - policy["flap_window"]]
+    changed = state.get("status") is not None and state["status"] != status
+    if changed:
+        flips.append(now)
+
+    down_since = None
+    if status in DOWN_STATUSES:
+        was_down = state.get("status") in DOWN_STATUSES
+        down_since = state.get("down_since") if was_down and state.get("down_since") is not None else now
+
+    breaker = "closed"
+    if down_since is not None and now - down_since >= policy["breaker_after"]:
+        breaker = "open"
+        interval = policy["breaker_interval"]
+    elif changed or len(flips) >= policy["flap_threshold"] or not state.get("interval"):
+        interval = policy["min_interval"]
+    else:
+        interval = min(state["interval"] * 2, policy["max_interval"])
+
+    next_check_at = now + interval - SLACK
+    if interval > policy["min_interval"]:
+        # Keep backed-off hosts from lining up on the same cycle
+        next_check_at -= random.uniform(0, interval * 0.1)
+
+    return {
+        "status": status,
+        "interval": interval,
+        "next_check_at": next_check_at,
+        "flips": flips,
+        "down_since": down_since,
+        "breaker": breaker,
+    }
+
+
+def filter_due(hosts, now=None):
+    """Hosts whose next probe is due; hosts never probed are always due."""
+    now = now or time.time()
+    states = store.hmget(SCHEDULE_KEY, [host["name"] for host in hosts])
+    return [
+        host for host, state in zip(hosts, states)
+        if not state or state.get("next_check_at", 0) <= now
+    ]
+
+
+def update_schedule(results, now=None):
+    """
+    Record the outcome of this cycle's probes and schedule the next ones.
+
+    Scheduling follows the raw probe result, so a host that just failed is
+    probed again next cycle to confirm it.
+    """
+    if not results:
+        return
+    now = now or time.time()
+    policy = get_policy()
+    names = [result["name"] for result in results]
+    states = store.hmget(SCHEDULE_KEY, names)
+    store.hset_many(SCHEDULE_KEY, {
+        result["name"]: next_state(
+            state, result.get("raw_status") or ("Unknown" if result["error"] else result["new_status"]), now, policy
+        )
+        for result, state in zip(results, states)
+    })
+
+
+def reset_schedule(host_name):
+    """Probe a host on the next cycle, e.g. after its settings changed."""
+    store.hdel_many(SCHEDULE_KEY, [host_name])
+
+
+def get_schedule(host_name):
+    return (store.hmget(SCHEDULE_KEY, [host_name]) or [None])[0]
@@ -0,0 +1,101 @@
+# frappe_telegraf_ui/monitoring/sharding.py
+
+import math
+import time
+import zlib
+
+import frappe
+
+SHARD_STATS_KEY = "telegraf_shard_stats"
+SHARD_QUEUE = "telegraf_monitoring"
+
+
+def shard_of(host_name, shard_count):
+    """Stable shard index for a host; unaffected by fleet order or restarts."""
+    return zlib.crc32(host_name.encode("utf-8")) % shard_count
+
+
+def shard_condition(column="name"):
+    """
+    SQL counterpart of ``shard_of`` for a ``(shard_count, shard_index)`` pair
+    of query parameters; MariaDB's CRC32 of a utf8 column matches zlib's.
+    """
+    return f"CRC32(`{column}`) %% %s = %s"
+
+
+def count_workers(queue, minimum=1):
+    """Number of RQ workers listening on ``queue``, at least ``minimum``."""
+    try:
+        from frappe.utils.background_jobs import get_workers
+
+        return max(len(get_workers(queue)), minimum)
+    except Exception:
+        return minimum
+
+
+def get_shard_queue():
+    """
+    Queue for shard jobs, and whether they may wait there for their slot.
+
+    Staggered shards sleep until their offset, which must not tie up the
+    ``short`` workers that manual checks and config tests need. They run on
+    ``telegraf_shard_queue`` (``telegraf_monitoring`` unless set), which needs
+    its own workers; without any, shards go to ``short`` and all start at once.
+    """
+    queue = frappe.conf.get("telegraf_shard_queue") or SHARD_QUEUE
+    if count_workers(queue, minimum=0):
+        return queue, True
+    return "short", False
+
+
+def get_shard_count(host_count, queue="short"):
+    """
+    Pick a shard count from fleet size and available workers.
+
+    Aim for ``telegraf_hosts_per_shard`` hosts per shard, but never more shards
+    than workers that could run them (nor ``telegraf_max_shards``). On the
+    shared ``short`` queue one worker is left free for interactive jobs.
+    """
+    hosts_per_shard = frappe.conf.get("telegraf_hosts_per_shard") or 500
+    max_shards = frappe.conf.get("telegraf_max_shards") or 32
+    wanted = math.ceil(host_count / hosts_per_shard) if host_count else 1
+    workers = count_workers(queue)
+    if queue == "short":
+        workers -= 1
+    return max(1, min(wanted, workers, max_shards))
+
+
+def get_start_offsets(shard_count, spread=None):
+    """Spread shard start times evenly over the first ``spread`` seconds."""
+    spread = spread if spread is not None else (frappe.conf.get("telegraf_shard_spread") or 30)
+    return [round(index * spread / shard_count, 2) for index in range(shard_count)]
+
+
+def select_shard(hosts, shard_index, shard_count):
+    return [host for host in hosts if shard_of(host["name"], shard_count) == shard_index]
+
+
+def wait_for_offset(cycle_start, start_offset):
+    """Sleep until this shard's slot in the minute, if it hasn't passed yet."""
+    delay = cycle_start + start_offset - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def record_shard_stats(cycle_id, shard_index, shard_count, stats):
+    stats = dict(stats, cycle_id=cycle_id, shard_index=shard_index, shard_count=shard_count)
+    frappe.cache().hset(SHARD_STATS_KEY, str(shard_index), stats)
+
+
+def reset_shard_stats(shard_count):
+    """Drop stats of shards that no longer exist after the count shrank."""
+    cache = frappe.cache()
+    for key in cache.hkeys(SHARD_STATS_KEY) or []:
+        key = frappe.safe_decode(key)
+        if key.isdigit() and int(key) >= shard_count:
+            cache.hdel(SHARD_STATS_KEY, key)
+
+
+def get_shard_stats():
+    stats = frappe.cache().hgetall(SHARD_STATS_KEY) or {}
+    return sorted(stats.values(), key=lambda s: s.get("shard_index", 0))
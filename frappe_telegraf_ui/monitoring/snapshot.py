@@ -0,0 +1,174 @@
+# frappe_telegraf_ui/monitoring/snapshot.py
+
+"""
+Redis snapshot of every host's status.
+
+Holds one entry per host plus aggregate counts by status. The monitoring
+write-back keeps it current incrementally; inserting, renaming or deleting a
+Telegraf Host drops it, and the next read rebuilds it from the database.
+
+A generation counter keeps the two paths from stepping on each other. Every
+invalidation and every delta that arrives while the snapshot is cold bumps
+it, and a rebuild only marks the snapshot ready if the generation is still
+the one it started from, so a write-back committed during the rebuild's read
+can't be missed. Deltas are applied in a transaction watching the generation
+and the ready flag, so they never land on counts a rebuild just loaded.
+"""
+
+import pickle
+
+import frappe
+from redis import Redis
+from redis.exceptions import WatchError
+
+from frappe_telegraf_ui.monitoring import store
+
+HOSTS_KEY = "telegraf_status_snapshot"
+COUNTS_KEY = "telegraf_status_counts"
+READY_KEY = "telegraf_status_snapshot_ready"
+GENERATION_KEY = "telegraf_status_snapshot_generation"
+
+FIELDS = ["name", "hostname", "status", "last_status_check", "ip_address"]
+
+
+def is_ready():
+    cache = frappe.cache()
+    return bool(Redis.exists(cache, cache.make_key(READY_KEY)))
+
+
+def invalidate():
+    cache = frappe.cache()
+    pipe = cache.pipeline()
+    pipe.incr(cache.make_key(GENERATION_KEY))
+    pipe.delete(cache.make_key(READY_KEY), cache.make_key(HOSTS_KEY), cache.make_key(COUNTS_KEY))
+    pipe.execute()
+
+
+def rebuild():
+    """Load the snapshot from the database; returns the host entries."""
+    invalidate()
+    cache = frappe.cache()
+    generation_key = cache.make_key(GENERATION_KEY)
+    generation = Redis.get(cache, generation_key)
+
+    hosts = frappe.get_all("Telegraf Host", fields=FIELDS)
+    counts = _count(hosts)
+
+    with cache.pipeline() as pipe:
+        try:
+            pipe.watch(generation_key)
+            if pipe.get(generation_key) != generation:
+                # Changed while we read: serve these rows, rebuild on the next read
+                return hosts
+            pipe.multi()
+            if hosts:
+                pipe.hset(cache.make_key(HOSTS_KEY), mapping={
+                    host["name"]: pickle.dumps(dict(host)) for host in hosts
+                })
+                pipe.hset(cache.make_key(COUNTS_KEY), mapping=counts)
+            pipe.set(cache.make_key(READY_KEY), 1)
+            pipe.execute()
+        except WatchError:
+            pass
+    return hosts
+
+
+def get_hosts():
+    """All host entries, from Redis, falling back to the database when cold."""
+    if not is_ready():
+        return rebuild()
+    return list(store.hgetall(HOSTS_KEY).values())
+
+
+def get_counts():
+    if not is_ready():
+        return _count(rebuild())
+    return {status: count for status, count in store.counters(COUNTS_KEY).items() if count}
+
+
+def _count(hosts):
+    counts = {}
+    for host in hosts:
+        status = host.get("status") or "Unknown"
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def _fold(names, update):
+    """
+    Apply ``update(name, entry)`` -> new entry to the snapshot entries of
+    ``names`` and adjust the counts, atomically against rebuilds.
+    """
+    cache = frappe.cache()
+    generation_key, ready_key = cache.make_key(GENERATION_KEY), cache.make_key(READY_KEY)
+    hosts_key, counts_key = cache.make_key(HOSTS_KEY), cache.make_key(COUNTS_KEY)
+
+    with cache.pipeline() as pipe:
+        try:
+            pipe.watch(generation_key, ready_key)
+            if not pipe.exists(ready_key):
+                # Cold, maybe mid-rebuild: make sure that rebuild isn't marked ready
+                pipe.unwatch()
+                Redis.incr(cache, generation_key)
+                return
+            values = pipe.hmget(hosts_key, names)
+            updates, counts = {}, {}
+            for name, value in zip(names, values):
+                if value is None:
+                    # Unknown to the snapshot: let the next read rebuild it
+                    break
+                entry = pickle.loads(value)
+                updated = update(name, entry)
+                old_status, new_status = entry["status"] or "Unknown", updated["status"] or "Unknown"
+                if old_status != new_status:
+                    counts[old_status] = counts.get(old_status, 0) - 1
+                    counts[new_status] = counts.get(new_status, 0) + 1
+                updates[name] = pickle.dumps(updated)
+            else:
+                pipe.multi()
+                if updates:
+                    pipe.hset(hosts_key, mapping=updates)
+                for status, amount in counts.items():
+                    pipe.hincrby(counts_key, status, amount)
+                pipe.execute()
+                return
+        except WatchError:
+            # A rebuild or invalidation got in between
+            pass
+    invalidate()
+
+
+def apply_write_back(unchanged, changed, timestamp):
+    """Fold one write-back (see writeback.plan_write_back) into the snapshot."""
+    names = [name for group in unchanged.values() for name in group] + list(changed)
+    if not names:
+        return
+    _fold(names, lambda name, entry: dict(
+        entry, status=changed.get(name, entry["status"]), last_status_check=timestamp
+    ))
+
+
+def update_host(doc):
+    """Refresh one host's entry after its document was saved."""
+    _fold([doc.name], lambda name, entry: {field: doc.get(field) for field in FIELDS})
+
+
+def query(status=None, search=None, start=0, page_length=None):
+    """Filter and page the snapshot without touching the database."""
+    hosts = get_hosts()
+    if status:
+        hosts = [host for host in hosts if host.get("status") == status]
+    if search:
+        search = search.lower()
+        hosts = [
+            host for host in hosts
+            if search in (host.get("hostname") or "").lower() or search in (host.get("ip_address") or "")
+        ]
+
+    hosts.sort(key=lambda host: host.get("hostname") or host["name"])
+    total = len(hosts)
+    if page_length:
+        hosts = hosts[start:start + page_length]
+    elif start:
+        hosts = hosts[start:]
+    return hosts, total
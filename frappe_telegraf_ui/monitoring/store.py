@@ -0,0 +1,81 @@
+# frappe_telegraf_ui/monitoring/store.py
+
+"""
+Bulk helpers over frappe's Redis cache.
+
+``frappe.cache().hset`` writes one field per round trip; the monitoring cycle
+touches every host, so these helpers read and write whole hashes at once while
+keeping frappe's key prefixing and pickled values, so ``hget``/``hgetall`` on
+the same keys keep working.
+"""
+
+import pickle
+
+import frappe
+from redis import Redis
+
+
+def hgetall(name):
+    """Whole hash with ``str`` field names; frappe's own ``hgetall`` returns bytes."""
+    cache = frappe.cache()
+    return {
+        frappe.safe_decode(field): pickle.loads(value)
+        for field, value in Redis.hgetall(cache, cache.make_key(name)).items()
+    }
+
+
+def hmget(name, keys):
+    """Values for ``keys`` (``None`` where missing), in one round trip."""
+    if not keys:
+        return []
+    cache = frappe.cache()
+    values = Redis.hmget(cache, cache.make_key(name), list(keys))
+    return [pickle.loads(value) if value is not None else None for value in values]
+
+
+def hset_many(name, mapping):
+    if not mapping:
+        return
+    cache = frappe.cache()
+    Redis.hset(cache, cache.make_key(name), mapping={
+        key: pickle.dumps(value) for key, value in mapping.items()
+    })
+
+
+def hdel_many(name, keys):
+    if keys:
+        cache = frappe.cache()
+        Redis.hdel(cache, cache.make_key(name), *keys)
+
+
+def hincrby_many(name, mapping):
+    """Increment integer counters in a hash in one round trip."""
+    if not mapping:
+        return
+    cache = frappe.cache()
+    key = cache.make_key(name)
+    pipe = cache.pipeline(transaction=False)
+    for field, amount in mapping.items():
+        pipe.hincrby(key, field, amount)
+    pipe.execute()
+
+
+def hincrbyfloat_many(name, mapping):
+    """Increment float counters in a hash in one round trip."""
+    if not mapping:
+        return
+    cache = frappe.cache()
+    key = cache.make_key(name)
+    pipe = cache.pipeline(transaction=False)
+    for field, amount in mapping.items():
+        pipe.hincrbyfloat(key, field, amount)
+    pipe.execute()
+
+
+def counters(name):
+    """Read a hash written by ``hincrby_many`` as a dict of ints."""
+    cache = frappe.cache()
+    return {
+        frappe.safe_decode(field): int(value)
+        for field, value in Redis.hgetall(cache, cache.make_key(name)).items()
+    }
@@ -0,0 +1,242 @@
+# frappe_telegraf_ui/monitoring/telemetry.py
+
+"""
+Self-telemetry of the monitoring cycle and SSH operations.
+
+Counters and histograms are kept in a small in-process registry. The owning
+job or request pushes them to Redis with ``flush``, so the scrape endpoint
+sees every worker's numbers, and ``render`` turns the totals into Influx line
+protocol or Prometheus text.
+
+Recording is switched off until something reads the metrics. A scrape marks
+the site as watched for ``READER_TTL`` seconds, and workers check that mark
+at most every ``CHECK_INTERVAL`` seconds. Until then ``inc``, ``observe`` and
+``timed`` return after one cached flag check. Set ``telegraf_telemetry`` in
+site config to record regardless.
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+
+import frappe
+from redis import Redis
+
+from frappe_telegraf_ui.monitoring import store
+
+TOTALS_KEY = "telegraf_telemetry"
+READER_KEY = "telegraf_telemetry_reader"
+READER_TTL = 900
+CHECK_INTERVAL = 30
+
+PREFIX = "telegraf_ui_"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_enabled = {"value": False, "checked": float("-inf")}
+
+
+def enabled():
+    """Whether anyone reads the metrics; cached for CHECK_INTERVAL seconds."""
+    now = time.monotonic()
+    if now - _enabled["checked"] >= CHECK_INTERVAL:
+        _enabled["checked"] = now
+        try:
+            _enabled["value"] = bool(
+                frappe.conf.get("telegraf_telemetry") or frappe.cache().get_value(READER_KEY)
+            )
+        except Exception:
+            _enabled["value"] = False
+    return _enabled["value"]
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    """Add ``amount`` to counter ``name``."""
+    if not enabled():
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(name, seconds, **labels):
+    """Record one value of histogram ``name``."""
+    if not enabled():
+        return
+    key = _key(name, labels)
+    index = next((i for i, bound in enumerate(BUCKETS) if seconds <= bound), len(BUCKETS))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        histogram[index] += 1
+        histogram[-1] += seconds
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "ok" if exc_type is None else "error"
+        observe(self.name, time.perf_counter() - self.started, outcome=outcome, **self.labels)
+
+
+_NOT_TIMED = nullcontext()
+
+
+def timed(name, **labels):
+    """Time a ``with`` block into histogram ``name``, labelled with its ``outcome``."""
+    if not enabled():
+        return _NOT_TIMED
+    return _Timer(name, labels)
+
+
+def _field(name, labels, part):
+    return "|".join((name, ",".join(f"{k}={v}" for k, v in labels), part))
+
+
+def flush():
+    """Add this process's recordings to the shared totals and reset them."""
+    if not (_counters or _histograms):
+        return
+    with _lock:
+        counters, histograms = _counters.copy(), _histograms.copy()
+        _counters.clear()
+        _histograms.clear()
+
+    deltas = {}
+    for (name, labels), value in counters.items():
+        deltas[_field(name, labels, "total")] = value
+    for (name, labels), histogram in histograms.items():
+        for index, count in enumerate(histogram[:-1]):
+            if count:
+                deltas[_field(name, labels, str(index))] = count
+        deltas[_field(name, labels, "count")] = sum(histogram[:-1])
+        deltas[_field(name, labels, "sum")] = histogram[-1]
+    try:
+        store.hincrbyfloat_many(TOTALS_KEY, deltas)
+    except Exception:
+        frappe.logger().warning("Could not flush telemetry to Redis", exc_info=True)
+
+
+def collect():
+    """Shared totals as ``(counters, histograms)`` keyed by ``(name, labels)``."""
+    cache = frappe.cache()
+    counters, histograms = {}, {}
+    for field, value in Redis.hgetall(cache, cache.make_key(TOTALS_KEY)).items():
+        name, labels, part = frappe.safe_decode(field).split("|")
+        labels = tuple(tuple(label.split("=", 1)) for label in labels.split(",") if label)
+        value = float(value)
+        if part == "total":
+            counters[(name, labels)] = value
+            continue
+        histogram = histograms.setdefault((name, labels), {"buckets": [0] * (len(BUCKETS) + 1)})
+        if part in ("count", "sum"):
+            histogram[part] = value
+        else:
+            histogram["buckets"][int(part)] = value
+    return counters, histograms
+
+
+def mark_read():
+    """Switch recording on across workers for the next READER_TTL seconds."""
+    frappe.cache().set_value(READER_KEY, 1, expires_in_sec=READER_TTL)
+    _enabled["value"], _enabled["checked"] = True, time.monotonic()
+
+
+def _escape_tag(value):
+    return str(value).replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_influx(counters, histograms, timestamp_ns=None):
+    """
+    Influx line protocol, shaped like Telegraf's own Prometheus parser output:
+    a ``counter`` field per counter, and ``count``, ``sum`` and one cumulative
+    field per bucket bound for histograms.
+    """
+    timestamp_ns = timestamp_ns or time.time_ns()
+    lines = []
+
+    def series(name, labels):
+        return PREFIX + name + "".join(f",{k}={_escape_tag(v)}" for k, v in labels)
+
+    for (name, labels), value in sorted(counters.items()):
+        lines.append(f"{series(name, labels)} counter={_number(value)} {timestamp_ns}")
+    for (name, labels), histogram in sorted(histograms.items()):
+        fields, cumulative = [], 0
+        for bound, count in zip(BUCKETS + ("+Inf",), histogram["buckets"]):
+            cumulative += count
+            fields.append(f"{bound}={_number(cumulative)}")
+        fields.append(f"count={_number(histogram.get('count', cumulative))}")
+        fields.append(f"sum={_number(histogram.get('sum', 0))}")
+        lines.append(f"{series(name, labels)} {','.join(fields)} {timestamp_ns}")
+    return "\n".join(lines) + "\n"
+
+
+def render_prometheus(counters, histograms):
+    """Prometheus text exposition format 0.0.4."""
+    lines = []
+
+    def labelset(labels, extra=()):
+        pairs = [f'{k}="{_escape_label(v)}"' for k, v in labels + tuple(extra)]
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    seen = set()
+    for (name, labels), value in sorted(counters.items()):
+        metric = f"{PREFIX}{name}_total"
+        if metric not in seen:
+            seen.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{labelset(labels)} {_number(value)}")
+    for (name, labels), histogram in sorted(histograms.items()):
+        metric = f"{PREFIX}{name}"
+        if metric not in seen:
+            seen.add(metric)
+            lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), histogram["buckets"]):
+            cumulative += count
+            lines.append(f"{metric}_bucket{labelset(labels, [('le', bound)])} {_number(cumulative)}")
+        lines.append(f"{metric}_sum{labelset(labels)} {_number(histogram.get('sum', 0))}")
+        lines.append(f"{metric}_count{labelset(labels)} {_number(histogram.get('count', cumulative))}")
+    return "\n".join(lines) + "\n"
+
+
+def render(format="influx"):
+    """All shared totals, after flushing this process's own recordings."""
+    mark_read()
+    flush()
+    counters, histograms = collect()
+    if format == "prometheus":
+        return render_prometheus(counters, histograms)
+    return render_influx(counters, histograms)
+
+
+def reset():
+    """Drop all recordings and the reader mark."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+    frappe.cache().delete_value([TOTALS_KEY, READER_KEY])
+    _enabled["checked"] = float("-inf")
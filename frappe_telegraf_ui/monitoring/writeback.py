@@ -0,0 +1,141 @@
+# frappe_telegraf_ui/monitoring/writeback.py
+
+import frappe
+from frappe.utils import now
+
+from frappe_telegraf_ui.monitoring import http_probe, latency, log_counters, snapshot, telemetry
+from frappe_telegraf_ui.monitoring.realtime import publish_status_delta
+
+
+def plan_write_back(results):
+    """
+    Split probe results into the writes they need.
+
+    Returns ``(unchanged, changed, logs)``: ``unchanged`` maps a status to the
+    hosts that keep it and only need ``last_status_check`` bumped, ``changed``
+    maps host name to its new status, and ``logs`` holds the results that
+    warrant a Status Change log entry. Every change is logged, confirmed
+    probe errors included, since the rollups replay status from the log.
+    """
+    unchanged = {}
+    changed = {}
+    logs = []
+
+    for result in results:
+        old_status = result['old_status']
+        # Already debounced by hysteresis.apply, probe errors included
+        new_status = result['new_status']
+
+        if result['error']:
+            frappe.logger().error(f"Host {result['name']} check failed: {result['error']}")
+            if old_status == new_status:
+                unchanged.setdefault(new_status, []).append(result['name'])
+            else:
+                changed[result['name']] = new_status
+                logs.append(result)
+        elif old_status != new_status or old_status == 'Unknown':
+            changed[result['name']] = new_status
+            logs.append(result)
+        else:
+            unchanged.setdefault(new_status, []).append(result['name'])
+
+    return unchanged, changed, logs
+
+
+def write_back_results(results, source="Realtime monitoring"):
+    """
+    Persist a cycle's probe results with a fixed number of statements.
+
+    One UPDATE per unchanged status, one UPDATE for all changed hosts and one
+    bulk INSERT for the status logs, committed together. Returns a summary of
+    how many hosts landed in each bucket.
+    """
+    unchanged, changed, logs = plan_write_back(results)
+    timestamp = now()
+
+    try:
+        for status, names in unchanged.items():
+            # Guard on status so a concurrent manual check isn't overwritten
+            frappe.db.sql("""
+                UPDATE `tabTelegraf Host`
+                SET last_status_check = %s
+                WHERE status = %s AND name IN %s
+            """, (timestamp, status, tuple(names)))
+
+        if changed:
+            cases = " ".join(["WHEN %s THEN %s"] * len(changed))
+            values = [value for item in changed.items() for value in item]
+            frappe.db.sql(f"""
+                UPDATE `tabTelegraf Host`
+                SET status = CASE name {cases} END,
+                    last_status_check = %s,
+                    modified = %s
+                WHERE name IN %s
+            """, (*values, timestamp, timestamp, tuple(changed)))
+
+        if logs:
+            insert_status_logs(logs, source, timestamp)
+
+        with telemetry.timed("cycle_phase_seconds", phase="commit"):
+            frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        raise
+
+    snapshot.apply_write_back(unchanged, changed, timestamp)
+    publish_status_delta(changed, timestamp)
+    # Every probe's latency, not just the ones that changed a status
+    latency.record_results(results)
+    http_probe.record_agent_metrics(results)
+
+    return {
+        "unchanged": sum(len(names) for names in unchanged.values()),
+        "changed": len(changed),
+        "logged": len(logs),
+    }
+
+
+def insert_status_logs(results, source, timestamp=None):
+    """Insert Status Change log rows for many probe results in one statement."""
+    insert_host_logs([
+        {
+            "host": result['name'],
+            "event_type": "Status Change",
+            "old_status": result['old_status'],
+            "new_status": result['new_status'],
+            "response_time": result['response_time'],
+            "details": f"{source}: {result['old_status']} -> {result['new_status']}",
+        }
+        for result in results
+    ], timestamp)
+
+
+def insert_host_logs(entries, timestamp=None):
+    """
+    Insert many Telegraf Host Log rows in one statement.
+
+    Each entry is a dict with ``host`` and ``event_type`` plus any of
+    ``old_status``, ``new_status``, ``response_time`` and ``details``.
+    """
+    if not entries:
+        return
+    timestamp = timestamp or now()
+    user = frappe.session.user if getattr(frappe.local, "session", None) else "Administrator"
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by", "docstatus",
+        "host", "event_type", "old_status", "new_status", "response_time",
+        "timestamp", "details",
+    ]
+    values = [
+        (
+            frappe.generate_hash(length=10), timestamp, timestamp, user, user, 0,
+            entry["host"], entry["event_type"], entry.get("old_status"), entry.get("new_status"),
+            entry.get("response_time"), entry.get("timestamp") or timestamp, entry.get("details"),
+        )
+        for entry in entries
+    ]
+    frappe.db.bulk_insert("Telegraf Host Log", fields, values)
+    log_counters.apply_after_commit(
+        {"host": entry["host"], "event_type": entry["event_type"], "timestamp": entry.get("timestamp") or timestamp}
+        for entry in entries
+    )
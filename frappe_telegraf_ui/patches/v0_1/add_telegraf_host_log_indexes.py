@@ -0,0 +1,29 @@
+import frappe
+
+from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host_log.telegraf_host_log import LOG_INDEXES
+
+
+def execute():
+    """
+    Add the Telegraf Host Log query indexes without blocking writes.
+
+    Runs before model sync so that, on existing sites, the indexes are built
+    with online DDL here rather than by ``on_doctype_update`` during sync.
+    """
+    table = "tabTelegraf Host Log"
+    if not frappe.db.table_exists("Telegraf Host Log"):
+        return
+
+    for index_name, columns in LOG_INDEXES.items():
+        if frappe.db.has_index(table, index_name):
+            continue
+
+        if frappe.db.db_type == "mariadb":
+            # INPLACE + LOCK=NONE keeps the log table writable while the index builds
+            column_list = ", ".join(f"`{column}`" for column in columns)
+            frappe.db.sql_ddl(
+                f"ALTER TABLE `{table}` ADD INDEX `{index_name}` ({column_list}), "
+                "ALGORITHM=INPLACE, LOCK=NONE"
+            )
+        else:
+            frappe.db.add_index("Telegraf Host Log", columns, index_name)
@@ -0,0 +1,101 @@
+# frappe_telegraf_ui/ssh/config_cache.py
+
+"""
+Hash-validated cache of remote Telegraf config files.
+
+A cached copy is served after a cheap remote ``stat``/``sha256sum`` confirms
+the file is unchanged; the file itself is only transferred when it differs.
+"""
+
+import hashlib
+import shlex
+import time
+
+import frappe
+
+from frappe_telegraf_ui.monitoring import store
+
+CACHE_KEY = "telegraf_config_cache"
+STATS_KEY = "telegraf_config_cache_stats"
+
+
+def sha256(content):
+    return hashlib.sha256(content.encode() if isinstance(content, str) else content).hexdigest()
+
+
+def remote_fingerprint(client, path):
+    """Return ``(sha256, mtime, size)`` of a remote file in one round trip."""
+    quoted = shlex.quote(path)
+    stdin, stdout, stderr = client.exec_command(
+        f"stat -c '%Y %s' {quoted} && sha256sum {quoted}"
+    )
+    output = stdout.read().decode().split()
+    error = stderr.read().decode()
+    if stdout.channel.recv_exit_status() != 0 or len(output) < 3:
+        if "No such file" in error:
+            raise FileNotFoundError(path)
+        raise Exception(f"Failed to stat {path}: {error.strip()}")
+    return output[2], int(output[0]), int(output[1])
+
+
+def get_cached(hostname, path):
+    entry = frappe.cache().hget(CACHE_KEY, hostname)
+    if entry and entry.get("path") == path:
+        return entry
+
+
+def store_config(hostname, path, content, mtime=None):
+    """Remember ``content`` as the current remote config of ``hostname``."""
+    entry = {
+        "path": path,
+        "content": content,
+        "sha256": sha256(content),
+        "mtime": mtime,
+        "size": len(content.encode()),
+        "fetched_at": time.time(),
+    }
+    frappe.cache().hset(CACHE_KEY, hostname, entry)
+    return entry
+
+
+def invalidate(hostname):
+    frappe.cache().hdel(CACHE_KEY, hostname)
+
+
+def read_config(client_factory, hostname, path, max_age=None):
+    """
+    Return the config at ``path`` on ``hostname``, transferring it only if needed.
+
+    ``client_factory`` is a context manager factory yielding an SSH client; it
+    is not entered at all when a cached copy is younger than ``max_age``
+    seconds.
+    """
+    cached = get_cached(hostname, path)
+    if cached and max_age and time.time() - cached["fetched_at"] <= max_age:
+        store.hincrby_many(STATS_KEY, {"hits": 1, "unchecked_hits": 1, "bytes_saved": cached["size"]})
+        return cached["content"]
+
+    with client_factory() as client:
+        remote_sha, mtime, size = remote_fingerprint(client, path)
+        if cached and cached["sha256"] == remote_sha:
+            cached.update(mtime=mtime, fetched_at=time.time())
+            frappe.cache().hset(CACHE_KEY, hostname, cached)
+            store.hincrby_many(STATS_KEY, {"hits": 1, "bytes_saved": size})
+            return cached["content"]
+
+        stdin, stdout, stderr = client.exec_command(f"cat {shlex.quote(path)}")
+        content = stdout.read().decode()
+        error = stderr.read().decode()
+
+    if error and "No such file" in error:
+        raise FileNotFoundError(path)
+
+    store_config(hostname, path, content, mtime)
+    store.hincrby_many(STATS_KEY, {"fetches": 1, "bytes_fetched": size})
+    return content
+
+
+def get_stats():
+    stats = {"fetches": 0, "hits": 0, "unchecked_hits": 0, "bytes_fetched": 0, "bytes_saved": 0}
+    stats.update(store.counters(STATS_KEY))
+    return stats
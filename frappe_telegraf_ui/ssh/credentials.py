@@ -0,0 +1,140 @@
+# frappe_telegraf_ui/ssh/credentials.py
+
+"""
+Per-worker cache of SSH connection specs.
+
+Building a spec means loading the Telegraf Host document, decrypting its
+password and parsing its private key. Specs are therefore cached per site
+and host, keyed by the document's ``modified`` timestamp, and evicted after
+``telegraf_ssh_credential_ttl`` seconds (default 600). A save in this worker
+drops the entry at once; other workers notice the new ``modified``.
+
+Specs carry the host's pinned key (see known_hosts), already parsed, so a
+connection verifies it without another lookup. Keys seen for the first time
+are saved to the document's ``ssh_host_key`` by ``save_pending_host_keys``.
+"""
+
+import hashlib
+import io
+import threading
+import time
+
+import frappe
+import paramiko
+
+from frappe_telegraf_ui.ssh import known_hosts
+
+SSH_CONNECTION_FIELDS = ("ip_address", "ssh_port", "ssh_user", "ssh_auth_method", "ssh_private_key")
+
+# Cheapest to use first; RSA last
+KEY_CLASSES = (paramiko.Ed25519Key, paramiko.ECDSAKey, paramiko.RSAKey)
+
+DEFAULT_TTL = 600
+
+_lock = threading.Lock()
+_specs = {}
+
+
+def load_private_key(text):
+    """Parse an Ed25519, ECDSA or RSA private key in PEM or OpenSSH format."""
+    errors = []
+    for key_class in KEY_CLASSES:
+        try:
+            return key_class.from_private_key(io.StringIO(text))
+        except paramiko.PasswordRequiredException:
+            raise
+        except (paramiko.SSHException, ValueError) as e:
+            errors.append(f"{key_class.__name__}: {e}")
+    raise paramiko.SSHException("Unsupported or invalid private key (" + "; ".join(errors) + ")")
+
+
+def build_spec(host_doc):
+    """Connection spec for the pool from a Telegraf Host document."""
+    auth_method = host_doc.ssh_auth_method or "Private Key"
+    spec = {
+        "key": host_doc.name,
+        "ip_address": host_doc.ip_address,
+        "port": host_doc.ssh_port or 22,
+        "username": host_doc.ssh_user,
+        "timeout": 10,
+        "site": frappe.local.site,
+        "host_key": known_hosts.load_host_key(host_doc.get("ssh_host_key")),
+        "host_key_policy": frappe.conf.get("telegraf_ssh_host_key_policy") or "pin",
+    }
+
+    if auth_method == "Password":
+        password = host_doc.get_password('ssh_password')
+        if not password:
+            frappe.throw(f"SSH Password is not set for host '{host_doc.name}'")
+        spec["password"] = password
+    elif auth_method == "Private Key":
+        if not host_doc.ssh_private_key:
+            frappe.throw(f"SSH Private Key is not set for host '{host_doc.name}'")
+        spec["pkey"] = load_private_key(host_doc.ssh_private_key)
+    else:
+        frappe.throw("Invalid SSH Authentication Method selected.")
+
+    # Pooled connections are only reused while these settings stay the same,
+    # which also catches edits saved from another worker.
+    spec["fingerprint"] = hashlib.sha256("\0".join(
+        str(host_doc.get(field) or "") for field in SSH_CONNECTION_FIELDS
+    ).encode() + (spec.get("password") or "").encode()).hexdigest()
+
+    return spec
+
+
+def get_spec(hostname, host_doc=None):
+    """
+    Cached connection spec for a host.
+
+    With ``host_doc`` given, its ``modified`` validates the cache entry;
+    otherwise only that column is read instead of the whole document.
+    """
+    modified = str(host_doc.modified if host_doc else
+                   frappe.db.get_value("Telegraf Host", hostname, "modified"))
+    now = time.monotonic()
+    with _lock:
+        entry = _specs.get((frappe.local.site, hostname))
+    if entry and entry["modified"] == modified and entry["expires"] > now:
+        return dict(entry["spec"])
+
+    host_doc = host_doc or frappe.get_doc("Telegraf Host", hostname)
+    spec = build_spec(host_doc)
+    ttl = frappe.conf.get("telegraf_ssh_credential_ttl") or DEFAULT_TTL
+    with _lock:
+        _specs[(frappe.local.site, hostname)] = {"modified": str(host_doc.modified), "expires": now + ttl, "spec": spec}
+    return dict(spec)
+
+
+def invalidate(hostname=None):
+    """Drop the cached spec of one host, or of all hosts."""
+    with _lock:
+        if hostname is None:
+            _specs.clear()
+        else:
+            _specs.pop((frappe.local.site, hostname), None)
+
+
+def save_pending_host_keys():
+    """
+    Pin keys first seen by any thread of this worker; call from a Frappe thread.
+
+    The keys are written in the caller's transaction, which commits them with
+    the rest of its work; cached specs only pick them up once it does.
+    """
+    site = frappe.local.site
+    pending = known_hosts.take_pending(site)
+    for hostname, host_key in pending.items():
+        if not frappe.db.exists("Telegraf Host", hostname):
+            continue
+        frappe.db.set_value("Telegraf Host", hostname, "ssh_host_key", host_key, update_modified=False)
+    if pending:
+        frappe.db.after_commit.add(lambda: _pin_cached_keys(site, pending))
+
+
+def _pin_cached_keys(site, host_keys):
+    with _lock:
+        for hostname, host_key in host_keys.items():
+            entry = _specs.get((site, hostname))
+            if entry:
+                entry["spec"]["host_key"] = known_hosts.load_host_key(host_key)
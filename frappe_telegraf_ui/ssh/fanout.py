@@ -0,0 +1,63 @@
+# frappe_telegraf_ui/ssh/fanout.py
+
+"""
+Run one SSH operation against many hosts in parallel.
+
+Connection specs are built up front in the calling (Frappe) thread; the
+worker threads only talk to hosts through the connection pool and never
+touch ``frappe.local`` or the database. Results are handed back to the
+calling thread as they complete.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from frappe_telegraf_ui.monitoring import telemetry
+from frappe_telegraf_ui.ssh import credentials
+from frappe_telegraf_ui.ssh import pool as ssh_pool
+
+
+def run_on_hosts(specs, operation, concurrency=20, on_result=None, name="fanout"):
+    """
+    Call ``operation(client, spec)`` for every spec, ``concurrency`` at a time.
+
+    Returns one ``{"host", "ok", "message", "duration"}`` dict per spec;
+    ``on_result`` is called with each of them, in the calling thread, as soon
+    as it is available. Durations are recorded as SSH operation ``name``.
+    """
+    pool = ssh_pool.get_pool()
+    results = []
+
+    def run(spec):
+        started = time.monotonic()
+        try:
+            with pool.connection(spec) as client:
+                message = operation(client, spec)
+            ok = True
+        except Exception as e:
+            ok, message = False, str(e) or e.__class__.__name__
+        return {
+            "host": spec["key"],
+            "ok": ok,
+            "message": message,
+            "duration": (time.monotonic() - started) * 1000,
+        }
+
+    if not specs:
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(specs))) as executor:
+        futures = [executor.submit(run, spec) for spec in specs]
+        for future in as_completed(futures):
+            result = future.result()
+            # Recorded here: telemetry reads site config, which worker threads can't
+            telemetry.observe("ssh_operation_seconds", result["duration"] / 1000,
+                              operation=name, outcome="ok" if result["ok"] else "error")
+            results.append(result)
+            if on_result:
+                on_result(result)
+
+    # Host keys first seen by the worker threads
+    credentials.save_pending_host_keys()
+    telemetry.flush()
+    return results
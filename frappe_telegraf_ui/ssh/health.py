@@ -0,0 +1,93 @@
+# frappe_telegraf_ui/ssh/health.py
+
+"""
+Composite Telegraf health probe in a single SSH round trip.
+
+One remote shell script collects service state, PID, service uptime, agent
+version, config sha256, the last error line from the journal and the load
+average, printed as ``key=value`` lines that ``parse_health_output`` turns
+into a dict. Each check tolerates the others failing, so a missing binary or
+unreadable config still yields the rest of the picture.
+"""
+
+import re
+import shlex
+
+HEALTH_SCRIPT = r"""
+cfg={config_path}
+kv() {{ printf '%s=%s\n' "$1" "$(printf '%s' "$2" | tr '\n' ' ')"; }}
+pid=$(systemctl show -p MainPID --value telegraf 2>/dev/null)
+kv state "$(systemctl is-active telegraf 2>/dev/null)"
+kv pid "$pid"
+[ -n "$pid" ] && [ "$pid" != 0 ] && kv uptime "$(ps -o etimes= -p "$pid" 2>/dev/null)"
+kv version "$(telegraf --version 2>/dev/null | head -n 1)"
+kv config_sha256 "$(sha256sum "$cfg" 2>/dev/null | cut -d ' ' -f 1)"
+kv last_error "$(journalctl -u telegraf -n 500 --no-pager -o cat 2>/dev/null | grep ' E! ' | tail -n 1)"
+kv load "$(cut -d ' ' -f 1-3 /proc/loadavg 2>/dev/null)"
+"""
+
+VERSION_PATTERN = re.compile(r"Telegraf\s+v?(\S+)")
+
+
+def build_script(config_path):
+    return HEALTH_SCRIPT.format(config_path=shlex.quote(config_path))
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_health_output(output):
+    """Structured health from the script's ``key=value`` lines."""
+    raw = {}
+    for line in output.splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            raw[key.strip()] = value.strip()
+
+    version = raw.get("version") or ""
+    match = VERSION_PATTERN.search(version)
+    pid = _int(raw.get("pid"))
+    load = raw.get("load") or ""
+    return {
+        "service_state": raw.get("state") or "unknown",
+        "pid": pid or None,
+        "uptime": _int(raw.get("uptime")),
+        "version": match.group(1) if match else (version or None),
+        "config_sha256": raw.get("config_sha256") or None,
+        "last_error": raw.get("last_error") or None,
+        "load_average": load if load.count(" ") == 2 else None,
+    }
+
+
+def probe_health(client, config_path, timeout=15):
+    """Run the health script over one exec_command and parse its output."""
+    stdin, stdout, stderr = client.exec_command(build_script(config_path), timeout=timeout)
+    output = stdout.read().decode(errors="replace")
+    stdout.channel.recv_exit_status()
+    return parse_health_output(output)
+
+
+def status_from_health(health):
+    """Telegraf Host status implied by the service state."""
+    if health["service_state"] == "active":
+        return "Active"
+    if health["service_state"] == "inactive":
+        return "Inactive"
+    return "Down"
+
+
+def host_fields(health):
+    """Telegraf Host field values for a probe result."""
+    return {
+        "telegraf_service_state": health["service_state"],
+        "telegraf_pid": health["pid"],
+        "telegraf_uptime": health["uptime"],
+        "telegraf_version": health["version"],
+        "config_sha256": health["config_sha256"],
+        "last_error": health["last_error"],
+        "load_average": health["load_average"],
+    }
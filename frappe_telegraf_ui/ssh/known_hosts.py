@@ -0,0 +1,90 @@
+# frappe_telegraf_ui/ssh/known_hosts.py
+
+"""
+Pinned SSH host keys, trusted on first use.
+
+A host's pinned key travels in its connection spec and is the only key the
+client accepts. A host without one is trusted on first connection. The key
+it presented is recorded here, from whichever thread connected, under the
+spec's ``site`` so a multi-site worker saves it to the right host, and the
+caller's Frappe thread saves it with ``credentials.save_pending_host_keys``.
+The spec's ``host_key_policy`` can be ``strict``, which refuses hosts
+without a pinned key, or ``accept``, which trusts any key as before.
+
+Nothing here touches Frappe, so it is safe in fan-out worker threads.
+"""
+
+import threading
+
+import paramiko
+from paramiko.hostkeys import HostKeyEntry
+
+_lock = threading.Lock()
+_pending = {}
+
+
+def load_host_key(line):
+    """A public key from its ``<type> <base64>`` known_hosts form."""
+    line = (line or "").strip()
+    if not line:
+        return None
+    entry = HostKeyEntry.from_line(f"pinned {line}")
+    if entry is None or entry.key is None:
+        raise paramiko.SSHException(f"Invalid SSH host key: {line[:40]}")
+    return entry.key
+
+
+def format_host_key(key):
+    return f"{key.get_name()} {key.get_base64()}"
+
+
+def known_hosts_name(ip_address, port):
+    return ip_address if int(port) == 22 else f"[{ip_address}]:{port}"
+
+
+class PinnedHostKeyPolicy(paramiko.MissingHostKeyPolicy):
+    """
+    Called by paramiko when the host presented no key we know of. Without a
+    pin the key is recorded to be saved by the caller; a mismatch with a
+    known key never gets here, paramiko raises BadHostKeyException itself.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+
+    def missing_host_key(self, client, hostname, key):
+        policy = self.spec.get("host_key_policy")
+        if policy == "accept":
+            return
+        if self.spec.get("host_key") is not None or policy == "strict":
+            raise paramiko.SSHException(
+                f"Host key for {hostname} is not the pinned one ({key.get_name()} "
+                f"{key.fingerprint}); use Reset Host Key on the host to trust a new key"
+            )
+        if self.spec.get("key"):
+            with _lock:
+                _pending[(self.spec.get("site"), self.spec["key"])] = format_host_key(key)
+
+
+def configure_client(client, spec):
+    """Trust only the spec's pinned host key, if it has one."""
+    host_key = spec.get("host_key")
+    if host_key is not None:
+        client.get_host_keys().add(
+            known_hosts_name(spec["ip_address"], spec["port"]), host_key.get_name(), host_key
+        )
+    client.set_missing_host_key_policy(PinnedHostKeyPolicy(spec))
+
+
+def pending(site=None):
+    with _lock:
+        return {host: key for (key_site, host), key in _pending.items() if key_site == site}
+
+
+def take_pending(site=None):
+    """Keys first seen on ``site`` since the last call, by host; clears them."""
+    with _lock:
+        keys = {}
+        for key_site, host in [entry for entry in _pending if entry[0] == site]:
+            keys[host] = _pending.pop((key_site, host))
+    return keys
@@ -0,0 +1,262 @@
+# frappe_telegraf_ui/ssh/pool.py
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import paramiko
+
+from frappe_telegraf_ui.ssh import known_hosts
+
+
+class PoolExhausted(Exception):
+    """Raised when no connection slot frees up within the acquire timeout."""
+
+
+class PooledConnection:
+    """A live SSH client together with the bookkeeping the pool needs."""
+
+    def __init__(self, key, fingerprint, client, generation=0):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.client = client
+        self.generation = generation
+        self.created = time.monotonic()
+        self.last_used = self.created
+
+    def is_healthy(self, probe_after):
+        """Check the transport is still usable before handing it out again."""
+        transport = self.client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        if time.monotonic() - self.last_used > probe_after:
+            # Idle for a while: make sure the peer is still there
+            try:
+                transport.send_ignore()
+            except Exception:
+                return False
+        return True
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class SSHConnectionPool:
+    """
+    Per-process pool of paramiko connections keyed by Telegraf Host name.
+
+    Connections are created through ``connect(spec)``, where ``spec`` is a dict
+    with at least ``key`` (host name) and ``fingerprint`` (a sha256 of the
+    host's connection settings, see ``credentials.build_spec``). An idle
+    connection whose fingerprint no longer matches is dropped instead of being
+    reused, so edits made in another worker invalidate this one's connections
+    too. The pool never touches the database and is safe to use from worker
+    threads.
+    """
+
+    def __init__(self, connect, max_connections=50, max_idle_per_host=2,
+                 idle_timeout=300, keepalive_interval=30, acquire_timeout=10,
+                 health_probe_after=15):
+        self._connect = connect
+        self.max_connections = max_connections
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.acquire_timeout = acquire_timeout
+        self.health_probe_after = health_probe_after
+
+        self._cond = threading.Condition()
+        self._idle = {}
+        self._generations = {}
+        self._in_use = 0
+        self._pid = os.getpid()
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "evicted": 0}
+
+    @property
+    def size(self):
+        return self._in_use + sum(len(conns) for conns in self._idle.values())
+
+    def acquire(self, spec):
+        """Borrow a connection for ``spec``, reusing an idle one when possible."""
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            self._check_fork()
+            self._evict_expired()
+            while True:
+                conn = self._take_idle(spec)
+                if conn:
+                    self._in_use += 1
+                    self.stats["reused"] += 1
+                    return conn
+                if self.size < self.max_connections or self._evict_oldest_idle():
+                    # Reserve the slot before connecting outside the lock
+                    self._in_use += 1
+                    generation = self._generations.get(spec["key"], 0)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhausted(
+                        f"All {self.max_connections} SSH connections are busy"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            client = self._connect(spec)
+            transport = client.get_transport()
+            if transport and self.keepalive_interval:
+                transport.set_keepalive(self.keepalive_interval)
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self.stats["created"] += 1
+        return PooledConnection(spec["key"], spec.get("fingerprint"), client, generation)
+
+    def release(self, conn, discard=False):
+        """Return a borrowed connection, or close it if it should not be reused."""
+        with self._cond:
+            self._in_use -= 1
+            stale = conn.generation != self._generations.get(conn.key, 0)
+            idle = self._idle.setdefault(conn.key, [])
+            if discard or stale or os.getpid() != self._pid or len(idle) >= self.max_idle_per_host:
+                self.stats["discarded"] += 1
+                conn.close()
+            else:
+                conn.last_used = time.monotonic()
+                idle.append(conn)
+            self._cond.notify()
+
+    def connection(self, spec):
+        """Borrow a client for the duration of a ``with`` block."""
+        return self.lease(self.acquire(spec))
+
+    @contextmanager
+    def lease(self, conn):
+        """Yield an acquired connection's client and release it afterwards."""
+        discard = False
+        try:
+            yield conn.client
+        except (paramiko.SSHException, EOFError, OSError):
+            # The transport itself is suspect; don't hand it to the next caller
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def invalidate(self, key):
+        """Close idle connections for ``key``; busy ones are dropped on release."""
+        with self._cond:
+            # Connections borrowed before now are closed when they come back
+            self._generations[key] = self._generations.get(key, 0) + 1
+            for conn in self._idle.pop(key, []):
+                self.stats["discarded"] += 1
+                conn.close()
+
+    def close_all(self):
+        with self._cond:
+            for key in list(self._idle):
+                for conn in self._idle.pop(key):
+                    conn.close()
+
+    def _take_idle(self, spec):
+        idle = self._idle.get(spec["key"])
+        while idle:
+            conn = idle.pop()
+            if conn.fingerprint == spec.get("fingerprint") and conn.is_healthy(self.health_probe_after):
+                return conn
+            self.stats["discarded"] += 1
+            conn.close()
+        return None
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        for key in list(self._idle):
+            keep = []
+            for conn in self._idle[key]:
+                if conn.last_used < cutoff:
+                    self.stats["evicted"] += 1
+                    conn.close()
+                else:
+                    keep.append(conn)
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+
+    def _evict_oldest_idle(self):
+        oldest = None
+        for conns in self._idle.values():
+            for conn in conns:
+                if oldest is None or conn.last_used < oldest.last_used:
+                    oldest = conn
+        if oldest is None:
+            return False
+        self._idle[oldest.key].remove(oldest)
+        self.stats["evicted"] += 1
+        oldest.close()
+        return True
+
+    def _check_fork(self):
+        # RQ forks a work horse per job; sockets inherited from the parent
+        # belong to the parent, so forget them without closing.
+        if os.getpid() != self._pid:
+            self._idle = {}
+            self._in_use = 0
+            self._pid = os.getpid()
+
+
+def connect(spec):
+    """Open a new, authenticated paramiko client from a connection spec."""
+    client = paramiko.SSHClient()
+    known_hosts.configure_client(client, spec)
+    try:
+        client.connect(
+            hostname=spec["ip_address"],
+            port=spec["port"],
+            username=spec["username"],
+            password=spec.get("password"),
+            pkey=spec.get("pkey"),
+            timeout=spec.get("timeout", 10),
+            allow_agent=False,
+            look_for_keys=False,
+        )
+    except Exception:
+        client.close()
+        raise
+    return client
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return this worker's pool, creating it from site config on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                import frappe
+
+                conf = frappe.conf
+                _pool = SSHConnectionPool(
+                    connect,
+                    max_connections=conf.get("telegraf_ssh_pool_size") or 50,
+                    max_idle_per_host=conf.get("telegraf_ssh_pool_idle_per_host") or 2,
+                    idle_timeout=conf.get("telegraf_ssh_idle_timeout") or 300,
+                    keepalive_interval=conf.get("telegraf_ssh_keepalive") or 30,
+                )
+    return _pool
+
+
+def invalidate(key):
+    """Drop pooled connections for a host, if this worker has a pool at all."""
+    if _pool is not None:
+        _pool.invalidate(key)
@@ -0,0 +1,148 @@
+# frappe_telegraf_ui/ssh/rollout.py
+
+"""
+Fleet-wide config rollout in waves.
+
+Hosts are split into a canary wave followed by percentage batches. Each wave
+is pushed in parallel; if its failure rate exceeds the configured threshold
+the rollout stops before touching the next wave.
+"""
+
+import math
+import time
+
+import frappe
+
+from frappe_telegraf_ui.monitoring.writeback import insert_host_logs
+from frappe_telegraf_ui.ssh import config_cache
+from frappe_telegraf_ui.ssh.fanout import run_on_hosts
+from frappe_telegraf_ui.ssh.upload import upload_files
+
+
+def get_rollout_policy():
+    conf = frappe.conf
+    return {
+        "canary_size": conf.get("telegraf_rollout_canary", 1),
+        "batch_percent": conf.get("telegraf_rollout_batch_percent") or 25,
+        "max_failure_rate": conf.get("telegraf_rollout_max_failure_rate", 0.2),
+        "concurrency": conf.get("telegraf_rollout_concurrency") or 20,
+        "reload": bool(conf.get("telegraf_rollout_reload", 1)),
+    }
+
+
+def build_waves(items, canary_size, batch_percent):
+    """Canary wave first, then batches of ``batch_percent`` of the fleet."""
+    canary, rest = items[:canary_size], items[canary_size:]
+    batch_size = max(1, math.ceil(len(items) * batch_percent / 100))
+    waves = [canary] if canary else []
+    waves += [rest[i:i + batch_size] for i in range(0, len(rest), batch_size)]
+    return waves
+
+
+def push_config(client, spec):
+    """Upload the host's desired config and reload Telegraf if it changed."""
+    results = upload_files(client, [(spec["config_path"], spec["config"])])
+    if not results[0]["changed"]:
+        return "Unchanged"
+
+    if spec.get("reload"):
+        stdin, stdout, stderr = client.exec_command(
+            "systemctl reload telegraf && systemctl is-active telegraf"
+        )
+        exit_code = stdout.channel.recv_exit_status()
+        if exit_code != 0:
+            raise Exception(f"Config uploaded but reload failed: {stderr.read().decode().strip()}")
+
+    return "Updated"
+
+
+def _build_specs(host_names, reload):
+    """Connection specs plus desired config; hosts that can't be prepared fail early."""
+    from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host.telegraf_host import (
+        _get_connection_spec,
+    )
+
+    specs, failed = [], []
+    for name in host_names:
+        try:
+            host_doc = frappe.get_doc("Telegraf Host", name)
+            spec = _get_connection_spec(name, host_doc)
+            spec.update(
+                config=host_doc.telegraf_config,
+                config_path=host_doc.telegraf_config_path or "/etc/telegraf/telegraf.conf",
+                reload=reload,
+            )
+            specs.append(spec)
+        except Exception as e:
+            failed.append({"host": name, "ok": False, "message": str(e), "duration": 0})
+    return specs, failed
+
+
+def _log_results(results):
+    insert_host_logs([
+        {
+            "host": result["host"],
+            "event_type": "Config Update",
+            "new_status": result["message"] if result["ok"] else "Failed",
+            "response_time": result["duration"],
+            "details": f"Config rollout: {result['message']}",
+        }
+        for result in results
+    ])
+    frappe.db.commit()
+
+
+def run_rollout(host_names, policy=None):
+    """Roll each host's ``telegraf_config`` out in waves; returns a summary."""
+    policy = policy or get_rollout_policy()
+    specs, failed = _build_specs(sorted(host_names), policy["reload"])
+    if failed:
+        _log_results(failed)
+
+    summary = {
+        "hosts": len(host_names),
+        "updated": 0,
+        "unchanged": 0,
+        "failed": len(failed),
+        "skipped": 0,
+        "aborted": False,
+        "waves": [],
+    }
+
+    waves = build_waves(specs, policy["canary_size"], policy["batch_percent"])
+    for index, wave in enumerate(waves):
+        started = time.monotonic()
+        results = run_on_hosts(wave, push_config, concurrency=policy["concurrency"], name="rollout")
+        _log_results(results)
+
+        by_host = {spec["key"]: spec for spec in wave}
+        wave_failed = 0
+        for result in results:
+            if not result["ok"]:
+                wave_failed += 1
+                continue
+            summary["updated" if result["message"] == "Updated" else "unchanged"] += 1
+            spec = by_host[result["host"]]
+            config_cache.store_config(result["host"], spec["config_path"], spec["config"])
+
+        summary["failed"] += wave_failed
+        failure_rate = wave_failed / len(wave)
+        summary["waves"].append({
+            "wave": index,
+            "canary": index == 0 and policy["canary_size"] > 0,
+            "hosts": len(wave),
+            "failed": wave_failed,
+            "duration": round(time.monotonic() - started, 3),
+        })
+
+        if failure_rate > policy["max_failure_rate"]:
+            summary["aborted"] = True
+            summary["skipped"] = sum(len(rest) for rest in waves[index + 1:])
+            frappe.log_error(
+                f"Config rollout stopped after wave {index}: {wave_failed}/{len(wave)} hosts failed, "
+                f"{summary['skipped']} hosts not updated",
+                "Config Rollout Aborted"
+            )
+            break
+
+    return summary
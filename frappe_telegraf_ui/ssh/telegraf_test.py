@@ -0,0 +1,203 @@
+# frappe_telegraf_ui/ssh/telegraf_test.py
+
+"""
+Bounded, streaming ``telegraf --test`` runs.
+
+Output is read from the SSH channel as it arrives and handed to a callback in
+chunks, subject to a hard byte cap and a wall-clock timeout. A summary of
+metrics per measurement and per input plugin, plus error lines, is built
+while streaming so the full text never has to be kept.
+"""
+
+import codecs
+import re
+import shlex
+import time
+
+CHUNK_SIZE = 32 * 1024
+MAX_ERROR_LINES = 50
+
+PLUGIN_RE = re.compile(r"\[inputs\.([\w-]+)")
+LOADED_INPUTS_RE = re.compile(r"Loaded inputs:\s*(.*)")
+
+
+class ConfigTestSummary:
+    """Incremental parser for ``telegraf --test`` stdout and stderr."""
+
+    def __init__(self):
+        self.metrics = 0
+        self.measurements = {}
+        self.plugin_errors = {}
+        self.loaded_inputs = []
+        self.errors = []
+        self._partial = {"stdout": "", "stderr": ""}
+
+    def feed(self, stream, text):
+        lines = (self._partial[stream] + text).split("\n")
+        self._partial[stream] = lines.pop()
+        for line in lines:
+            self._parse_line(stream, line)
+
+    def close(self):
+        for stream, rest in self._partial.items():
+            if rest:
+                self._parse_line(stream, rest)
+        self._partial = {"stdout": "", "stderr": ""}
+
+    def _parse_line(self, stream, line):
+        line = line.strip()
+        if not line:
+            return
+
+        if stream == "stdout" and not line.startswith(("E!", "W!", "I!", "D!")):
+            # Line protocol, prefixed with "> " by --test
+            measurement = re.split(r"(?<!\\)[, ]", line.lstrip("> "), 1)[0]
+            self.metrics += 1
+            self.measurements[measurement] = self.measurements.get(measurement, 0) + 1
+            return
+
+        loaded = LOADED_INPUTS_RE.search(line)
+        if loaded:
+            self.loaded_inputs = loaded.group(1).split()
+        if line.startswith("E!") or " E! " in line:
+            plugin = PLUGIN_RE.search(line)
+            if plugin:
+                name = plugin.group(1)
+                self.plugin_errors[name] = self.plugin_errors.get(name, 0) + 1
+            if len(self.errors) < MAX_ERROR_LINES:
+                self.errors.append(line)
+
+    def plugin_for(self, measurement):
+        """Best guess of the input plugin that produced ``measurement``."""
+        for plugin in sorted(self.loaded_inputs, key=len, reverse=True):
+            if measurement == plugin or measurement.startswith(plugin + "_"):
+                return plugin
+        return measurement
+
+    def as_dict(self):
+        plugins = {}
+        for measurement, count in self.measurements.items():
+            plugin = plugins.setdefault(self.plugin_for(measurement), {"metrics": 0, "errors": 0})
+            plugin["metrics"] += count
+        for name, count in self.plugin_errors.items():
+            plugins.setdefault(name, {"metrics": 0, "errors": 0})["errors"] += count
+        for name in self.loaded_inputs:
+            plugins.setdefault(name, {"metrics": 0, "errors": 0})
+
+        return {
+            "metrics": self.metrics,
+            "measurements": self.measurements,
+            "plugins": plugins,
+            "errors": self.errors,
+        }
+
+
+def kill_remote(client, pid):
+    """Stop the remote ``timeout`` wrapper, which passes the signal on to telegraf."""
+    if not pid:
+        return
+    try:
+        _stdin, stdout, _stderr = client.exec_command(f"kill -TERM {int(pid)}", timeout=5)
+        stdout.channel.recv_exit_status()
+    except Exception:
+        # The remote timeout still kills it eventually
+        pass
+
+
+def run_telegraf_test(client, config_path, on_chunk=None, max_bytes=1024 * 1024,
+                      timeout=60, keep_output=False, on_tick=None):
+    """
+    Run ``telegraf --test`` on an open client and summarise it.
+
+    ``on_chunk(stream, text)`` receives output as it arrives until
+    ``max_bytes`` have been read; past that, or after ``timeout`` seconds, the
+    channel is closed and the remote process is killed. ``on_tick()`` is
+    called on every pass of the read loop, at least every 50ms, so callers can
+    flush buffered output while telegraf is quiet.
+    """
+    channel = client.get_transport().open_session()
+    # The shell prints its pid, which exec hands to timeout, so a truncated
+    # run can be killed; timeout itself kills telegraf if this side goes away
+    channel.exec_command(
+        f"echo $$; exec timeout --signal=KILL {int(timeout)} /usr/bin/telegraf "
+        f"--config {shlex.quote(config_path)} --test"
+    )
+
+    summary = ConfigTestSummary()
+    output = []
+    received = 0
+    truncated = timed_out = False
+    pid, pid_line = None, b""
+    # One decoder per stream so characters split across reads survive
+    decoders = {
+        stream: codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for stream in ("stdout", "stderr")
+    }
+    started = time.monotonic()
+
+    def emit(stream, text):
+        if not text:
+            return
+        summary.feed(stream, text)
+        if keep_output:
+            output.append(text)
+        if on_chunk:
+            on_chunk(stream, text)
+
+    try:
+        while True:
+            got_data = False
+            for stream, ready, recv in (
+                ("stdout", channel.recv_ready, channel.recv),
+                ("stderr", channel.recv_stderr_ready, channel.recv_stderr),
+            ):
+                if not ready():
+                    continue
+                data = recv(CHUNK_SIZE)
+                if not data:
+                    continue
+                got_data = True
+                if stream == "stdout" and pid is None:
+                    pid_line += data
+                    if b"\n" not in pid_line:
+                        continue
+                    line, data = pid_line.split(b"\n", 1)
+                    pid = int(line) if line.strip().isdigit() else 0
+                    if not data:
+                        continue
+                data = data[:max(max_bytes - received, 0)]
+                received += len(data)
+                emit(stream, decoders[stream].decode(data))
+
+            if on_tick:
+                on_tick()
+            if received >= max_bytes:
+                truncated = True
+                break
+            if time.monotonic() - started > timeout:
+                timed_out = True
+                break
+            if not got_data:
+                if channel.exit_status_ready() and not channel.recv_ready() and not channel.recv_stderr_ready():
+                    break
+                time.sleep(0.05)
+    finally:
+        exit_code = channel.recv_exit_status() if channel.exit_status_ready() else None
+        if exit_code is None:
+            kill_remote(client, pid)
+        channel.close()
+
+    for stream, decoder in decoders.items():
+        emit(stream, decoder.decode(b"", final=True))
+    summary.close()
+    result = summary.as_dict()
+    result.update({
+        "exit_code": exit_code,
+        "bytes": received,
+        "truncated": truncated,
+        "timed_out": timed_out or exit_code in (124, 137),
+        "duration": round(time.monotonic() - started, 3),
+    })
+    if keep_output:
+        result["output"] = "".join(output)
+    return result
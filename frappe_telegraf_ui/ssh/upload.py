@@ -0,0 +1,123 @@
+# frappe_telegraf_ui/ssh/upload.py
+
+"""
+Atomic config upload over SFTP.
+
+Files are streamed in chunks to a temporary file next to their target, then
+backed up, chmod-ed and renamed into place by a single remote command, so a
+reader on the host never sees a half-written config. Files whose sha256
+already matches the remote copy are skipped.
+"""
+
+import hashlib
+import posixpath
+import shlex
+
+import frappe
+
+CHUNK_SIZE = 32 * 1024
+
+
+def iter_chunks(source):
+    """Yield ``source`` (str, bytes or a binary file object) in chunks."""
+    if isinstance(source, str):
+        source = source.encode()
+    if isinstance(source, (bytes, bytearray)):
+        for offset in range(0, len(source), CHUNK_SIZE):
+            yield source[offset:offset + CHUNK_SIZE]
+        return
+
+    source.seek(0)
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk.encode() if isinstance(chunk, str) else chunk
+
+
+def local_sha256(source):
+    digest = hashlib.sha256()
+    for chunk in iter_chunks(source):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def remote_sha256(client, paths):
+    """sha256 of each existing remote file in ``paths``, in one round trip."""
+    command = "sha256sum " + " ".join(shlex.quote(path) for path in paths) + " 2>/dev/null"
+    stdin, stdout, stderr = client.exec_command(command)
+    hashes = {}
+    for line in stdout.read().decode().splitlines():
+        checksum, _, path = line.partition("  ")
+        if path:
+            hashes[path] = checksum
+    stdout.channel.recv_exit_status()
+    return hashes
+
+
+def upload_files(client, files, mode="644", backup=True):
+    """
+    Upload ``files`` - an iterable of ``(remote_path, source)`` - atomically.
+
+    Returns a list of ``{"path", "sha256", "changed"}`` dicts in input order.
+    Sources are hashed and streamed one at a time, so large multi-file uploads
+    never hold more than one chunk in memory beyond what the caller passed in.
+    """
+    files = list(files)
+    current = remote_sha256(client, [path for path, source in files])
+
+    results, pending = [], []
+    for path, source in files:
+        checksum = local_sha256(source)
+        changed = current.get(path) != checksum
+        results.append({"path": path, "sha256": checksum, "changed": changed})
+        if changed:
+            pending.append((path, source))
+
+    if not pending:
+        return results
+
+    suffix = frappe.generate_hash(length=8)
+    staged = []
+    sftp = client.open_sftp()
+    try:
+        for path, source in pending:
+            directory, filename = posixpath.split(path)
+            temp_path = posixpath.join(directory, f".{filename}.tmp-{suffix}")
+            staged.append((path, temp_path))
+            with sftp.open(temp_path, "wb") as remote_file:
+                remote_file.set_pipelined(True)
+                for chunk in iter_chunks(source):
+                    remote_file.write(chunk)
+    except Exception:
+        _remove_staged(client, staged)
+        raise
+    finally:
+        sftp.close()
+
+    # Backup, permissions and rename for every file in one remote step
+    steps = []
+    for path, temp_path in staged:
+        path, temp_path = shlex.quote(path), shlex.quote(temp_path)
+        steps.append(f"chmod {mode} {temp_path}")
+        if backup:
+            steps.append(f"{{ [ ! -f {path} ] || cp -p {path} {path}.backup.$stamp; }}")
+        steps.append(f"mv -f {temp_path} {path}")
+
+    stdin, stdout, stderr = client.exec_command(
+        "stamp=$(date +%Y%m%d_%H%M%S) && " + " && ".join(steps)
+    )
+    exit_code = stdout.channel.recv_exit_status()
+    if exit_code != 0:
+        error = stderr.read().decode()
+        _remove_staged(client, staged)
+        raise Exception(f"Failed to install config files (exit code {exit_code}): {error}")
+
+    return results
+
+
+def _remove_staged(client, staged):
+    if staged:
+        temp_paths = " ".join(shlex.quote(temp_path) for path, temp_path in staged)
+        stdin, stdout, stderr = client.exec_command(f"rm -f {temp_paths}")
+        stdout.channel.recv_exit_status()
@@ -1,8 +1,12 @@
 import frappe
-from frappe.utils import now, add_to_date, get_datetime
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from frappe.utils import now, add_to_date, cint, get_datetime
 import logging
+import time
+
+from frappe_telegraf_ui.monitoring import cycle_lock, hysteresis, log_counters, realtime, retention, rollup, schedule, sharding, snapshot, telemetry
+from frappe_telegraf_ui.monitoring.probe import run_probe_cycle
+from frappe_telegraf_ui.monitoring.writeback import write_back_results
+from frappe_telegraf_ui.ssh.rollout import run_rollout
 
 logger = logging.getLogger(__name__)
 
@@ -42,76 +46,224 @@ def perform_host_check(host_data):
             "response_time": 0,
             "error": str(e)
         }
+MONITORED_FIELDS = ["name", "hostname", "ip_address", "ssh_port", "ssh_user", "status",
+                    "probe_mode", "health_url", "metrics_url"]
+
+def get_monitored_hosts(shard_index=0, shard_count=1):
+    """Hosts the monitoring cycle should probe, or just those of one shard"""
+    with telemetry.timed("cycle_phase_seconds", phase="query"):
+        if shard_count > 1:
+            # Filter in the database; every shard reading the whole fleet defeats sharding
+            hosts = frappe.db.sql(f"""
+                SELECT {", ".join(f"`{field}`" for field in MONITORED_FIELDS)}
+                FROM `tabTelegraf Host`
+                WHERE IFNULL(status, '') != 'Disabled' AND {sharding.shard_condition()}
+            """, (shard_count, shard_index), as_dict=True)
+        else:
+            hosts = frappe.get_all(
+                "Telegraf Host",
+                filters={"status": ["!=", "Disabled"]},
+                fields=MONITORED_FIELDS
+            )
+        # Don't keep the read transaction open while probing
+        frappe.db.commit()
+    default_mode = frappe.conf.get("telegraf_probe_mode") or "TCP"
+    for host in hosts:
+        host.probe_mode = host.probe_mode or default_mode
+    return hosts
+
+def check_hosts(hosts, deadline=None, scheduled=True):
+    """Probe the given hosts and write the results back; returns a summary dict"""
+    started = time.monotonic()
+    total = len(hosts)
+    try:
+        if scheduled:
+            # Hanya host yang jadwal cek berikutnya sudah tiba
+            with telemetry.timed("cycle_phase_seconds", phase="schedule"):
+                hosts = schedule.filter_due(hosts)
+
+        frappe.logger().info(f"Monitoring {len(hosts)} of {total} hosts in parallel")
+
+        # Probe semua host secara async dalam satu event loop
+        with telemetry.timed("cycle_phase_seconds", phase="probe"):
+            results = run_probe_cycle(
+                hosts,
+                concurrency=frappe.conf.get("telegraf_probe_concurrency") or 500,
+                timeout=frappe.conf.get("telegraf_probe_timeout") or 5,
+                deadline=deadline or frappe.conf.get("telegraf_probe_deadline") or 50
+            )
+        probe_time = time.monotonic() - started
+
+        if len(results) < len(hosts):
+            frappe.logger().warning(
+                f"Probe deadline reached, {len(hosts) - len(results)} hosts were not checked this cycle"
+            )
+
+        frappe.logger().info(f"All host checks completed. Processing {len(results)} results...")
+
+        # Hanya transisi yang sudah terkonfirmasi yang sampai ke database
+        with telemetry.timed("cycle_phase_seconds", phase="hysteresis"):
+            hysteresis.apply(results)
+
+        # Tulis semua hasil sekaligus dalam satu transaksi singkat
+        with telemetry.timed("cycle_phase_seconds", phase="write_back"):
+            summary = write_back_results(results)
+        frappe.logger().info(
+            f"Completed and committed monitoring of {len(results)} hosts: "
+            f"{summary['changed']} changed, {summary['unchanged']} unchanged"
+        )
+        with telemetry.timed("cycle_phase_seconds", phase="update_schedule"):
+            schedule.update_schedule(results)
+
+        record_cycle_telemetry(results, len(hosts), time.monotonic() - started)
+    finally:
+        telemetry.flush()
+
+    summary.update({
+        "hosts": total,
+        "due": len(hosts),
+        "checked": len(results),
+        "skipped": len(hosts) - len(results),
+        "probe_time": round(probe_time, 3),
+        "duration": round(time.monotonic() - started, 3),
+    })
+    return summary
+
+def record_cycle_telemetry(results, due, duration):
+    """Cycle duration plus probe outcome and status change counters"""
+    if not telemetry.enabled():
+        return
+    telemetry.observe("cycle_seconds", duration)
+    telemetry.inc("probes_skipped", due - len(results))
+    for result in results:
+        raw_status = result.get("raw_status", result["new_status"])
+        telemetry.inc("probes", result=raw_status.lower())
+        if result["new_status"] != result["old_status"]:
+            telemetry.inc("status_changes", to=result["new_status"].lower())
+        elif raw_status != result["new_status"]:
+            # Held back by hysteresis
+            telemetry.inc("status_flips_suppressed")
+
 def check_all_hosts_status():
-    """Check status of all active Telegraf hosts - runs every minute"""
+    """Check status of all active Telegraf hosts in this job"""
+    # Jangan tumpang tindih dengan siklus yang masih berjalan
+    lock_token = cycle_lock.acquire(holder="manual", on_busy="skip")
+    if not lock_token:
+        return {"skipped": True}
+
     try:
         frappe.logger().info("Starting realtime host status check")
-        
-        hosts = frappe.get_all(
-            "Telegraf Host",
-            filters={"status": ["!=", "Disabled"]},
-            fields=["name", "hostname", "ip_address", "ssh_port", "ssh_user", "status"]
-        )
-        
+
+        hosts = get_monitored_hosts()
         if not hosts:
             frappe.logger().info("No hosts found for monitoring")
             return
-            
-        frappe.logger().info(f"Monitoring {len(hosts)} hosts in parallel")
 
-        results = []
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            # Jalankan pengecekan secara paralel
-            future_to_host = {executor.submit(perform_host_check, host): host for host in hosts}
-            
-            for future in as_completed(future_to_host):
-                try:
-                    # Ambil hasil dari setiap thread
-                    result_data = future.result(timeout=15)
-                    results.append(result_data)
-                except Exception as exc:
-                    host = future_to_host[future]
-                    frappe.logger().error(f"Future for host {host['name']} generated an exception: {exc}")
+        # Manual checks probe everything, regardless of the schedule
+        return check_hosts(hosts, scheduled=False)
 
-        frappe.logger().info(f"All host checks completed. Processing {len(results)} results...")
-
-        # --- Bagian Pemrosesan (Sekuensial dan Aman) ---
-        # Sekarang kita proses hasilnya satu per satu di thread utama
-        completed = 0
-        for result in results:
-            host_name = result['name']
-            old_status = result['old_status']
-            new_status = result['new_status']
-            response_time = result['response_time']
-            
-            completed += 1
-            log_message = f"[{completed}/{len(results)}] {host_name}: "
-
-            if result['error']:
-                frappe.logger().error(f"Host {host_name} check failed: {result['error']}")
-                frappe.db.set_value("Telegraf Host", host_name, {"status": "Unknown", "last_status_check": now()})
-                log_message += f"Error -> Unknown"
-            else:
-                # Update DB hanya jika status berubah atau belum pernah dicek
-                if old_status != new_status or old_status == 'Unknown':
-                    frappe.db.set_value("Telegraf Host", host_name, {"status": new_status, "last_status_check": now()})
-                    create_status_log(host_name, old_status, new_status, response_time, "Realtime monitoring")
-                    log_message += f"Status changed: {old_status} -> {new_status}"
-                else:
-                    # Jika status tidak berubah, cukup update timestamp
-                    frappe.db.set_value("Telegraf Host", host_name, "last_status_check", now())
-                    log_message += f"Status unchanged: {new_status}"
-            
-            frappe.logger().info(log_message)
-
-        # Commit semua perubahan ke database SEKALI SAJA di akhir
-        frappe.db.commit()
-        frappe.logger().info(f"Completed and committed monitoring of {len(results)} hosts")
-            
     except Exception as e:
         frappe.logger().error(f"Error in realtime host monitoring: {str(e)}")
         frappe.log_error(f"Realtime Monitoring Error: {str(e)}", "Host Status Check Failed")
         frappe.db.rollback() # Batalkan transaksi jika ada error besar
+    finally:
+        release_cycle_lock(lock_token)
+
+def release_cycle_lock(lock_token, parts=1):
+    """Release part of the cycle lock and dispatch a catch-up cycle if one was deferred"""
+    try:
+        if cycle_lock.release(lock_token, parts):
+            frappe.logger().info("Dispatching catch-up monitoring cycle")
+            frappe.enqueue("frappe_telegraf_ui.tasks.dispatch_host_checks", queue="short", catch_up=True)
+    except Exception as e:
+        frappe.logger().error(f"Error releasing monitoring cycle lock: {str(e)}")
+
+def dispatch_host_checks(catch_up=False):
+    """Split the fleet into shards and enqueue one staggered job per shard - runs every minute"""
+    lock_token = None
+    enqueued = 0
+    try:
+        host_count = frappe.db.count("Telegraf Host", {"status": ["!=", "Disabled"]})
+        if not host_count:
+            frappe.logger().info("No hosts found for monitoring")
+            return
+
+        queue, stagger = sharding.get_shard_queue()
+        shard_count = sharding.get_shard_count(host_count, queue=queue)
+        # Tanpa antrean khusus, jangan biarkan worker "short" tidur menunggu giliran
+        offsets = sharding.get_start_offsets(shard_count) if stagger else [0] * shard_count
+
+        # Satu kunci untuk seluruh siklus; setiap shard melepas bagiannya
+        lock_token = cycle_lock.acquire(
+            parts=shard_count,
+            holder="catch_up" if catch_up else "scheduled",
+            on_busy=cycle_lock.get_overrun_action(),
+        )
+        if not lock_token:
+            return
+
+        cycle_start = time.time()
+        cycle_id = frappe.utils.get_datetime_str(frappe.utils.now_datetime())
+
+        sharding.reset_shard_stats(shard_count)
+        for shard_index, start_offset in enumerate(offsets):
+            frappe.enqueue(
+                "frappe_telegraf_ui.tasks.check_host_shard",
+                queue=queue,
+                timeout=120,
+                shard_index=shard_index,
+                shard_count=shard_count,
+                cycle_id=cycle_id,
+                cycle_start=cycle_start,
+                start_offset=start_offset,
+                lock_token=lock_token
+            )
+            enqueued += 1
+
+        frappe.logger().info(f"Dispatched {shard_count} shards for {host_count} hosts")
+
+    except Exception as e:
+        frappe.logger().error(f"Error dispatching host checks: {str(e)}")
+        frappe.log_error(f"Shard Dispatch Error: {str(e)}", "Host Status Check Failed")
+        if lock_token and enqueued < shard_count:
+            # Shards that were never enqueued can't release their part
+            release_cycle_lock(lock_token, shard_count - enqueued)
+
+def check_host_shard(shard_index, shard_count, cycle_id, cycle_start, start_offset=0, lock_token=None):
+    """Check the hosts of one shard, starting at its offset within the minute"""
+    sharding.wait_for_offset(cycle_start, start_offset)
+    started = time.time()
+    stats = {"started": started - cycle_start, "status": "running"}
+
+    if lock_token and not cycle_lock.is_held(lock_token):
+        # Queued past the lock's expiry; a newer cycle may already cover these hosts
+        frappe.logger().warning(f"Skipping shard {shard_index}/{shard_count} of expired cycle {cycle_id}")
+        sharding.record_shard_stats(cycle_id, shard_index, shard_count, dict(stats, status="stale"))
+        return
+
+    try:
+        hosts = get_monitored_hosts(shard_index, shard_count)
+        # Leave a few seconds before the next cycle's slot for the write-back
+        deadline = max(60 - (started - cycle_start) - 5, 5)
+        if hosts:
+            stats.update(check_hosts(hosts, deadline=deadline))
+        stats["status"] = "ok"
+    except Exception as e:
+        stats.update(status="failed", error=str(e))
+        frappe.logger().error(f"Error in shard {shard_index}/{shard_count}: {str(e)}")
+        frappe.log_error(f"Shard {shard_index} Monitoring Error: {str(e)}", "Host Status Check Failed")
+        frappe.db.rollback()
+    finally:
+        stats["finished"] = time.time() - cycle_start
+        stats["duration"] = round(time.time() - started, 3)
+        sharding.record_shard_stats(cycle_id, shard_index, shard_count, stats)
+        if lock_token:
+            release_cycle_lock(lock_token)
+
+@frappe.whitelist()
+def get_shard_stats():
+    """Per-shard results and timings of the latest monitoring cycle"""
+    return {"status": "success", "shards": sharding.get_shard_stats(), "cycle": cycle_lock.get_stats()}
 
 def check_single_host_status(host_data):
     """Check status of a single host with optimized logic for realtime monitoring"""
@@ -178,44 +330,61 @@ def create_status_log(host_name, old_status, new_status, response_time, source):
 
 # Optimized cleanup to run more frequently for realtime monitoring
 def cleanup_old_logs():
-    """Clean up old log entries - optimized for frequent runs"""
+    """Delete expired log entries in chunks, resuming where the last run stopped"""
     try:
-        # Only keep logs for last 7 days for realtime monitoring
-        old_date = add_to_date(get_datetime(), days=-7)
-        
-        # Use bulk delete for performance
-        frappe.db.sql("""
-            DELETE FROM `tabTelegraf Host Log` 
-            WHERE timestamp < %s
-        """, old_date)
-        
-        frappe.db.commit()
-        frappe.logger().info("Cleaned up old status logs (>7 days)")
+        stats = retention.purge_expired()
+        frappe.logger().info(
+            f"Log retention deleted {stats['deleted']} rows in {stats['elapsed']}s "
+            f"({stats['rows_per_sec']} rows/s), complete: {stats['complete']}"
+        )
         
     except Exception as e:
         frappe.logger().error(f"Error cleaning up logs: {str(e)}")
 
+@frappe.whitelist()
+def get_metrics(format="influx"):
+    """
+    Self-telemetry of the monitoring cycle and SSH operations as plain text,
+    in Influx line protocol or, with format=prometheus, Prometheus exposition
+    format - for a Telegraf inputs.http or inputs.prometheus scrape
+    """
+    from werkzeug.wrappers import Response
+
+    if format == "prometheus":
+        mimetype = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        mimetype = "text/plain; charset=utf-8"
+    return Response(telemetry.render(format), mimetype=mimetype)
+
+@frappe.whitelist()
+def get_retention_stats():
+    """Statistics of the last retention runs"""
+    return {"status": "success", "stats": retention.get_stats(), "policy": retention.get_policy()}
+
 # Manual trigger for immediate check
 @frappe.whitelist()
 def trigger_immediate_check():
     """Trigger immediate status check for all hosts"""
     try:
         # Run synchronously for immediate feedback
-        check_all_hosts_status()
+        result = check_all_hosts_status()
+        if result and result.get("skipped"):
+            return {"status": "success", "message": "A monitoring cycle is already running; statuses will update when it finishes"}
         return {"status": "success", "message": "Immediate status check completed"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 # Get realtime status for dashboard
 @frappe.whitelist()
-def get_realtime_status():
-    """Get current status of all hosts for realtime dashboard"""
+def get_realtime_status(status=None, search=None, start=0, page_length=None):
+    """Snapshot of all hosts for the realtime dashboard, kept current by status deltas"""
     try:
-        hosts = frappe.get_all(
-            "Telegraf Host",
-            fields=["name", "hostname", "status", "last_status_check", "ip_address"],
-            order_by="hostname"
-        )
+        # Read seq first: a delta published while querying is re-applied, never lost
+        seq = realtime.current_seq()
+
+        # Served from the Redis snapshot; the DB is only read when it is cold
+        hosts, matched = snapshot.query(status, search, cint(start), cint(page_length))
+        status_counts = snapshot.get_counts()
         
         # Get recent status changes (last hour)
         recent_changes = frappe.get_all(
@@ -229,65 +398,102 @@ def get_realtime_status():
             limit=20
         )
         
-        # Count by status
-        status_counts = {}
-        for host in hosts:
-            status = host.get('status', 'Unknown')
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
         return {
             "status": "success",
             "data": {
                 "hosts": hosts,
                 "recent_changes": recent_changes,
                 "status_counts": status_counts,
-                "total_hosts": len(hosts),
-                "timestamp": now()
+                "total_hosts": sum(status_counts.values()),
+                "matched_hosts": matched,
+                "timestamp": now(),
+                # Clients apply telegraf_status_delta events with a higher seq
+                "seq": seq
             }
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 # Rest of the functions remain the same...
-@frappe.whitelist()
+# Scheduler only: pushes config to the whole fleet and reloads Telegraf
 def update_telegraf_configs():
-    """Update Telegraf configurations for all hosts"""
+    """Roll the stored configuration out to all auto-update hosts in canary waves"""
     try:
         hosts = frappe.get_all(
             "Telegraf Host", 
-            filters={"status": "Active", "auto_update_config": 1},
-            fields=["name"]
+            filters={"status": "Active", "auto_update_config": 1, "telegraf_config": ["is", "set"]},
+            pluck="name"
         )
-        
-        for host in hosts:
-            try:
-                host_doc = frappe.get_doc("Telegraf Host", host['name'])
-                # Update config logic here
-                frappe.logger().info(f"Updated config for host: {host['name']}")
-            except Exception as e:
-                frappe.logger().error(f"Failed to update config for {host['name']}: {str(e)}")
-                
+        if not hosts:
+            return
+
+        summary = run_rollout(hosts)
+        frappe.logger().info(
+            f"Config rollout finished: {summary['updated']} updated, {summary['unchanged']} unchanged, "
+            f"{summary['failed']} failed, {summary['skipped']} skipped in {len(summary['waves'])} waves"
+        )
+        return summary
+
     except Exception as e:
         frappe.logger().error(f"Error in update_telegraf_configs: {str(e)}")
 
+@frappe.whitelist()
+def rollup_host_logs():
+    """Fold new log rows into the hourly and daily host rollups"""
+    try:
+        stats = rollup.run_rollup()
+        frappe.logger().info(
+            f"Rolled up {stats['events']} log rows into {stats['hourly_buckets']} hourly buckets"
+        )
+        
+    except Exception as e:
+        frappe.logger().error(f"Error rolling up host logs: {str(e)}")
+
+def refresh_host_health():
+    """Refresh agent version, config hash, load and journal errors for the fleet"""
+    try:
+        from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host.telegraf_host import refresh_host_health as refresh
+        summary = refresh()
+        frappe.logger().info(f"Refreshed agent health of {summary['checked']} hosts, {summary['failed']} failed")
+        
+    except Exception as e:
+        frappe.logger().error(f"Error refreshing host health: {str(e)}")
+
+def reconcile_log_counters():
+    """Recount log statistics from the table and repair counter drift"""
+    try:
+        drift = log_counters.reconcile()
+        if drift["total"] or drift["event_types"] or drift["hosts"]:
+            frappe.logger().warning(f"Repaired log counter drift: {drift}")
+        
+    except Exception as e:
+        frappe.logger().error(f"Error reconciling log counters: {str(e)}")
+
 @frappe.whitelist()
 def generate_daily_report():
     """Generate daily status report"""
     try:
-        yesterday = add_to_date(get_datetime(), days=-1)
+        # Make sure yesterday is fully rolled up before reading it
+        rollup.run_rollup()
         
-        # Get status changes from yesterday
-        logs = frappe.get_all(
-            "Telegraf Host Log",
-            filters={
-                "timestamp": [">=", yesterday],
-                "event_type": "Status Change"
-            },
-            fields=["host", "old_status", "new_status", "timestamp"]
-        )
+        today = rollup.floor_day(get_datetime())
+        yesterday = add_to_date(today, days=-1)
+        
+        availability = rollup.get_availability(yesterday, today)
         
-        if logs:
-            frappe.logger().info(f"Generated daily report with {len(logs)} status changes")
+        if availability:
+            transitions = sum(row.transitions or 0 for row in availability)
+            uptimes = [row.uptime_percent for row in availability if row.uptime_percent is not None]
+            fleet_uptime = round(sum(uptimes) / len(uptimes), 3) if uptimes else None
+            worst = sorted(
+                (row for row in availability if row.uptime_percent is not None),
+                key=lambda row: row.uptime_percent
+            )[:5]
+            frappe.logger().info(
+                f"Daily report {yesterday.date()}: {len(availability)} hosts, "
+                f"{transitions} status changes, fleet uptime {fleet_uptime}%, "
+                f"lowest: {', '.join(f'{row.host} {row.uptime_percent}%' for row in worst)}"
+            )
         
     except Exception as e:
         frappe.logger().error(f"Error generating daily report: {str(e)}")
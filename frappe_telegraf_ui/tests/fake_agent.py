@@ -0,0 +1,92 @@
+# frappe_telegraf_ui/tests/fake_agent.py
+
+"""
+Local stand-in for a Telegraf agent's HTTP endpoints.
+
+Serves ``/health`` like ``outputs.health`` (200, or 503 when unhealthy) and
+``/metrics`` like ``outputs.prometheus_client`` with a few ``internal_*``
+series. Counts accepted connections and can answer slowly, so tests can
+check how often and how long probes wait.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS = """# HELP internal_agent_gather_errors Telegraf collected metric
+# TYPE internal_agent_gather_errors untyped
+internal_agent_gather_errors{go_version="1.21.6",host="web-1",version="1.29.4"} 3
+internal_agent_metrics_dropped{go_version="1.21.6",host="web-1",version="1.29.4"} 7
+internal_write_buffer_limit{alias="",host="web-1",output="influxdb"} 10000
+internal_write_buffer_size{alias="",host="web-1",output="influxdb"} 2500
+internal_write_buffer_limit{alias="",host="web-1",output="file"} 10000
+internal_write_buffer_size{alias="",host="web-1",output="file"} 100
+internal_write_metrics_dropped{alias="",host="web-1",output="influxdb"} 5
+go_goroutines 42
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        if self.path == "/health":
+            code, body = (200, b"") if self.server.healthy else (503, b"unhealthy\n")
+        elif self.path == "/metrics":
+            code, body = 200, METRICS.encode()
+        else:
+            code, body = 404, b"404 page not found\n"
+        self.send_response(code)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeAgent:
+    """Context manager serving the agent endpoints on a free loopback port."""
+
+    def __init__(self, healthy=True, delay=0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.healthy = healthy
+        self.server.delay = delay
+        self.server.connections = 0
+        self.server.lock = threading.Lock()
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def connections(self):
+        return self.server.connections
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+    def host(self, name="web-1", metrics=True):
+        """Host dict for this agent, shaped like get_monitored_hosts rows."""
+        return {
+            "name": name,
+            "hostname": name,
+            "ip_address": "127.0.0.1",
+            "ssh_port": 22,
+            "status": "Unknown",
+            "probe_mode": "HTTP",
+            "health_url": f":{self.port}/health",
+            "metrics_url": f":{self.port}/metrics" if metrics else None,
+        }
@@ -0,0 +1,99 @@
+# frappe_telegraf_ui/tests/fake_ssh.py
+
+"""In-memory stand-in for a paramiko client serving files from a dict."""
+
+import hashlib
+import io
+import re
+import shlex
+from contextlib import contextmanager
+
+
+class FakeChannel:
+    def __init__(self, exit_status):
+        self.exit_status = exit_status
+
+    def recv_exit_status(self):
+        return self.exit_status
+
+
+class FakeStream(io.BytesIO):
+    def __init__(self, data=b"", exit_status=0):
+        super().__init__(data)
+        self.channel = FakeChannel(exit_status)
+
+
+class FakeSSHClient:
+    def __init__(self, files=None, mtime=1700000000):
+        self.files = dict(files or {})
+        self.mtime = mtime
+        self.commands = []
+
+    def exec_command(self, command):
+        self.commands.append(command)
+        args = shlex.split(command)
+        out, err, status = b"", b"", 0
+
+        if args[:2] == ["stat", "-c"]:
+            path = args[3]
+            if path in self.files:
+                data = self.files[path].encode()
+                out = f"{self.mtime} {len(data)}\n{hashlib.sha256(data).hexdigest()}  {path}\n".encode()
+            else:
+                err, status = f"stat: cannot stat '{path}': No such file or directory".encode(), 1
+        elif args[0] == "sha256sum":
+            out = "".join(
+                f"{hashlib.sha256(self.files[path].encode()).hexdigest()}  {path}\n"
+                for path in args[1:] if path in self.files
+            ).encode()
+        elif args[0] == "rm":
+            for path in args[2:]:
+                self.files.pop(path, None)
+        elif command.startswith("stamp="):
+            # Install step of ssh.upload: only the renames matter here
+            for temp_path, path in re.findall(r"mv -f (\S+) (\S+)", command):
+                self.files[shlex.split(path)[0]] = self.files.pop(shlex.split(temp_path)[0])
+        elif args[0] == "systemctl":
+            # The service is always running; start/stop/restart/reload succeed
+            if args[1] == "is-active":
+                out = b"active\n"
+        elif args[0] == "cat":
+            if args[1] in self.files:
+                out = self.files[args[1]].encode()
+            else:
+                err, status = f"cat: {args[1]}: No such file or directory".encode(), 1
+
+        return None, FakeStream(out, status), FakeStream(err, status)
+
+    def open_sftp(self):
+        return FakeSFTP(self)
+
+    @contextmanager
+    def factory(self):
+        """Usable wherever code expects a context manager yielding a client."""
+        yield self
+
+
+class FakeSFTPFile(io.BytesIO):
+    def __init__(self, client, path):
+        super().__init__()
+        self.client = client
+        self.path = path
+
+    def set_pipelined(self, pipelined=True):
+        pass
+
+    def close(self):
+        self.client.files[self.path] = self.getvalue().decode()
+        super().close()
+
+
+class FakeSFTP:
+    def __init__(self, client):
+        self.client = client
+
+    def open(self, path, mode="r"):
+        return FakeSFTPFile(self.client, path)
+
+    def close(self):
+        pass
@@ -0,0 +1,122 @@
+# frappe_telegraf_ui/tests/fleet.py
+
+"""
+Local stand-in for a fleet of Telegraf hosts.
+
+Starts one TCP listener per simulated host, each on its own loopback address
+(127.1.x.y) and a shared port, served from a background event loop, and hands
+out host dicts shaped like the rows ``check_all_hosts_status`` reads from the
+database. Separate addresses keep thousands of probes per run from exhausting
+the ephemeral port range or colliding with TIME_WAIT sockets of earlier runs.
+
+Dropped hosts point at TEST-NET-1 (192.0.2.0/24), where connects hang until
+the probe times out as they would behind a firewall that drops packets. A TCP
+connect completes in the kernel, so added latency only shows in HTTP mode,
+where listeners answer health checks like a Telegraf agent would.
+"""
+
+import asyncio
+import random
+import resource
+import threading
+
+
+def raise_fd_limit(wanted):
+    """Lift the soft open-files limit towards ``wanted`` as far as allowed."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft >= wanted:
+        return soft
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    return target
+
+
+def loopback_address(index, network=1):
+    """Distinct loopback address for host ``index``: 127.<network>.x.y."""
+    return f"127.{network}.{index // 250}.{index % 250 + 1}"
+
+
+class FakeFleet:
+    """
+    Context manager running ``size`` listeners until exit.
+
+    The first ``down`` hosts get no listener, so their probes are refused,
+    and a ``drop_rate`` share of the rest silently drops them. With ``http``
+    the hosts are probed in HTTP mode and each health check is answered
+    after ``latency`` plus up to ``jitter`` seconds.
+    """
+
+    def __init__(self, size, down=0, port=10022, drop_rate=0, latency=0, jitter=0,
+                 http=False, seed=0):
+        self.size = size
+        self.down = down
+        self.port = port
+        self.drop_rate = drop_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.http = http
+        self.random = random.Random(seed)
+        self.hosts = []
+        self._servers = []
+        self._loop = None
+        self._thread = None
+
+    def __enter__(self):
+        # listeners + one client socket per concurrent probe + headroom
+        raise_fd_limit(self.size * 2 + 1024)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _start(self):
+        for index in range(self.size):
+            name = f"fake-host-{index:05d}"
+            ip_address = loopback_address(index)
+            if index >= self.down and self.random.random() < self.drop_rate:
+                ip_address = f"192.0.2.{index % 254 + 1}"
+            elif index >= self.down:
+                server = await asyncio.start_server(
+                    self._handle, ip_address, self.port, backlog=64, reuse_address=True
+                )
+                self._servers.append(server)
+            host = {
+                "name": name,
+                "hostname": name,
+                "ip_address": ip_address,
+                "ssh_port": self.port,
+                "ssh_user": "telegraf",
+                "status": "Unknown",
+            }
+            if self.http:
+                host.update(probe_mode="HTTP", health_url=f":{self.port}/health")
+            self.hosts.append(host)
+
+    async def _stop(self):
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        if not self.http:
+            writer.close()
+            return
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                if self.latency or self.jitter:
+                    await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
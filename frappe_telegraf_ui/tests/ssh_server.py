@@ -0,0 +1,177 @@
+# frappe_telegraf_ui/tests/ssh_server.py
+
+"""
+Local paramiko SSH server standing in for the hosts of a fleet.
+
+Accepts any password or key. Every login name gets its own in-memory file
+store, served by FakeSSHClient's command emulation (``cat``, ``stat``,
+``sha256sum``, ``systemctl`` and the upload install step), so many
+simulated hosts can share one listener by using their name as SSH user.
+SFTP writes land in the same store, which lets ``upload_files`` and the
+config cache run unchanged against it.
+"""
+
+import io
+import socket
+import threading
+import time
+
+import paramiko
+
+from frappe_telegraf_ui.tests.fake_ssh import FakeSSHClient
+
+
+class _Interface(paramiko.ServerInterface):
+    def __init__(self, server):
+        self.server = server
+        self.username = None
+
+    def get_allowed_auths(self, username):
+        return "password,publickey"
+
+    def check_auth_password(self, username, password):
+        self.username = username
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_publickey(self, username, key):
+        self.username = username
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(
+            target=self.server.run_command,
+            args=(self.username, channel, command.decode()),
+            daemon=True,
+        ).start()
+        return True
+
+
+class _SFTPHandle(paramiko.SFTPHandle):
+    def __init__(self, store, path, flags=0):
+        super().__init__(flags)
+        self.store = store
+        self.path = path
+        self.buffer = io.BytesIO()
+
+    def write(self, offset, data):
+        self.buffer.seek(offset)
+        self.buffer.write(data)
+        return paramiko.SFTP_OK
+
+    def close(self):
+        self.store.files[self.path] = self.buffer.getvalue().decode()
+        super().close()
+
+
+class _SFTPInterface(paramiko.SFTPServerInterface):
+    def __init__(self, interface, *args, **kwargs):
+        super().__init__(interface, *args, **kwargs)
+        self.interface = interface
+
+    def open(self, path, flags, attr):
+        store = self.interface.server.store(self.interface.username)
+        return _SFTPHandle(store, path, flags)
+
+    def remove(self, path):
+        self.interface.server.store(self.interface.username).files.pop(path, None)
+        return paramiko.SFTP_OK
+
+
+class StubSSHServer:
+    """
+    Context manager serving SSH on a free loopback port until exit.
+
+    ``files`` seeds every login's store; ``latency`` seconds are added
+    before each command answers, like a slow link or a busy host.
+    """
+
+    def __init__(self, files=None, latency=0, address="127.0.0.1"):
+        self.files = dict(files or {})
+        self.latency = latency
+        self.address = address
+        self.port = None
+        self.connections = 0
+        self.commands = 0
+        self._stores = {}
+        self._lock = threading.Lock()
+        self._transports = []
+        self._socket = None
+        self._thread = None
+        self.host_key = paramiko.RSAKey.generate(2048)
+
+    def __enter__(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.address, 0))
+        self._socket.listen(128)
+        self.port = self._socket.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        # shutdown() wakes the blocked accept(); close() alone does not
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        self._thread.join()
+        for transport in self._transports:
+            transport.close()
+
+    def store(self, username):
+        """The FakeSSHClient holding ``username``'s files."""
+        with self._lock:
+            if username not in self._stores:
+                self._stores[username] = FakeSSHClient(self.files)
+            return self._stores[username]
+
+    def run_command(self, username, channel, command):
+        if self.latency:
+            time.sleep(self.latency)
+        _stdin, stdout, stderr = self.store(username).exec_command(command)
+        with self._lock:
+            self.commands += 1
+        # This may run before paramiko has acknowledged the exec request, so
+        # end with EOF rather than close(): a close that overtakes the
+        # acknowledgement fails the client's exec_command. The client closes
+        # the channel once it is done with it.
+        channel.sendall(stdout.getvalue())
+        channel.sendall_stderr(stderr.getvalue())
+        channel.send_exit_status(stdout.channel.recv_exit_status())
+        channel.shutdown_write()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        transport = paramiko.Transport(conn)
+        transport.add_server_key(self.host_key)
+        transport.set_subsystem_handler("sftp", paramiko.SFTPServer, _SFTPInterface)
+        with self._lock:
+            self.connections += 1
+            self._transports.append(transport)
+        try:
+            transport.start_server(server=_Interface(self))
+        except (paramiko.SSHException, EOFError, OSError):
+            transport.close()
+            return
+        # Commands run from check_channel_exec_request; this loop only holds
+        # on to open channels, since a dropped Channel closes itself
+        channels = []
+        while transport.is_active():
+            channel = transport.accept(1)
+            if channel is not None:
+                channels.append(channel)
+            channels = [channel for channel in channels if not channel.closed]
@@ -0,0 +1,107 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+import threading
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host import telegraf_host
+from frappe_telegraf_ui.monitoring import telemetry
+from frappe_telegraf_ui.ssh import fanout
+from frappe_telegraf_ui.tests.fake_ssh import FakeSSHClient
+
+
+class FakePool:
+    """Hands out FakeSSHClients, refuses ``down`` hosts and tracks peak concurrency."""
+
+    def __init__(self, down=()):
+        self.down = set(down)
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def connection(self, spec):
+        if spec["key"] in self.down:
+            raise OSError("No route to host")
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.02)
+            yield FakeSSHClient()
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def connection_spec(hostname):
+    if hostname == "no-password":
+        raise Exception(f"SSH Password is not set for host '{hostname}'")
+    return {"key": hostname}
+
+
+class TestBulkServiceAction(FrappeTestCase):
+    def run_action(self, hosts, pool, concurrency=20):
+        events, logs = [], []
+        with patch.object(fanout.ssh_pool, "get_pool", return_value=pool), \
+                patch.object(telegraf_host, "_get_connection_spec", connection_spec), \
+                patch.object(telegraf_host, "insert_host_logs", logs.extend), \
+                patch.dict(frappe.conf, {"telegraf_bulk_concurrency": concurrency}), \
+                patch("frappe.db.commit", create=True), \
+                patch("frappe.publish_realtime", create=True,
+                      side_effect=lambda event, data, user: events.append((event, data))):
+            summary = telegraf_host.run_bulk_service_action("restart", hosts, "job-1", "Administrator")
+        return summary, events, logs
+
+    def test_partial_failure(self):
+        summary, events, logs = self.run_action(["web-1", "web-2", "no-password", "db-1"],
+                                                FakePool(down={"web-2"}))
+
+        self.assertEqual(summary["succeeded"], 2)
+        self.assertEqual(sorted(f["host"] for f in summary["failed"]), ["no-password", "web-2"])
+        progress = [data for event, data in events if event == "telegraf_bulk_service_progress"]
+        self.assertEqual(len(progress), 4)
+        self.assertEqual((progress[-1]["done"], progress[-1]["failed"]), (4, 2))
+        self.assertEqual(events[-1][0], "telegraf_bulk_service_done")
+        self.assertEqual(
+            sorted((log["host"], log["new_status"]) for log in logs),
+            [("db-1", "Success"), ("no-password", "Failed"), ("web-1", "Success"), ("web-2", "Failed")],
+        )
+
+    def test_concurrency_cap(self):
+        pool = FakePool()
+        summary, _events, _logs = self.run_action([f"web-{i}" for i in range(12)], pool, concurrency=3)
+
+        self.assertEqual(summary["succeeded"], 12)
+        self.assertEqual(pool.peak, 3)
+
+    def test_hosts_need_write_permission(self):
+        with patch("frappe.has_permission", create=True,
+                   side_effect=lambda doctype, ptype, name: name != "db-1"), \
+                patch("frappe.enqueue", create=True) as enqueue:
+            with self.assertRaises(frappe.PermissionError):
+                telegraf_host.bulk_manage_telegraf_service("restart", hosts=["web-1", "db-1"])
+        enqueue.assert_not_called()
+
+    def test_durations_are_recorded_in_the_calling_thread(self):
+        threads = []
+
+        def enabled():
+            threads.append(threading.current_thread())
+            return True
+
+        telemetry.reset()
+        with patch.object(telemetry, "enabled", enabled):
+            self.run_action([f"web-{i}" for i in range(4)], FakePool(down={"web-3"}))
+        _counters, histograms = telemetry.collect()
+        telemetry.reset()
+
+        self.assertEqual(set(threads), {threading.current_thread()})
+        outcomes = {dict(labels)["outcome"]: histogram["count"] for (name, labels), histogram in histograms.items()
+                    if name == "ssh_operation_seconds"}
+        self.assertEqual(outcomes, {"ok": 3, "error": 1})
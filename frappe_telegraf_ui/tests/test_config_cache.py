@@ -0,0 +1,43 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.ssh import config_cache
+from frappe_telegraf_ui.tests.fake_ssh import FakeSSHClient
+
+PATH = "/etc/telegraf/telegraf.conf"
+
+
+class TestConfigCache(FrappeTestCase):
+    def setUp(self):
+        config_cache.invalidate("cache-test-host")
+        self.client = FakeSSHClient({PATH: "[agent]\n  interval = \"10s\"\n"})
+
+    def read(self, max_age=None):
+        return config_cache.read_config(self.client.factory, "cache-test-host", PATH, max_age)
+
+    def cat_count(self):
+        return sum(1 for command in self.client.commands if command.startswith("cat "))
+
+    def test_unchanged_file_is_not_transferred_again(self):
+        first = self.read()
+        second = self.read()
+        self.assertEqual(first, second)
+        self.assertEqual(self.cat_count(), 1)
+
+    def test_changed_file_is_fetched(self):
+        self.read()
+        self.client.files[PATH] = "[agent]\n  interval = \"30s\"\n"
+        self.assertIn("30s", self.read())
+        self.assertEqual(self.cat_count(), 2)
+
+    def test_max_age_skips_remote_check(self):
+        self.read()
+        self.client.commands.clear()
+        self.read(max_age=300)
+        self.assertEqual(self.client.commands, [])
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            config_cache.read_config(self.client.factory, "cache-test-host", "/nope.conf")
@@ -0,0 +1,174 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+import io
+from unittest.mock import MagicMock, patch
+
+import frappe
+import paramiko
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host import telegraf_host
+from frappe_telegraf_ui.ssh import credentials, known_hosts
+from frappe_telegraf_ui.ssh.pool import connect
+from frappe_telegraf_ui.tests.ssh_server import StubSSHServer
+
+
+def private_key_text(key):
+    buffer = io.StringIO()
+    key.write_private_key(buffer)
+    return buffer.getvalue()
+
+
+class FakeHostDoc:
+    def __init__(self, name="web-1", modified="2026-10-17 10:00:00", **fields):
+        self.name = name
+        self.modified = modified
+        self.ip_address = "127.0.0.1"
+        self.ssh_port = 22
+        self.ssh_user = "telegraf"
+        self.ssh_auth_method = "Password"
+        self.ssh_private_key = None
+        self.ssh_host_key = None
+        self.password = "secret"
+        self.password_reads = 0
+        self.__dict__.update(fields)
+
+    def get(self, field):
+        return getattr(self, field, None)
+
+    def get_password(self, field):
+        self.password_reads += 1
+        return self.password
+
+
+class TestCredentials(FrappeTestCase):
+    def setUp(self):
+        credentials.invalidate()
+        known_hosts.take_pending(frappe.local.site)
+
+    def tearDown(self):
+        credentials.invalidate()
+        known_hosts.take_pending(frappe.local.site)
+
+    def test_loads_ed25519_ecdsa_and_rsa_keys(self):
+        ed25519_text = ed25519.Ed25519PrivateKey.generate().private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.OpenSSH,
+            serialization.NoEncryption(),
+        ).decode()
+        self.assertIsInstance(credentials.load_private_key(ed25519_text), paramiko.Ed25519Key)
+
+        ecdsa_text = private_key_text(paramiko.ECDSAKey.generate())
+        self.assertIsInstance(credentials.load_private_key(ecdsa_text), paramiko.ECDSAKey)
+
+        rsa_text = private_key_text(paramiko.RSAKey.generate(1024))
+        self.assertIsInstance(credentials.load_private_key(rsa_text), paramiko.RSAKey)
+
+        with self.assertRaises(paramiko.SSHException):
+            credentials.load_private_key("not a key")
+
+    def test_spec_is_cached_until_the_document_changes(self):
+        doc = FakeHostDoc()
+        spec = credentials.get_spec(doc.name, doc)
+        self.assertEqual(spec["password"], "secret")
+        self.assertEqual(credentials.get_spec(doc.name, doc), spec)
+        self.assertEqual(doc.password_reads, 1)
+
+        doc.modified = "2026-10-17 11:00:00"
+        doc.password = "changed"
+        self.assertEqual(credentials.get_spec(doc.name, doc)["password"], "changed")
+        self.assertEqual(doc.password_reads, 2)
+
+        credentials.invalidate(doc.name)
+        credentials.get_spec(doc.name, doc)
+        self.assertEqual(doc.password_reads, 3)
+
+    def test_spec_expires_after_ttl(self):
+        doc = FakeHostDoc()
+        with patch.object(credentials.time, "monotonic", return_value=1000):
+            credentials.get_spec(doc.name, doc)
+        with patch.object(credentials.time, "monotonic", return_value=1000 + credentials.DEFAULT_TTL + 1):
+            credentials.get_spec(doc.name, doc)
+        self.assertEqual(doc.password_reads, 2)
+
+    def test_host_key_is_trusted_on_first_use_then_pinned(self):
+        with StubSSHServer() as server:
+            doc = FakeHostDoc(ssh_port=server.port)
+            connect(credentials.build_spec(doc)).close()
+            pinned = known_hosts.take_pending(frappe.local.site)[doc.name]
+            self.assertEqual(pinned, known_hosts.format_host_key(server.host_key))
+
+            # The pinned key is accepted without being recorded again
+            doc.ssh_host_key = pinned
+            connect(credentials.build_spec(doc)).close()
+            self.assertEqual(known_hosts.pending(frappe.local.site), {})
+
+            # A different key is refused
+            doc.ssh_host_key = known_hosts.format_host_key(paramiko.ECDSAKey.generate())
+            with self.assertRaises(paramiko.SSHException):
+                connect(credentials.build_spec(doc))
+            self.assertEqual(known_hosts.pending(frappe.local.site), {})
+
+    def test_pending_keys_are_left_to_the_callers_commit(self):
+        doc = FakeHostDoc()
+        credentials.get_spec(doc.name, doc)
+        host_key = paramiko.ECDSAKey.generate()
+        known_hosts._pending[(frappe.local.site, doc.name)] = known_hosts.format_host_key(host_key)
+
+        db = MagicMock()
+        with patch("frappe.db", db):
+            credentials.save_pending_host_keys()
+            db.set_value.assert_called_once_with(
+                "Telegraf Host", doc.name, "ssh_host_key", known_hosts.format_host_key(host_key),
+                update_modified=False
+            )
+            db.commit.assert_not_called()
+            self.assertIsNone(credentials.get_spec(doc.name, doc)["host_key"])
+
+            # Cached specs pin the key once the caller commits
+            (callback,), _kwargs = db.after_commit.add.call_args
+            callback()
+        self.assertEqual(
+            known_hosts.format_host_key(credentials.get_spec(doc.name, doc)["host_key"]),
+            known_hosts.format_host_key(host_key),
+        )
+
+    def test_reset_host_key_needs_write_permission(self):
+        doc = FakeHostDoc(ssh_host_key="ssh-ed25519 AAAA")
+        doc.save = MagicMock()
+        with patch("frappe.get_doc", create=True, return_value=doc), \
+                patch("frappe.has_permission", create=True, return_value=False):
+            with self.assertRaises(frappe.PermissionError):
+                telegraf_host.reset_host_key(doc.name)
+        doc.save.assert_not_called()
+
+        with patch("frappe.get_doc", create=True, return_value=doc), \
+                patch("frappe.has_permission", create=True, return_value=True):
+            telegraf_host.reset_host_key(doc.name)
+        self.assertIsNone(doc.ssh_host_key)
+        doc.save.assert_called_once_with()
+
+    def test_pending_keys_stay_with_their_site(self):
+        host_key = known_hosts.format_host_key(paramiko.ECDSAKey.generate())
+        known_hosts._pending[("other_site", "web-1")] = host_key
+
+        db = MagicMock()
+        with patch("frappe.db", db):
+            credentials.save_pending_host_keys()
+        db.set_value.assert_not_called()
+        self.assertEqual(known_hosts.take_pending("other_site"), {"web-1": host_key})
+
+    def test_connection_is_released_when_pinning_fails(self):
+        doc = FakeHostDoc()
+        pool = MagicMock()
+        with patch.object(telegraf_host.ssh_pool, "get_pool", return_value=pool), \
+                patch.object(telegraf_host.ssh_credentials, "save_pending_host_keys",
+                             side_effect=Exception("Deadlock found")):
+            with self.assertRaises(Exception):
+                with telegraf_host._get_ssh_client(doc.name, doc):
+                    pass
+        pool.lease.assert_called_once_with(pool.acquire.return_value)
+        pool.lease.return_value.__exit__.assert_called_once()
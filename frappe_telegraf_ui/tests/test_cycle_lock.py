@@ -0,0 +1,80 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+import json
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui import tasks
+from frappe_telegraf_ui.monitoring import cycle_lock
+
+
+class TestCycleLock(FrappeTestCase):
+    def setUp(self):
+        frappe.cache().delete_value([
+            cycle_lock.LOCK_KEY, cycle_lock.CATCH_UP_KEY, cycle_lock.STATS_KEY, cycle_lock.COUNTS_KEY,
+        ])
+
+    def test_second_cycle_is_skipped_while_one_runs(self):
+        token = cycle_lock.acquire(parts=2)
+        self.assertTrue(cycle_lock.is_held(token))
+        self.assertIsNone(cycle_lock.acquire(on_busy="skip"))
+
+        # The lock is only dropped once every shard released its part
+        self.assertFalse(cycle_lock.release(token))
+        self.assertTrue(cycle_lock.is_held(token))
+        self.assertFalse(cycle_lock.release(token))
+        self.assertFalse(cycle_lock.is_held(token))
+
+        stats = cycle_lock.get_stats()
+        self.assertEqual(stats["overrun_skip"], 1)
+        self.assertEqual(stats["last_holder"], "scheduled")
+        self.assertFalse(stats["catch_up_pending"])
+        self.assertTrue(cycle_lock.acquire())
+
+    def test_missed_cycles_are_caught_up_once(self):
+        token = cycle_lock.acquire()
+        self.assertIsNone(cycle_lock.acquire(on_busy="catch_up"))
+        self.assertIsNone(cycle_lock.acquire(on_busy="catch_up"))
+        self.assertTrue(cycle_lock.get_stats()["catch_up_pending"])
+
+        self.assertTrue(cycle_lock.release(token))
+        stats = cycle_lock.get_stats()
+        self.assertEqual(stats["overrun_catch_up"], 2)
+        self.assertEqual(stats["catch_ups"], 1)
+        self.assertFalse(stats["catch_up_pending"])
+
+    def test_expired_cycle_does_not_release_a_newer_one(self):
+        stale = cycle_lock.acquire(parts=2)
+        # Lock and parts expire, a new cycle takes over
+        frappe.cache().delete_value([cycle_lock.LOCK_KEY, cycle_lock.PARTS_KEY + stale])
+        token = cycle_lock.acquire()
+
+        self.assertFalse(cycle_lock.release(stale))
+        self.assertTrue(cycle_lock.is_held(token))
+        self.assertFalse(cycle_lock.is_held(stale))
+
+    def test_release_dispatches_catch_up(self):
+        token = cycle_lock.acquire()
+        cycle_lock.acquire(on_busy="catch_up")
+        with patch.object(frappe, "enqueue", create=True) as enqueue:
+            tasks.release_cycle_lock(token)
+        enqueue.assert_called_once_with(
+            "frappe_telegraf_ui.tasks.dispatch_host_checks", queue="short", catch_up=True
+        )
+
+    def test_manual_check_skips_while_a_cycle_runs(self):
+        token = cycle_lock.acquire()
+        with patch.object(tasks, "get_monitored_hosts") as get_monitored_hosts:
+            self.assertEqual(tasks.check_all_hosts_status(), {"skipped": True})
+        get_monitored_hosts.assert_not_called()
+        cycle_lock.release(token)
+
+    def test_stats_serialize(self):
+        cycle_lock.release(cycle_lock.acquire())
+        cycle_lock.acquire(holder="manual")
+        stats = json.loads(json.dumps(cycle_lock.get_stats()))
+        self.assertEqual(stats["last_holder"], "scheduled")
+        self.assertEqual(stats["held_by"], "manual")
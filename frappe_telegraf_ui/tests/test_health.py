@@ -0,0 +1,112 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host import telegraf_host
+from frappe_telegraf_ui.ssh.health import build_script, host_fields, probe_health, status_from_health
+from frappe_telegraf_ui.tests.fake_ssh import FakeStream
+
+HEALTHY_OUTPUT = """state=active
+pid=4242
+uptime=86400
+version=Telegraf 1.29.4 (git: HEAD@1b1482b5)
+config_sha256=9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08
+last_error=2026-10-17T09:59:00Z E! [outputs.influxdb] When writing to [http://db:8086]: timeout
+load=0.42 0.35 0.30
+"""
+
+
+class ScriptedClient:
+    """Answers every command with fixed output and records what it was asked."""
+
+    def __init__(self, output):
+        self.output = output
+        self.commands = []
+
+    def exec_command(self, command, timeout=None):
+        self.commands.append(command)
+        return None, FakeStream(self.output.encode()), FakeStream()
+
+
+class TestHealthProbe(FrappeTestCase):
+    def test_parses_full_health(self):
+        client = ScriptedClient(HEALTHY_OUTPUT)
+        health = probe_health(client, "/etc/telegraf/telegraf.conf")
+
+        self.assertEqual(len(client.commands), 1)
+        self.assertEqual(health["service_state"], "active")
+        self.assertEqual(health["pid"], 4242)
+        self.assertEqual(health["uptime"], 86400)
+        self.assertEqual(health["version"], "1.29.4")
+        self.assertEqual(health["config_sha256"][:8], "9f86d081")
+        self.assertIn("E! [outputs.influxdb]", health["last_error"])
+        self.assertEqual(health["load_average"], "0.42 0.35 0.30")
+        self.assertEqual(status_from_health(health), "Active")
+        self.assertEqual(host_fields(health)["telegraf_version"], "1.29.4")
+
+    def test_stopped_service_without_binary(self):
+        health = probe_health(ScriptedClient("state=failed\npid=0\nversion=\nconfig_sha256=\nlast_error=\nload=\n"), "/x")
+        self.assertEqual(health["service_state"], "failed")
+        self.assertIsNone(health["pid"])
+        self.assertIsNone(health["uptime"])
+        self.assertIsNone(health["version"])
+        self.assertIsNone(health["load_average"])
+        self.assertEqual(status_from_health(health), "Down")
+
+    def test_config_path_is_quoted(self):
+        script = build_script("/etc/telegraf/my conf'; rm -rf /")
+        self.assertIn("cfg='/etc/telegraf/my conf'\"'\"'; rm -rf /'", script)
+
+
+class TestCheckHostStatus(FrappeTestCase):
+    def check(self, output):
+        host_doc = frappe._dict(name="web-1", status="Down", telegraf_config_path=None)
+        host_doc.update = lambda values: dict.update(host_doc, values)
+        host_doc.save = MagicMock()
+        db = MagicMock()
+
+        @contextmanager
+        def ssh_client(hostname, host_doc, operation):
+            yield ScriptedClient(output)
+
+        with patch("frappe.get_doc", create=True, return_value=host_doc), \
+                patch("frappe.db", db), \
+                patch.object(telegraf_host, "_get_ssh_client", ssh_client), \
+                patch.object(telegraf_host.status_snapshot, "update_host") as update_host, \
+                patch.object(telegraf_host, "publish_status_delta") as publish, \
+                patch.object(telegraf_host, "insert_host_logs") as insert_host_logs:
+            result = telegraf_host.check_host_status("web-1")
+            for callback in [call.args[0] for call in db.after_commit.add.call_args_list]:
+                callback()
+        self.logs = [entry for call in insert_host_logs.call_args_list for entry in call.args[0]]
+        return result, host_doc, db, update_host, publish
+
+    def test_writes_fields_without_saving_the_document(self):
+        result, host_doc, db, update_host, publish = self.check(HEALTHY_OUTPUT)
+
+        self.assertEqual(result["host_status"], "Active")
+        host_doc.save.assert_not_called()
+        (doctype, name, values), kwargs = db.set_value.call_args
+        self.assertEqual((doctype, name), ("Telegraf Host", "web-1"))
+        self.assertEqual(values["status"], "Active")
+        self.assertEqual(values["telegraf_version"], "1.29.4")
+        self.assertEqual(kwargs, {"update_modified": False})
+
+        # The snapshot and the status stream only hear about it after the commit
+        update_host.assert_called_once_with(host_doc)
+        publish.assert_called_once_with({"web-1": "Active"}, host_doc.last_status_check)
+        # Logged so the rollups count the time under the new status
+        self.assertEqual([(log["old_status"], log["new_status"]) for log in self.logs], [("Down", "Active")])
+
+    def test_unchanged_status_is_not_published(self):
+        _result, _host_doc, _db, update_host, publish = self.check(
+            "state=failed\npid=0\nversion=\nconfig_sha256=\nlast_error=\nload=\n"
+        )
+        update_host.assert_called_once()
+        publish.assert_not_called()
+        self.assertEqual(self.logs, [])
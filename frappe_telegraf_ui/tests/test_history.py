@@ -0,0 +1,64 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring import history
+
+BASE = datetime(2026, 3, 1, 12, 0, 0)
+
+
+class FakeLogQuery:
+    """Answers fetch_page's query from a list, applying its keyset condition and LIMIT."""
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: (row["timestamp"], row["name"]), reverse=True)
+        self.queries = 0
+
+    def sql(self, query, values, as_dict=False):
+        self.queries += 1
+        rows = self.rows
+        if "cursor_timestamp" in values:
+            key = (values["cursor_timestamp"], values["cursor_name"])
+            rows = [row for row in rows if (row["timestamp"], row["name"]) < key]
+        return [dict(row) for row in rows[: values["page_size"]]]
+
+
+def make_rows():
+    # Three rows share a timestamp to exercise the name tie-break
+    rows = [{"name": f"log-{i:02d}", "timestamp": BASE - timedelta(minutes=i)} for i in range(7)]
+    rows += [{"name": f"tie-{i}", "timestamp": BASE - timedelta(minutes=3)} for i in range(3)]
+    return rows
+
+
+class TestKeysetPagination(FrappeTestCase):
+    def test_cursor_round_trip(self):
+        row = {"name": "abc", "timestamp": datetime(2026, 3, 1, 12, 0, 0, 123456)}
+        self.assertEqual(history.decode_cursor(history.encode_cursor(row)), (row["timestamp"], "abc"))
+
+    def test_page_size_is_bounded(self):
+        self.assertEqual(history.clamp_page_size(None), history.DEFAULT_PAGE_SIZE)
+        self.assertEqual(history.clamp_page_size(10**6), history.MAX_PAGE_SIZE)
+        self.assertEqual(history.clamp_page_size(0), history.DEFAULT_PAGE_SIZE)
+
+    def test_pages_cover_every_row_once(self):
+        fake = FakeLogQuery(make_rows())
+        with patch("frappe.db.sql", fake.sql, create=True):
+            pages = list(history.iter_pages("1 = 1", {}, ["host"], page_size=3))
+
+        names = [row["name"] for page in pages for row in page]
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 1])
+        self.assertEqual(names, [row["name"] for row in fake.rows])
+        self.assertEqual(fake.queries, 4)
+
+    def test_last_page_has_no_cursor(self):
+        fake = FakeLogQuery(make_rows())
+        with patch("frappe.db.sql", fake.sql, create=True):
+            rows, cursor = history.fetch_page("1 = 1", {}, [], page_size=5)
+            self.assertEqual(len(rows), 5)
+            rows, cursor = history.fetch_page("1 = 1", {}, [], cursor=cursor, page_size=5)
+            self.assertEqual(len(rows), 5)
+            self.assertIsNone(cursor)
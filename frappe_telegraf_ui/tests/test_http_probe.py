@@ -0,0 +1,100 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+import socket
+import time
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring import http_probe
+from frappe_telegraf_ui.monitoring.http_probe import endpoint_url, parse_internal_metrics
+from frappe_telegraf_ui.monitoring.probe import run_probe_cycle
+from frappe_telegraf_ui.tests.fake_agent import METRICS, FakeAgent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestHTTPProbe(FrappeTestCase):
+    def test_parses_internal_metrics(self):
+        agent = parse_internal_metrics(METRICS)
+        self.assertEqual(agent["gather_errors"], 3)
+        self.assertEqual(agent["metrics_dropped"], 12)
+        self.assertEqual(agent["buffer_size"], 2600)
+        self.assertEqual(agent["buffer_limit"], 20000)
+        self.assertEqual(agent["buffer_usage"], 25.0)
+
+    def test_endpoint_url(self):
+        self.assertEqual(endpoint_url(None, "10.0.0.5", 8080), "http://10.0.0.5:8080/")
+        self.assertEqual(endpoint_url(":9273/metrics", "10.0.0.5", 8080), "http://10.0.0.5:9273/metrics")
+        self.assertEqual(endpoint_url("https://agent.example/health", "10.0.0.5", 8080),
+                         "https://agent.example/health")
+
+    def test_healthy_agent_with_metrics(self):
+        with FakeAgent() as agent:
+            results = run_probe_cycle([agent.host()], timeout=2, deadline=5)
+
+        self.assertEqual(results[0]["new_status"], "Active")
+        self.assertEqual(results[0]["agent"]["gather_errors"], 3)
+        self.assertEqual(agent.connections, 2)
+
+    def test_unhealthy_agent_is_down(self):
+        with FakeAgent(healthy=False) as agent:
+            results = run_probe_cycle([agent.host(metrics=False)], timeout=2, deadline=5)
+
+        self.assertEqual(results[0]["new_status"], "Down")
+        self.assertNotIn("agent", results[0])
+
+    def test_timeout_covers_the_whole_probe(self):
+        # Health fits in the timeout, the metrics scrape after it does not
+        with FakeAgent(delay=0.3) as agent:
+            started = time.monotonic()
+            results = run_probe_cycle([agent.host()], timeout=0.5, deadline=5)
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(results[0]["new_status"], "Active")
+        self.assertNotIn("agent", results[0])
+        self.assertLess(elapsed, 0.9)
+
+    def test_healthy_agent_with_metrics_down_is_active(self):
+        with FakeAgent() as agent:
+            host = dict(agent.host(), metrics_url=f":{free_port()}/metrics")
+            results = run_probe_cycle([host], timeout=2, deadline=5)
+
+        self.assertEqual(results[0]["new_status"], "Active")
+        self.assertNotIn("agent", results[0])
+
+    def test_metrics_only_agent_down(self):
+        host = {"name": "web-9", "ip_address": "127.0.0.1", "ssh_port": 22, "status": "Active",
+                "probe_mode": "HTTP", "metrics_url": f":{free_port()}/metrics"}
+        results = run_probe_cycle([host], timeout=2, deadline=5)
+        self.assertEqual(results[0]["new_status"], "Down")
+
+    def test_timed_out_request_is_not_retried(self):
+        with FakeAgent(delay=1) as agent:
+            started = time.monotonic()
+            results = run_probe_cycle([agent.host(metrics=False)], timeout=0.2, deadline=5)
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(results[0]["new_status"], "Down")
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(agent.connections, 1)
+
+    def test_refused_port_is_down(self):
+        host = {"name": "web-9", "ip_address": "127.0.0.1", "ssh_port": 22, "status": "Active",
+                "probe_mode": "HTTP", "health_url": f":{free_port()}/health"}
+        results = run_probe_cycle([host], timeout=2, deadline=5)
+        self.assertEqual(results[0]["new_status"], "Down")
+
+    def test_agent_metrics_are_kept(self):
+        http_probe.forget("web-1")
+        http_probe.record_agent_metrics([
+            {"name": "web-1", "agent": parse_internal_metrics(METRICS)},
+            {"name": "web-2", "new_status": "Active"},
+        ])
+        metrics = http_probe.get_agent_metrics(["web-1", "web-2"])
+        self.assertEqual(metrics["web-1"]["buffer_usage"], 25.0)
+        self.assertIsNone(metrics["web-2"])
@@ -0,0 +1,79 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring import hysteresis
+from frappe_telegraf_ui.monitoring.hysteresis import FLAPPING, transition
+from frappe_telegraf_ui.monitoring.writeback import plan_write_back
+
+POLICY = {
+    "down_after": 3,
+    "up_after": 2,
+    "flap_window": 1800,
+    "flap_threshold": 4,
+    "flap_clear_after": 600,
+}
+
+
+def feed(raw_statuses, confirmed="Active", state=None, start=0, step=60):
+    """Run a sequence of raw results; returns the confirmed status after each."""
+    seen = []
+    for index, raw in enumerate(raw_statuses):
+        state, confirmed = transition(state, raw, confirmed, start + index * step, POLICY)
+        seen.append(confirmed)
+    return seen, state
+
+
+class TestStatusHysteresis(FrappeTestCase):
+    def test_down_needs_consecutive_failures(self):
+        seen, _ = feed(["Down", "Down", "Down"])
+        self.assertEqual(seen, ["Active", "Active", "Down"])
+
+    def test_single_blip_is_ignored(self):
+        seen, _ = feed(["Active", "Down", "Active", "Active"])
+        self.assertEqual(set(seen), {"Active"})
+
+    def test_recovery_needs_consecutive_successes(self):
+        seen, _ = feed(["Active", "Active"], confirmed="Down")
+        self.assertEqual(seen, ["Down", "Active"])
+
+    def test_probe_errors_count_as_failures(self):
+        seen, _ = feed(["Unknown", "Down", "Down"])
+        self.assertEqual(seen[-1], "Down")
+
+    def test_first_probe_of_unknown_host_is_trusted(self):
+        seen, _ = feed(["Active"], confirmed="Unknown")
+        self.assertEqual(seen, ["Active"])
+
+    def test_flapping_and_settling(self):
+        seen, state = feed(["Down", "Active", "Down", "Active"])
+        self.assertEqual(seen[-1], FLAPPING)
+
+        # Stable, but not yet for flap_clear_after seconds
+        seen, state = feed(["Active"] * 5, confirmed=FLAPPING, state=state, start=240)
+        self.assertEqual(seen[:5], [FLAPPING] * 5)
+
+        seen, _ = feed(["Active"] * 6, confirmed=FLAPPING, state=state, start=540)
+        self.assertEqual(seen[-1], "Active")
+
+    def test_apply_keeps_raw_status(self):
+        hysteresis.forget("web-1")
+        results = [{"name": "web-1", "old_status": "Active", "new_status": "Down", "error": None}]
+        hysteresis.apply(results, now=1000)
+        self.assertEqual(results[0]["raw_status"], "Down")
+        self.assertEqual(results[0]["new_status"], "Active")
+        self.assertEqual(hysteresis.get_state("web-1")["streak"], 1)
+
+    def test_probe_errors_are_debounced_before_write_back(self):
+        hysteresis.forget("web-1")
+        for attempt in range(3):
+            results = [{"name": "web-1", "old_status": "Active", "new_status": "Unknown",
+                        "response_time": 0, "error": "timed out"}]
+            hysteresis.apply(results, now=1000 + attempt * 60)
+            unchanged, changed, _logs = plan_write_back(results)
+            if attempt < 2:
+                self.assertEqual(unchanged, {"Active": ["web-1"]})
+                self.assertEqual(changed, {})
+
+        self.assertEqual(changed, {"web-1": "Unknown"})
@@ -0,0 +1,80 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+import numpy as np
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring import latency
+
+NOW = 1_800_000_000
+
+
+class TestLatencyRingBuffer(FrappeTestCase):
+    def setUp(self):
+        for host in ("web-1", "web-2", "idle"):
+            latency.forget(host)
+        self.capacity = patch.object(latency, "get_capacity", return_value=10)
+        self.capacity.start()
+
+    def tearDown(self):
+        self.capacity.stop()
+
+    def test_ring_keeps_newest_samples(self):
+        for minute in range(15):
+            latency.record_samples({"web-1": float(minute)}, NOW + minute * 60)
+
+        matrix = latency.load_matrix(["web-1"])
+        self.assertEqual(matrix.shape, (1, 10))
+        self.assertEqual(sorted(matrix["ms"][0].tolist()), [float(m) for m in range(5, 15)])
+
+    def test_percentiles_loss_and_trend(self):
+        for minute in range(10):
+            latency.record_samples({
+                # web-1 gets 2ms slower every minute; web-2 fails every other probe
+                "web-1": 10.0 + 2 * minute,
+                "web-2": None if minute % 2 else 5.0,
+            }, NOW + minute * 60)
+
+        stats = latency.compute_stats(latency.load_matrix(["web-1", "web-2", "idle"]), NOW, NOW + 600)
+        web_1, web_2, idle = stats
+
+        expected = np.percentile(10.0 + 2 * np.arange(10), latency.PERCENTILES)
+        self.assertAlmostEqual(web_1["p50"], expected[0], places=3)
+        self.assertAlmostEqual(web_1["p99"], expected[2], places=3)
+        self.assertAlmostEqual(web_1["trend_ms_per_hour"], 120.0, places=1)
+        self.assertEqual(web_1["loss_percent"], 0)
+
+        self.assertEqual((web_2["probes"], web_2["samples"]), (10, 5))
+        self.assertEqual(web_2["loss_percent"], 50.0)
+        self.assertEqual(web_2["p95"], 5.0)
+
+        self.assertEqual(idle["samples"], 0)
+        self.assertIsNone(idle["p50"])
+
+    def test_window_excludes_old_samples(self):
+        latency.record_samples({"web-1": 100.0}, NOW - 7200)
+        latency.record_samples({"web-1": 1.0}, NOW)
+        (stats,) = latency.compute_stats(latency.load_matrix(["web-1"]), NOW - 3600, NOW)
+        self.assertEqual(stats["samples"], 1)
+        self.assertEqual(stats["p99"], 1.0)
+
+    def test_forget_drops_buffer(self):
+        latency.record_samples({"web-1": 1.0}, NOW)
+        latency.forget("web-1")
+        self.assertEqual(latency.load_matrix(["web-1"])["ts"].sum(), 0)
+        self.assertIsNone(frappe.cache().hget(latency.INDEX_KEY, "web-1"))
+
+    def test_summarize_slots_per_hour(self):
+        latency.record_samples({"web-1": 2.0, "web-2": None}, NOW - 3600)
+        latency.record_samples({"web-1": 4.0}, NOW + 60)
+        latency.record_samples({"web-1": 8.0, "web-2": 1.0}, NOW + 120)
+        latency.record_samples({"web-1": 50.0}, NOW + 3600)
+
+        slots = latency.summarize_slots(["web-1", "web-2", "idle"], NOW, NOW + 3600, NOW)
+        self.assertEqual(slots, {
+            ("web-1", 0): (2, 12.0, 4.0, 8.0),
+            ("web-2", 0): (1, 1.0, 1.0, 1.0),
+        })
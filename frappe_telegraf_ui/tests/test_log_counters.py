@@ -0,0 +1,65 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from datetime import timedelta
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now_datetime
+
+from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host_log import telegraf_host_log
+from frappe_telegraf_ui.monitoring import log_counters
+
+
+def row(host, event_type, hours_ago=0):
+    return {"host": host, "event_type": event_type, "timestamp": now_datetime() - timedelta(hours=hours_ago)}
+
+
+class TestLogCounters(FrappeTestCase):
+    def setUp(self):
+        frappe.cache().delete_value([
+            log_counters.COUNTS_KEY, log_counters.HOSTS_KEY, log_counters.HOURLY_KEY,
+        ])
+        frappe.cache().set_value(log_counters.READY_KEY, 1)
+
+    def test_inserts_and_deletes(self):
+        rows = [row("web-1", "Status Change")] * 3 + [row("web-2", "Config Update", hours_ago=30)]
+        log_counters.apply(rows)
+        log_counters.apply([row("web-1", "Status Change")], sign=-1)
+
+        stats = log_counters.get_statistics(top=10)
+        self.assertEqual(stats["total_logs"], 3)
+        self.assertEqual(stats["recent_activity"], 2)
+        self.assertEqual(stats["event_types"], [
+            {"event_type": "Status Change", "count": 2},
+            {"event_type": "Config Update", "count": 1},
+        ])
+        self.assertEqual(stats["top_hosts"], [{"host": "web-1", "count": 2}, {"host": "web-2", "count": 1}])
+
+    def test_hosts_drop_out_at_zero(self):
+        log_counters.apply([row("web-1", "Status Change")])
+        log_counters.apply([row("web-1", "Status Change")], sign=-1)
+        self.assertEqual(log_counters.get_statistics()["top_hosts"], [])
+
+    def test_reconcile_repairs_drift(self):
+        log_counters.apply([row("web-1", "Status Change")] * 5)
+        hour = log_counters._hour(now_datetime())
+        table = ({"total": 2, "event:Status Change": 2}, {"web-1": 1, "web-2": 1}, {hour: 2})
+
+        with patch.object(log_counters, "count_table", return_value=table):
+            drift = log_counters.reconcile()
+
+        self.assertEqual(drift["total"], 3)
+        self.assertEqual(drift["event_types"], {"Status Change": 3})
+        self.assertEqual(drift["hosts"], 2)
+        stats = log_counters.get_statistics()
+        self.assertEqual((stats["total_logs"], stats["recent_activity"]), (2, 2))
+        self.assertEqual(len(stats["top_hosts"]), 2)
+
+    def test_log_statistics_never_query_the_database(self):
+        log_counters.apply([row("web-1", "Status Change")])
+        with patch("frappe.db.sql", create=True, side_effect=AssertionError("table query")):
+            response = telegraf_host_log.get_log_statistics()
+        self.assertEqual(response["status"], "success")
+        self.assertEqual(response["statistics"]["total_logs"], 1)
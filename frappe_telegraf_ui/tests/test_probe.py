@@ -0,0 +1,46 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+import time
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring.probe import run_probe_cycle
+from frappe_telegraf_ui.tests.fleet import FakeFleet
+
+
+class TestProbeEngine(FrappeTestCase):
+    def test_result_shape_and_status(self):
+        with FakeFleet(20, down=5) as fleet:
+            results = run_probe_cycle(fleet.hosts, concurrency=10, timeout=2, deadline=10)
+
+        self.assertEqual(len(results), 20)
+        self.assertEqual(
+            set(results[0]), {"name", "old_status", "new_status", "response_time", "error"}
+        )
+        statuses = [r["new_status"] for r in results]
+        self.assertEqual(statuses.count("Down"), 5)
+        self.assertEqual(statuses.count("Active"), 15)
+        self.assertTrue(all(r["response_time"] >= 0 for r in results))
+
+    def test_deadline_drops_unfinished_probes(self):
+        # 192.0.2.0/24 is TEST-NET-1: connects hang until the probe timeout
+        hosts = [
+            {"name": f"blackhole-{i}", "ip_address": "192.0.2.1", "ssh_port": 22, "status": "Active"}
+            for i in range(5)
+        ]
+        start = time.monotonic()
+        results = run_probe_cycle(hosts, concurrency=5, timeout=30, deadline=0.5)
+        self.assertLess(time.monotonic() - start, 5)
+        # Depending on the network stack the connect either hangs (dropped by
+        # the deadline) or fails fast (reported Down) - never Active.
+        self.assertTrue(all(r["new_status"] == "Down" for r in results))
+
+    def test_five_thousand_host_cycle(self):
+        with FakeFleet(5000, down=100) as fleet:
+            start = time.monotonic()
+            results = run_probe_cycle(fleet.hosts, concurrency=500, timeout=5, deadline=55)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(len(results), 5000)
+        self.assertLess(elapsed, 30, f"5,000 host cycle took {elapsed:.1f}s")
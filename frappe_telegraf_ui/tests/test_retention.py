@@ -0,0 +1,85 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring import retention
+
+NOW = datetime(2026, 1, 31, 12, 0, 0)
+
+
+class FakeLogTable:
+    """Expired rows in name order, served the way _fetch_chunk would."""
+
+    def __init__(self, count):
+        self.names = [f"log-{index:05d}" for index in range(count)]
+        self.deleted_chunks = []
+
+    def fetch(self, conditions, values, cursor, chunk_size):
+        remaining = [name for name in self.names if cursor is None or name > cursor]
+        return [{"name": name} for name in remaining[:chunk_size]]
+
+    def delete(self, rows):
+        names = {row["name"] for row in rows}
+        self.deleted_chunks.append(len(names))
+        self.names = [name for name in self.names if name not in names]
+
+
+class TestRetentionPolicy(FrappeTestCase):
+    def test_default_only(self):
+        conditions, values = retention.build_conditions({"default": 7}, NOW)
+        self.assertEqual(conditions, "(timestamp < %s)")
+        self.assertEqual(values, (NOW - timedelta(days=7),))
+
+    def test_per_event_type(self):
+        policy = {"default": 7, "Config Update": 90, "Service Restart": 0}
+        conditions, values = retention.build_conditions(policy, NOW)
+        self.assertEqual(conditions.count("event_type = %s"), 1)
+        self.assertEqual(values[:2], ("Config Update", NOW - timedelta(days=90)))
+        # Listed event types are excluded from the default, even when kept forever
+        self.assertEqual(values[2:], (("Config Update", "Service Restart"), NOW - timedelta(days=7)))
+
+    def test_keep_everything(self):
+        self.assertEqual(retention.build_conditions({"default": 0}, NOW), (None, ()))
+
+
+class TestRetentionRun(FrappeTestCase):
+    def setUp(self):
+        frappe.cache().delete_value([retention.CURSOR_KEY, retention.STATS_KEY])
+
+    def run_purge(self, table, **kwargs):
+        with patch.object(retention, "_fetch_chunk", table.fetch), \
+                patch.object(retention, "_delete_chunk", table.delete):
+            return retention.purge_expired(policy={"default": 7}, cursor_key="test", **kwargs)
+
+    def test_deletes_in_chunks(self):
+        table = FakeLogTable(25)
+        stats = self.run_purge(table, chunk_size=10, budget=60)
+        self.assertTrue(stats["complete"])
+        self.assertEqual(stats["deleted"], 25)
+        self.assertEqual(table.deleted_chunks, [10, 10, 5])
+        self.assertIsNone(frappe.cache().hget(retention.CURSOR_KEY, "test"))
+
+    def test_resumes_after_budget(self):
+        table = FakeLogTable(25)
+        stats = self.run_purge(table, chunk_size=10, budget=0)
+        self.assertFalse(stats["complete"])
+        self.assertEqual(stats["deleted"], 10)
+        self.assertEqual(frappe.cache().hget(retention.CURSOR_KEY, "test"), "log-00009")
+
+        stats = self.run_purge(table, chunk_size=10, budget=60)
+        self.assertEqual(stats["resumed_from"], "log-00009")
+        self.assertEqual(stats["deleted"], 15)
+        self.assertTrue(stats["complete"])
+        self.assertEqual(table.names, [])
+
+    def test_stats_serialize(self):
+        self.run_purge(FakeLogTable(5), chunk_size=10, budget=60)
+        stats = retention.get_stats()
+        self.assertEqual(list(stats), ["test"])
+        self.assertEqual(json.loads(json.dumps(stats))["test"]["deleted"], 5)
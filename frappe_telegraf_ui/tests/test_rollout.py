@@ -0,0 +1,86 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.ssh import rollout
+from frappe_telegraf_ui.ssh.rollout import build_waves, push_config
+from frappe_telegraf_ui.tests.fake_ssh import FakeSSHClient
+
+PATH = "/etc/telegraf/telegraf.conf"
+POLICY = {"canary_size": 1, "batch_percent": 50, "max_failure_rate": 0.2, "concurrency": 5, "reload": True}
+
+
+def spec(name):
+    return {"key": name, "config_path": PATH, "config": f"# {name}\n", "reload": True}
+
+
+class FakeRollout:
+    """Stands in for the SSH fan-out and the log table; ``failing`` hosts fail their push."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.waves = []
+        self.logs = []
+
+    def run_on_hosts(self, wave, operation, concurrency, name):
+        self.waves.append([s["key"] for s in wave])
+        return [
+            {"host": s["key"], "ok": s["key"] not in self.failing, "duration": 0.1,
+             "message": "Connection refused" if s["key"] in self.failing else "Updated"}
+            for s in wave
+        ]
+
+    def run(self, hosts):
+        with patch.object(rollout, "_build_specs", return_value=([spec(h) for h in hosts], [])), \
+                patch.object(rollout, "run_on_hosts", self.run_on_hosts), \
+                patch.object(rollout, "insert_host_logs", self.logs.extend), \
+                patch.object(rollout.config_cache, "store_config"), \
+                patch("frappe.db.commit", create=True), \
+                patch("frappe.log_error", create=True) as log_error:
+            summary = rollout.run_rollout(hosts, POLICY)
+        self.log_error = log_error
+        return summary
+
+
+class TestRollout(FrappeTestCase):
+    def test_waves(self):
+        hosts = list(range(10))
+        waves = build_waves(hosts, canary_size=1, batch_percent=30)
+        self.assertEqual(waves, [[0], [1, 2, 3], [4, 5, 6], [7, 8, 9]])
+        self.assertEqual(build_waves(hosts, canary_size=0, batch_percent=50), [hosts[:5], hosts[5:]])
+        self.assertEqual(build_waves([], canary_size=1, batch_percent=25), [])
+
+    def test_push_config(self):
+        client = FakeSSHClient({PATH: "old"})
+        spec = {"key": "host-1", "config_path": PATH, "config": "new", "reload": True}
+
+        self.assertEqual(push_config(client, spec), "Updated")
+        self.assertIn("systemctl reload telegraf && systemctl is-active telegraf", client.commands)
+        self.assertEqual(push_config(client, spec), "Unchanged")
+
+    def test_rollout_stops_when_a_wave_fails(self):
+        hosts = ["h0", "h1", "h2", "h3", "h4"]
+        fake = FakeRollout(failing={"h1", "h2"})
+        summary = fake.run(hosts)
+
+        # Canary, then a wave of three with two failures; the last wave never runs
+        self.assertEqual(fake.waves, [["h0"], ["h1", "h2", "h3"]])
+        self.assertTrue(summary["aborted"])
+        self.assertEqual((summary["updated"], summary["failed"], summary["skipped"]), (2, 2, 1))
+        fake.log_error.assert_called_once()
+
+    def test_rollout_logs_every_host(self):
+        fake = FakeRollout(failing={"h2"})
+        hosts = [f"h{i}" for i in range(10)]
+        summary = fake.run(hosts)
+
+        self.assertFalse(summary["aborted"])
+        # One failure in a wave of five stays within the 20% threshold
+        self.assertEqual(sorted(log["host"] for log in fake.logs), hosts)
+        self.assertTrue(all(log["event_type"] == "Config Update" for log in fake.logs))
+        failed = [log for log in fake.logs if log["host"] == "h2"][0]
+        self.assertEqual(failed["new_status"], "Failed")
+        self.assertEqual(failed["details"], "Config rollout: Connection refused")
@@ -0,0 +1,112 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from datetime import datetime
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.frappe_telegraf_ui.doctype.telegraf_host_rollup import telegraf_host_rollup
+from frappe_telegraf_ui.monitoring import rollup
+
+from frappe_telegraf_ui.monitoring.rollup import (
+    NAME_LIMIT,
+    aggregate_daily,
+    bucket_name,
+    merge_bucket,
+    new_bucket,
+    roll_up,
+)
+
+START = datetime(2026, 3, 1, 10, 30)
+END = datetime(2026, 3, 1, 12, 0)
+
+
+def change(host, old, new, at, response_time=None):
+    return {
+        "host": host,
+        "event_type": "Status Change",
+        "old_status": old,
+        "new_status": new,
+        "response_time": response_time,
+        "timestamp": at,
+    }
+
+
+class TestRollUp(FrappeTestCase):
+    def test_time_in_status_split_by_hour(self):
+        states = {"web-1": {"status": "Active", "since": START}}
+        events = [
+            change("web-1", "Active", "Down", datetime(2026, 3, 1, 10, 50)),
+            change("web-1", "Down", "Active", datetime(2026, 3, 1, 11, 10), response_time=99.0),
+        ]
+        samples = {("web-1", datetime(2026, 3, 1, 11)): (3, 12.0, 2.0, 6.0)}
+        buckets = roll_up(states, events, START, END, samples)
+
+        first = buckets[("web-1", datetime(2026, 3, 1, 10))]
+        self.assertEqual(first["seconds_active"], 20 * 60)
+        self.assertEqual(first["seconds_down"], 10 * 60)
+        self.assertEqual(first["transitions"], 1)
+        self.assertEqual(first["last_status"], "Down")
+
+        second = buckets[("web-1", datetime(2026, 3, 1, 11))]
+        self.assertEqual(second["seconds_down"], 10 * 60)
+        self.assertEqual(second["seconds_active"], 50 * 60)
+        self.assertEqual(second["transitions"], 1)
+        # Latency comes from the probe samples, not the log rows
+        self.assertEqual((second["response_min"], second["response_avg"], second["response_max"]), (2.0, 4.0, 6.0))
+        self.assertEqual(first["response_count"], 0)
+        self.assertEqual(second["last_status"], "Active")
+
+    def test_quiet_and_new_hosts(self):
+        states = {
+            "quiet": {"status": "Down", "since": START},
+            "new": {"status": "Active", "since": datetime(2026, 3, 1, 11, 45)},
+        }
+        buckets = roll_up(states, [], START, END)
+
+        self.assertEqual(buckets[("quiet", datetime(2026, 3, 1, 10))]["seconds_down"], 30 * 60)
+        self.assertEqual(buckets[("quiet", datetime(2026, 3, 1, 11))]["seconds_down"], 60 * 60)
+        self.assertNotIn(("new", datetime(2026, 3, 1, 10)), buckets)
+        self.assertEqual(buckets[("new", datetime(2026, 3, 1, 11))]["seconds_active"], 15 * 60)
+
+    def test_merges_partial_bucket_and_days(self):
+        earlier = dict(new_bucket(), seconds_active=1800, response_count=1, response_sum=2.0,
+                       response_min=2.0, response_max=2.0, last_status="Active")
+        later = dict(new_bucket(), seconds_down=1800, transitions=1, response_count=1,
+                     response_sum=6.0, response_min=6.0, response_max=6.0, last_status="Down")
+        merged = merge_bucket(dict(earlier), later)
+        self.assertEqual((merged["seconds_active"], merged["seconds_down"]), (1800, 1800))
+        self.assertEqual((merged["response_min"], merged["response_max"]), (2.0, 6.0))
+        self.assertEqual(merged["last_status"], "Down")
+
+        days = aggregate_daily([
+            dict(earlier, host="web-1", bucket_start=datetime(2026, 3, 1, 10)),
+            dict(later, host="web-1", bucket_start=datetime(2026, 3, 1, 11)),
+        ])
+        day = days[("web-1", datetime(2026, 3, 1))]
+        self.assertEqual(day["response_avg"], 4.0)
+        self.assertEqual(day["transitions"], 1)
+        self.assertEqual(day["last_status"], "Down")
+
+    def test_bucket_names_fit_the_name_column(self):
+        self.assertEqual(bucket_name("web-1", "Hourly", datetime(2026, 3, 1, 10)), "web-1-H2026030110")
+
+        long_host = "web-" + "x" * 200
+        name = bucket_name(long_host, "Daily", datetime(2026, 3, 1))
+        self.assertEqual(len(name), NAME_LIMIT)
+        self.assertTrue(name.endswith("-D2026030100"))
+        self.assertNotEqual(name, bucket_name(long_host + "y", "Daily", datetime(2026, 3, 1)))
+
+    def test_fleet_uptime_skips_hosts_without_data(self):
+        rows = [
+            frappe._dict(host="idle", uptime_percent=None),
+            frappe._dict(host="web-1", uptime_percent=99.0),
+            frappe._dict(host="web-2", uptime_percent=90.0),
+        ]
+        with patch.object(rollup, "get_availability", return_value=rows):
+            response = telegraf_host_rollup.get_fleet_uptime(limit=5)
+
+        self.assertEqual(response["uptime_percent"], 94.5)
+        self.assertEqual([row.host for row in response["lowest_uptime"]], ["web-2", "web-1"])
@@ -0,0 +1,50 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring.schedule import SLACK, next_state
+
+POLICY = {
+    "min_interval": 60,
+    "max_interval": 600,
+    "flap_window": 1800,
+    "flap_threshold": 3,
+    "breaker_after": 1800,
+    "breaker_interval": 900,
+}
+
+
+class TestProbeSchedule(FrappeTestCase):
+    def test_stable_host_backs_off(self):
+        state, now = None, 0
+        intervals = []
+        for _ in range(6):
+            state = next_state(state, "Active", now, POLICY)
+            intervals.append(state["interval"])
+            now = state["next_check_at"]
+        self.assertEqual(intervals, [60, 120, 240, 480, 600, 600])
+
+    def test_state_change_probes_again_next_cycle(self):
+        state = {"status": "Active", "interval": 600, "flips": []}
+        state = next_state(state, "Down", 1000, POLICY)
+        self.assertEqual(state["interval"], 60)
+        self.assertEqual(state["next_check_at"], 1000 + 60 - SLACK)
+        self.assertEqual(state["down_since"], 1000)
+
+    def test_flapping_host_stays_at_min_interval(self):
+        state = {"status": "Active", "interval": 60, "flips": [100, 200, 300]}
+        state = next_state(state, "Active", 400, POLICY)
+        self.assertEqual(state["interval"], 60)
+
+    def test_long_dead_host_trips_breaker(self):
+        state = {"status": "Down", "interval": 480, "flips": [], "down_since": 0}
+        state = next_state(state, "Down", 1800, POLICY)
+        self.assertEqual(state["breaker"], "open")
+        self.assertEqual(state["interval"], 900)
+
+        # A successful half-open probe closes it again
+        state = next_state(state, "Active", 2700, POLICY)
+        self.assertEqual(state["breaker"], "closed")
+        self.assertEqual(state["interval"], 60)
+        self.assertIsNone(state["down_since"])
@@ -0,0 +1,66 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+import sqlite3
+import zlib
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui import tasks
+from frappe_telegraf_ui.monitoring import sharding
+from frappe_telegraf_ui.monitoring.sharding import get_start_offsets, select_shard, shard_of
+
+
+class TestSharding(FrappeTestCase):
+    def test_shards_partition_the_fleet(self):
+        hosts = [{"name": f"host-{i}"} for i in range(1000)]
+        shards = [select_shard(hosts, index, 4) for index in range(4)]
+
+        self.assertEqual(sum(len(shard) for shard in shards), len(hosts))
+        # crc32 spreads names evenly enough that no shard is starved
+        self.assertTrue(all(len(shard) > 150 for shard in shards))
+
+    def test_shard_is_stable(self):
+        self.assertEqual(shard_of("db-01", 8), shard_of("db-01", 8))
+        self.assertEqual(shard_of("db-01", 1), 0)
+
+    def test_start_offsets(self):
+        self.assertEqual(get_start_offsets(4, spread=30), [0, 7.5, 15, 22.5])
+        self.assertEqual(get_start_offsets(1, spread=30), [0])
+
+    def test_shards_only_wait_on_their_own_queue(self):
+        workers = {"telegraf_monitoring": 4, "short": 4}
+        with patch.object(sharding, "count_workers",
+                          side_effect=lambda queue, minimum=1: max(workers[queue], minimum)):
+            self.assertEqual(sharding.get_shard_queue(), ("telegraf_monitoring", True))
+            self.assertEqual(sharding.get_shard_count(5000, queue="telegraf_monitoring"), 4)
+
+            workers["telegraf_monitoring"] = 0
+            self.assertEqual(sharding.get_shard_queue(), ("short", False))
+            # One short worker stays free for manual checks
+            self.assertEqual(sharding.get_shard_count(5000, queue="short"), 3)
+
+    def test_shard_query_matches_shard_of(self):
+        # Stand-in for MariaDB: same SQL, with CRC32 provided by zlib
+        db = sqlite3.connect(":memory:")
+        db.row_factory = sqlite3.Row
+        db.create_function("CRC32", 1, lambda value: zlib.crc32(value.encode("utf-8")))
+        db.execute(f"CREATE TABLE `tabTelegraf Host` ({', '.join(tasks.MONITORED_FIELDS)})")
+        names = [f"host-{i}" for i in range(200)] + ["häst-1"]
+        db.executemany("INSERT INTO `tabTelegraf Host` (name, status) VALUES (?, ?)",
+                       [(name, "Active") for name in names] + [("off-1", "Disabled")])
+
+        def sql(query, values, as_dict=False):
+            rows = db.execute(query.replace("%s", "?").replace("%%", "%"), values).fetchall()
+            return [frappe._dict(row) for row in rows]
+
+        with patch("frappe.db.sql", create=True, side_effect=sql), \
+                patch("frappe.db.commit", create=True), \
+                patch("frappe.get_all", create=True) as get_all:
+            shards = [[host.name for host in tasks.get_monitored_hosts(index, 4)] for index in range(4)]
+        get_all.assert_not_called()
+
+        for index, shard in enumerate(shards):
+            self.assertEqual(sorted(shard), sorted(name for name in names if shard_of(name, 4) == index))
@@ -0,0 +1,65 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.benchmarks.fleet import compare
+from frappe_telegraf_ui.monitoring.probe import run_probe_cycle
+from frappe_telegraf_ui.ssh import config_cache
+from frappe_telegraf_ui.ssh.pool import connect
+from frappe_telegraf_ui.ssh.upload import upload_files
+from frappe_telegraf_ui.tests.fleet import FakeFleet
+from frappe_telegraf_ui.tests.ssh_server import StubSSHServer
+
+CONFIG_PATH = "/etc/telegraf/telegraf.conf"
+
+
+class TestSimulatedFleet(FrappeTestCase):
+    def test_dropped_hosts_are_never_active(self):
+        with FakeFleet(40, drop_rate=0.25, seed=7) as fleet:
+            dropped = {h["name"] for h in fleet.hosts if h["ip_address"].startswith("192.0.2.")}
+            results = run_probe_cycle(fleet.hosts, concurrency=40, timeout=0.5, deadline=2)
+
+        self.assertTrue(dropped)
+        for result in results:
+            expected = "Down" if result["name"] in dropped else "Active"
+            self.assertEqual(result["new_status"], expected)
+
+    def test_http_fleet_latency(self):
+        with FakeFleet(10, http=True, latency=0.05, port=10080) as fleet:
+            results = run_probe_cycle(fleet.hosts, concurrency=10, timeout=2, deadline=5)
+
+        self.assertEqual([r["new_status"] for r in results], ["Active"] * 10)
+        self.assertTrue(all(r["response_time"] >= 50 for r in results))
+
+    def test_stub_ssh_server(self):
+        with StubSSHServer({CONFIG_PATH: "[agent]\n"}) as server:
+            client = connect({"ip_address": "127.0.0.1", "port": server.port,
+                              "username": "web-1", "password": "secret"})
+            try:
+                checksum, _mtime, size = config_cache.remote_fingerprint(client, CONFIG_PATH)
+                self.assertEqual(size, len("[agent]\n"))
+
+                results = upload_files(client, [(CONFIG_PATH, "[agent]\n  interval = '5s'\n")])
+                self.assertTrue(results[0]["changed"])
+                self.assertNotEqual(results[0]["sha256"], checksum)
+
+                _stdin, stdout, _stderr = client.exec_command("systemctl is-active telegraf")
+                self.assertEqual(stdout.read(), b"active\n")
+            finally:
+                client.close()
+
+            # Each login keeps its own files
+            self.assertIn("interval", server.store("web-1").files[CONFIG_PATH])
+            self.assertEqual(server.store("web-2").files[CONFIG_PATH], "[agent]\n")
+
+    def test_baseline_comparison(self):
+        baseline = {"get_host_logs": {"wall_s": 1.0, "p95_ms": 10, "peak_mb": 2, "statements": 50}}
+        results = {"get_host_logs": {"wall_s": 1.1, "p95_ms": 15, "peak_mb": 2, "statements": 51},
+                   "get_log_statistics": {"wall_s": 9}}
+
+        self.assertEqual(compare(results, baseline, tolerance=0.2), [
+            "get_host_logs.p95_ms: 10 -> 15",
+            "get_host_logs.statements: 50 -> 51",
+        ])
+        self.assertEqual(compare(results, None), [])
@@ -0,0 +1,96 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring import snapshot, store
+
+ROWS = [
+    {"name": "a", "hostname": "a", "status": "Active", "last_status_check": None, "ip_address": "10.0.0.0"},
+    {"name": "b", "hostname": "b", "status": "Down", "last_status_check": None, "ip_address": "10.0.0.1"},
+    {"name": "c", "hostname": "c", "status": "Down", "last_status_check": None, "ip_address": "10.0.0.2"},
+]
+
+
+class TestStatusSnapshot(FrappeTestCase):
+    def setUp(self):
+        snapshot.invalidate()
+        store.hset_many(snapshot.HOSTS_KEY, {
+            name: {"name": name, "hostname": name, "status": status,
+                   "last_status_check": None, "ip_address": f"10.0.0.{i}"}
+            for i, (name, status) in enumerate([("a", "Active"), ("b", "Active"), ("c", "Down")])
+        })
+        store.hincrby_many(snapshot.COUNTS_KEY, {"Active": 2, "Down": 1})
+        frappe.cache().set_value(snapshot.READY_KEY, 1)
+
+    def tearDown(self):
+        snapshot.invalidate()
+
+    def test_apply_write_back(self):
+        snapshot.apply_write_back({"Active": ["a"]}, {"b": "Down"}, "2025-01-01 00:00:00")
+
+        self.assertEqual(snapshot.get_counts(), {"Active": 1, "Down": 2})
+        hosts = {host["name"]: host for host in snapshot.get_hosts()}
+        self.assertEqual(hosts["b"]["status"], "Down")
+        self.assertEqual(hosts["a"]["last_status_check"], "2025-01-01 00:00:00")
+        self.assertIsNone(hosts["c"]["last_status_check"])
+
+    def test_query_filters_and_pages(self):
+        hosts, total = snapshot.query(status="Active")
+        self.assertEqual(([h["name"] for h in hosts], total), (["a", "b"], 2))
+
+        hosts, total = snapshot.query(start=1, page_length=1)
+        self.assertEqual(([h["name"] for h in hosts], total), (["b"], 3))
+
+        hosts, total = snapshot.query(search="10.0.0.2")
+        self.assertEqual([h["name"] for h in hosts], ["c"])
+
+    def test_write_back_during_rebuild_read_forces_another_rebuild(self):
+        calls = []
+
+        def get_all(doctype, fields):
+            # A shard commits b -> Down right after the rebuild read it
+            if not calls:
+                snapshot.apply_write_back({}, {"b": "Down"}, "2025-01-01 00:00:00")
+            calls.append(doctype)
+            return [frappe._dict(row) for row in ROWS]
+
+        with patch("frappe.get_all", get_all, create=True):
+            snapshot.invalidate()
+            # The first rebuild was not trusted, the next read loads it again
+            self.assertFalse(snapshot.is_ready())
+            self.assertEqual(snapshot.get_counts(), {"Active": 1, "Down": 2})
+            snapshot.apply_write_back({"Active": ["a"]}, {}, "2025-01-01 00:01:00")
+            self.assertEqual(snapshot.get_counts(), {"Active": 1, "Down": 2})
+
+        self.assertEqual(len(calls), 2)
+
+    def test_rebuild_invalidated_midway_is_not_marked_ready(self):
+        def get_all(doctype, fields):
+            snapshot.invalidate()
+            return []
+
+        with patch("frappe.get_all", get_all, create=True):
+            snapshot.invalidate()
+            snapshot.rebuild()
+        self.assertFalse(snapshot.is_ready())
+
+    def test_rebuild_during_write_back_is_not_counted_twice(self):
+        # The write-back read b's old entry, then a rebuild loaded b as Down
+        # from the database before the delta was applied
+        loads = snapshot.pickle.loads
+        raced = []
+
+        def racing_loads(value):
+            if not raced:
+                raced.append(True)
+                snapshot.rebuild()
+            return loads(value)
+
+        with patch("frappe.get_all", lambda doctype, fields: [frappe._dict(row) for row in ROWS], create=True):
+            with patch.object(snapshot.pickle, "loads", racing_loads):
+                snapshot.apply_write_back({}, {"b": "Down"}, "2025-01-01 00:00:00")
+            self.assertEqual(snapshot.get_counts(), {"Active": 1, "Down": 2})
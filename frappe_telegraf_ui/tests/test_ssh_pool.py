@@ -0,0 +1,100 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.ssh.pool import PoolExhausted, SSHConnectionPool
+
+
+class FakeTransport:
+    def __init__(self):
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+    def set_keepalive(self, interval):
+        pass
+
+    def send_ignore(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.closed = False
+
+    def get_transport(self):
+        return self.transport
+
+    def close(self):
+        self.closed = True
+
+
+class TestSSHConnectionPool(FrappeTestCase):
+    def make_pool(self, **kwargs):
+        kwargs.setdefault("acquire_timeout", 0.1)
+        return SSHConnectionPool(lambda spec: FakeClient(), **kwargs)
+
+    def test_reuses_idle_connection(self):
+        pool = self.make_pool()
+        spec = {"key": "host-1", "fingerprint": "a"}
+        with pool.connection(spec) as first:
+            pass
+        with pool.connection(spec) as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(pool.stats["created"], 1)
+
+    def test_fingerprint_change_discards_connection(self):
+        pool = self.make_pool()
+        with pool.connection({"key": "host-1", "fingerprint": "a"}) as first:
+            pass
+        with pool.connection({"key": "host-1", "fingerprint": "b"}) as second:
+            pass
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+
+    def test_dead_transport_is_not_reused(self):
+        pool = self.make_pool()
+        spec = {"key": "host-1", "fingerprint": "a"}
+        with pool.connection(spec) as first:
+            pass
+        first.transport.active = False
+        with pool.connection(spec) as second:
+            pass
+        self.assertIsNot(first, second)
+
+    def test_max_connections(self):
+        pool = self.make_pool(max_connections=1)
+        conn = pool.acquire({"key": "host-1", "fingerprint": "a"})
+        with self.assertRaises(PoolExhausted):
+            pool.acquire({"key": "host-2", "fingerprint": "a"})
+        pool.release(conn)
+        # The idle connection is evicted to make room for the other host
+        with pool.connection({"key": "host-2", "fingerprint": "a"}):
+            self.assertEqual(pool.size, 1)
+
+    def test_invalidate(self):
+        pool = self.make_pool()
+        with pool.connection({"key": "host-1", "fingerprint": "a"}) as client:
+            pass
+        pool.invalidate("host-1")
+        self.assertTrue(client.closed)
+        self.assertEqual(pool.size, 0)
+
+    def test_invalidate_drops_busy_connection_on_release(self):
+        pool = self.make_pool()
+        spec = {"key": "host-1", "fingerprint": "a"}
+        conn = pool.acquire(spec)
+        pool.invalidate("host-1")
+        pool.release(conn)
+        self.assertTrue(conn.client.closed)
+        self.assertEqual(pool.size, 0)
+
+        # Connections made after the invalidation are pooled as usual
+        with pool.connection(spec) as client:
+            pass
+        self.assertFalse(client.closed)
+        self.assertEqual(pool.size, 1)
@@ -0,0 +1,121 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.ssh.telegraf_test import ConfigTestSummary, run_telegraf_test
+from frappe_telegraf_ui.tests.fake_ssh import FakeStream
+
+STDOUT = """> cpu,cpu=cpu0,host=web-1 usage_idle=98.5 1700000000000000000
+> cpu,cpu=cpu1,host=web-1 usage_idle=97.1 1700000000000000000
+> mem,host=web-1 used_percent=41.2 1700000000000000000
+> internal_agent,host=web-1 gather_errors=0i 1700000000000000000
+"""
+
+STDERR = """2024-01-01T00:00:00Z I! Loaded inputs: cpu mem disk internal
+2024-01-01T00:00:00Z E! [inputs.disk] Error in plugin: permission denied
+"""
+
+
+class FakeTestChannel:
+    """Session channel replaying stdout ``chunks``; stays open unless ``exits``."""
+
+    def __init__(self, chunks, exits=True):
+        self.chunks = list(chunks)
+        self.exits = exits
+        self.closed = False
+
+    def exec_command(self, command):
+        self.command = command
+
+    def recv_ready(self):
+        return bool(self.chunks)
+
+    def recv(self, size):
+        return self.chunks.pop(0)
+
+    def recv_stderr_ready(self):
+        return False
+
+    def recv_stderr(self, size):
+        return b""
+
+    def exit_status_ready(self):
+        return self.exits and not self.chunks
+
+    def recv_exit_status(self):
+        return 0
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTestClient:
+    def __init__(self, channel):
+        self.channel = channel
+        self.commands = []
+
+    def get_transport(self):
+        return self
+
+    def open_session(self):
+        return self.channel
+
+    def exec_command(self, command, timeout=None):
+        self.commands.append(command)
+        return None, FakeStream(), FakeStream()
+
+
+class TestTelegrafTestSummary(FrappeTestCase):
+    def test_summary(self):
+        summary = ConfigTestSummary()
+        # Feed in awkward chunk boundaries, as they come off the channel
+        for offset in range(0, len(STDOUT), 7):
+            summary.feed("stdout", STDOUT[offset:offset + 7])
+        summary.feed("stderr", STDERR)
+        summary.close()
+        result = summary.as_dict()
+
+        self.assertEqual(result["metrics"], 4)
+        self.assertEqual(result["measurements"], {"cpu": 2, "mem": 1, "internal_agent": 1})
+        self.assertEqual(result["plugins"]["cpu"], {"metrics": 2, "errors": 0})
+        self.assertEqual(result["plugins"]["internal"], {"metrics": 1, "errors": 0})
+        self.assertEqual(result["plugins"]["disk"], {"metrics": 0, "errors": 1})
+        self.assertEqual(len(result["errors"]), 1)
+
+    def test_pid_line_is_not_output(self):
+        client = FakeTestClient(FakeTestChannel([b"4242\n> cpu", b",host=a usage_idle=1 1\n"]))
+        chunks = []
+        result = run_telegraf_test(client, "/etc/telegraf/telegraf.conf",
+                                   on_chunk=lambda stream, text: chunks.append(text))
+
+        self.assertTrue(client.channel.command.startswith("echo $$; exec timeout"))
+        self.assertEqual("".join(chunks), "> cpu,host=a usage_idle=1 1\n")
+        self.assertEqual(result["metrics"], 1)
+        # Exited on its own: nothing to kill
+        self.assertEqual(client.commands, [])
+
+    def test_characters_split_across_reads(self):
+        line = "> disk,path=/données used=1 1\n".encode()
+        split = line.index("é".encode()) + 1
+        client = FakeTestClient(FakeTestChannel([b"4242\n" + line[:split], line[split:] + b"\xe2\x82"]))
+        chunks = []
+        result = run_telegraf_test(client, "/etc/telegraf/telegraf.conf", keep_output=True,
+                                   on_chunk=lambda stream, text: chunks.append(text))
+
+        # A dangling partial character at the end is replaced once, on flush
+        self.assertEqual("".join(chunks), "> disk,path=/données used=1 1\n\ufffd")
+        self.assertEqual(result["output"], "".join(chunks))
+
+    def test_byte_cap_kills_remote_process(self):
+        channel = FakeTestChannel([b"4242\n", b"> cpu,host=a usage_idle=1 1\n" * 100], exits=False)
+        client = FakeTestClient(channel)
+        ticks = []
+        result = run_telegraf_test(client, "/etc/telegraf/telegraf.conf", max_bytes=100,
+                                   on_tick=lambda: ticks.append(1))
+
+        self.assertTrue(result["truncated"])
+        self.assertEqual(result["bytes"], 100)
+        self.assertEqual(client.commands, ["kill -TERM 4242"])
+        self.assertTrue(channel.closed)
+        self.assertTrue(ticks)
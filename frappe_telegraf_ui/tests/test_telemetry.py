@@ -0,0 +1,74 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+import time
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring import telemetry
+
+
+class TestTelemetry(FrappeTestCase):
+    def setUp(self):
+        telemetry.reset()
+
+    def tearDown(self):
+        telemetry.reset()
+
+    def test_nothing_is_recorded_without_a_reader(self):
+        self.assertFalse(telemetry.enabled())
+        started = time.perf_counter()
+        for _ in range(100000):
+            telemetry.inc("probes", result="active")
+            with telemetry.timed("cycle_phase_seconds", phase="probe"):
+                pass
+        elapsed = time.perf_counter() - started
+        telemetry.flush()
+
+        self.assertEqual(telemetry.collect(), ({}, {}))
+        self.assertLess(elapsed, 1)
+
+    def test_counters_and_histograms(self):
+        with patch.object(telemetry, "enabled", return_value=True):
+            telemetry.inc("probes", 3, result="active")
+            telemetry.inc("probes", result="down")
+            telemetry.observe("cycle_seconds", 0.2)
+            telemetry.observe("cycle_seconds", 7)
+            with self.assertRaises(ValueError):
+                with telemetry.timed("ssh_operation_seconds", operation="get_config"):
+                    raise ValueError("boom")
+            telemetry.flush()
+
+        counters, histograms = telemetry.collect()
+        self.assertEqual(counters[("probes", (("result", "active"),))], 3)
+        cycle = histograms[("cycle_seconds", ())]
+        self.assertEqual(cycle["count"], 2)
+        self.assertAlmostEqual(cycle["sum"], 7.2)
+        self.assertIn(("ssh_operation_seconds", (("operation", "get_config"), ("outcome", "error"))),
+                      histograms)
+
+    def test_prometheus_and_influx_output(self):
+        with patch.object(telemetry, "enabled", return_value=True):
+            telemetry.inc("probes", 2, result="active")
+            telemetry.observe("cycle_seconds", 0.2)
+            telemetry.observe("cycle_seconds", 7)
+            telemetry.flush()
+        counters, histograms = telemetry.collect()
+
+        text = telemetry.render_prometheus(counters, histograms)
+        self.assertIn("# TYPE telegraf_ui_probes_total counter", text)
+        self.assertIn('telegraf_ui_probes_total{result="active"} 2', text)
+        self.assertIn('telegraf_ui_cycle_seconds_bucket{le="0.1"} 0', text)
+        self.assertIn('telegraf_ui_cycle_seconds_bucket{le="0.25"} 1', text)
+        self.assertIn('telegraf_ui_cycle_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn("telegraf_ui_cycle_seconds_count 2", text)
+
+        lines = telemetry.render_influx(counters, histograms, timestamp_ns=1).splitlines()
+        self.assertIn("telegraf_ui_probes,result=active counter=2 1", lines)
+        self.assertTrue(lines[1].startswith("telegraf_ui_cycle_seconds 0.005=0,"))
+        self.assertTrue(lines[1].endswith(",+Inf=2,count=2,sum=7.2 1"))
+
+    def test_render_switches_recording_on(self):
+        telemetry.render("prometheus")
+        self.assertTrue(telemetry.enabled())
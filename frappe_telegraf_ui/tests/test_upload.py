@@ -0,0 +1,40 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+import io
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.ssh.upload import CHUNK_SIZE, upload_files
+from frappe_telegraf_ui.tests.fake_ssh import FakeSSHClient
+
+PATH = "/etc/telegraf/telegraf.conf"
+
+
+class TestConfigUpload(FrappeTestCase):
+    def test_upload_replaces_file_atomically(self):
+        client = FakeSSHClient({PATH: "old"})
+        results = upload_files(client, [(PATH, "new 'quoted' config")])
+
+        self.assertTrue(results[0]["changed"])
+        self.assertEqual(client.files, {PATH: "new 'quoted' config"})
+        # hash check + one install step, no per-operation round trips
+        self.assertEqual(len(client.commands), 2)
+
+    def test_identical_content_is_skipped(self):
+        client = FakeSSHClient({PATH: "same"})
+        results = upload_files(client, [(PATH, "same")])
+
+        self.assertFalse(results[0]["changed"])
+        self.assertEqual(len(client.commands), 1)
+
+    def test_large_multi_file_upload(self):
+        client = FakeSSHClient({PATH: "old"})
+        fragment = "[[inputs.cpu]]\n" * (CHUNK_SIZE // 4)
+        results = upload_files(client, [
+            (PATH, "new"),
+            ("/etc/telegraf/telegraf.d/cpu.conf", io.BytesIO(fragment.encode())),
+        ])
+
+        self.assertEqual([r["changed"] for r in results], [True, True])
+        self.assertEqual(client.files["/etc/telegraf/telegraf.d/cpu.conf"], fragment)
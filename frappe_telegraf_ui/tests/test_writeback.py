@@ -0,0 +1,36 @@
+# Copyright (c) 2025, kang bobi and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from frappe_telegraf_ui.monitoring.writeback import plan_write_back
+
+
+def result(name, old_status, new_status, error=None):
+    return {
+        "name": name,
+        "old_status": old_status,
+        "new_status": new_status,
+        "response_time": 1.5,
+        "error": error,
+    }
+
+
+class TestWriteBackPlan(FrappeTestCase):
+    def test_groups_results(self):
+        unchanged, changed, logs = plan_write_back([
+            result("a", "Active", "Active"),
+            result("b", "Active", "Active"),
+            result("c", "Down", "Down"),
+            result("d", "Active", "Down"),
+            result("e", "Unknown", "Active"),
+            result("f", "Active", "Unknown", error="boom"),
+            result("g", "Unknown", "Unknown", error="boom"),
+            # An error that hysteresis has not confirmed yet
+            result("h", "Active", "Active", error="timed out"),
+        ])
+
+        self.assertEqual(unchanged, {"Active": ["a", "b", "h"], "Down": ["c"], "Unknown": ["g"]})
+        self.assertEqual(changed, {"d": "Down", "e": "Active", "f": "Unknown"})
+        # Confirmed probe errors are logged like any other change
+        self.assertEqual([r["name"] for r in logs], ["d", "e", "f"])